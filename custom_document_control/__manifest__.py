@@ -14,11 +14,25 @@
         'security/ir.model.access.csv',
 	'security/folder_security.xml',
         'data/ir_sequence_data.xml',
+        'data/ir_cron_data.xml',
+        'data/mail_activity_data.xml',
 	'wizard/document_reject_wizard_views.xml',
+        'wizard/document_folder_move_wizard_views.xml',
 	'views/report_certificate.xml',
         'views/document_control_views.xml',
+        'views/document_perf_stat_views.xml',
+        'views/document_acknowledgment_views.xml',
+        'views/document_archive_views.xml',
+        'views/document_dashboard_views.xml',
+        'views/document_transition_views.xml',
         'views/menu_views.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'custom_document_control/static/src/folder_tree/*',
+            'custom_document_control/static/src/pending_tasks/*',
+        ],
+    },
     'installable': True,
     'application': True,
 }
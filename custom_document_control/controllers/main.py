@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http, fields
+from odoo.http import request, Stream, content_disposition
+from odoo.exceptions import AccessError
+
+
+class DocumentControlApi(http.Controller):
+
+    # Campos de metadatos del registro publicado (nunca binarios)
+    _document_fields = [
+        'code', 'name', 'version', 'state', 'area_id', 'category_id', 'type_id', 'folder_id',
+        'document_scope', 'issue_date', 'approval_date', 'approved_by_id',
+        'source_document_id', 'active_revision_id', 'pdf_filename', 'editable_filename', 'write_date',
+    ]
+    _file_fields = ('pdf_file', 'editable_file')
+
+    @http.route('/document_control/api/documents', type='http', auth='user', methods=['GET'], readonly=True)
+    def documents(self, cursor=None, since=None, limit=200, states='approved,obsolete', **kw):
+        """
+        Registro publicado como feed en orden de commit (document.change.feed).
+        - Sin cursor: carga completa desde el principio, página a página.
+        - cursor (o since): la secuencia devuelta antes; trae solo lo confirmado después.
+        'removed' lista los documentos cambiados que ya no corresponden al consumidor:
+        borrados, sin acceso o fuera de los estados pedidos.
+        """
+        Document = request.env['document.control'].with_context(bin_size=True)
+        Document.check_access('read')
+        Feed = request.env['document.change.feed'].sudo()
+        try:
+            limit = min(max(int(limit), 1), 1000)
+            after = int(cursor or since or 0)
+        except ValueError:
+            return request.make_json_response({'error': 'Cursor inválido'}, status=400)
+        if after and after < Feed._get_pruned_sequence():
+            return request.make_json_response({'error': 'Cursor vencido: volver a cargar desde el principio'}, status=410)
+
+        entries = Feed._get_changes(after, limit)
+        changed = [document_id for _seq, document_id, deleted in entries if not deleted]
+        domain = [('id', 'in', changed)] + ([('state', 'in', states.split(','))] if states else [])
+        records = Document.search(domain) if changed else Document.browse()
+        visible = {doc.id: doc for doc in records}
+        records.fetch(self._document_fields)
+        checksums = self._get_file_checksums(records)
+        last_cursor = str(entries[-1][0]) if entries else (str(after) if after else None)
+        return request.make_json_response({
+            'documents': [self._serialize_document(visible[document_id], checksums)
+                          for _seq, document_id, _deleted in entries if document_id in visible],
+            'removed': [document_id for _seq, document_id, _deleted in entries if document_id not in visible],
+            'next_cursor': last_cursor if len(entries) == limit else None,
+            'last_cursor': last_cursor,
+        })
+
+    def _get_file_checksums(self, records):
+        """Un solo search_read para los checksums de todos los archivos de la página"""
+        attachments = request.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', 'document.control'),
+            ('res_field', 'in', list(self._file_fields)),
+            ('res_id', 'in', records.ids),
+        ], ['res_id', 'res_field', 'checksum', 'file_size', 'mimetype'])
+        return {(a['res_id'], a['res_field']): a for a in attachments}
+
+    def _serialize_document(self, doc, checksums):
+        files = {}
+        for field in self._file_fields:
+            attachment = checksums.get((doc.id, field))
+            if attachment:
+                files[field] = {
+                    'url': f"/document_control/api/documents/{doc.id}/{field}?unique={attachment['checksum']}",
+                    'checksum': attachment['checksum'],
+                    'size': attachment['file_size'],
+                    'mimetype': attachment['mimetype'],
+                }
+        return {
+            'id': doc.id,
+            'code': doc.code,
+            'name': doc.name,
+            'version': doc.version,
+            'state': doc.state,
+            'area': doc.area_id.code,
+            'category': doc.category_id.code or None,
+            'type': doc.type_id.code,
+            'folder': doc.folder_id.complete_name,
+            'scope': doc.document_scope,
+            'issue_date': fields.Date.to_string(doc.issue_date) or None,
+            'approval_date': fields.Datetime.to_string(doc.approval_date) or None,
+            'approved_by': doc.approved_by_id.name or None,
+            'source_document_id': doc.source_document_id.id or None,
+            'active_revision_id': doc.active_revision_id.id or None,
+            'write_date': fields.Datetime.to_string(doc.write_date),
+            'files': files,
+        }
+
+    @http.route('/document_control/api/documents/<int:document_id>/<string:field>', type='http', auth='user', methods=['GET'], readonly=True)
+    def document_file(self, document_id, field, unique=None, **kw):
+        """Contenido del archivo; cacheable para siempre si la URL lleva el checksum"""
+        if field not in self._file_fields:
+            raise request.not_found()
+        doc = request.env['document.control'].browse(document_id).exists()
+        if not doc:
+            raise request.not_found()
+        try:
+            doc.check_access('read')
+        except AccessError:
+            raise request.not_found()
+        stream = request.env['ir.binary']._get_stream_from(doc, field, filename_field=field.replace('_file', '_filename'))
+        return stream.get_response(as_attachment=True, immutable=bool(unique) and unique == stream.etag)
+
+    @http.route('/document_control/preview/<int:document_id>', type='http', auth='user', methods=['GET'], readonly=True)
+    def document_preview(self, document_id, unique=None, **kw):
+        """
+        PDF para el visor: copia linealizada si ya existe, si no el original.
+        Soporta Range (pdf.js descarga por partes) y ETag/If-None-Match (checksum del adjunto);
+        inmutable solo si 'unique' es el checksum de lo que se sirve.
+        """
+        doc = request.env['document.control'].browse(document_id).exists()
+        if not doc:
+            raise request.not_found()
+        try:
+            doc.check_access('read')
+        except AccessError:
+            raise request.not_found()
+        has_preview = request.env['ir.attachment'].sudo().search_count([
+            ('res_model', '=', doc._name), ('res_field', '=', 'pdf_preview_file'), ('res_id', '=', doc.id),
+        ], limit=1)
+        field = 'pdf_preview_file' if has_preview else 'pdf_file'
+        stream = request.env['ir.binary']._get_stream_from(
+            doc.sudo(), field, filename_field='pdf_filename', mimetype='application/pdf')
+        stream.conditional = True
+        return stream.get_response(as_attachment=False, immutable=bool(unique) and unique == stream.etag)
+
+    @http.route('/document_control/download/<int:document_id>', type='http', auth='user', methods=['GET'])
+    def document_download(self, document_id, **kw):
+        """Descarga con sello dinámico (usuario, fecha, 'no controlada al imprimir') sobre la base en caché"""
+        doc = request.env['document.control'].browse(document_id).exists()
+        if not doc:
+            raise request.not_found()
+        try:
+            doc.check_access('read')
+        except AccessError:
+            raise request.not_found()
+        data = doc._get_stamped_download()
+        if data is None:
+            # No es PDF (o falta pypdf): descarga normal
+            return request.redirect(f'/web/content/document.control/{doc.id}/pdf_file?download=true')
+        stream = Stream(
+            type='data',
+            data=data,
+            mimetype='application/pdf',
+            download_name=doc.pdf_filename or f'{doc.code}.pdf',
+            size=len(data),
+        )
+        return stream.get_response(as_attachment=True, max_age=0)
+
+    # =========================================================
+    # CONFIRMACIÓN DE LECTURA
+    # =========================================================
+    @http.route('/document_control/acknowledge/<int:document_id>', type='http', auth='user', methods=['GET'])
+    def acknowledge_link(self, document_id, **kw):
+        """Enlace del aviso por correo: registra la lectura y abre el documento"""
+        doc = request.env['document.control'].browse(document_id).exists()
+        if not doc:
+            raise request.not_found()
+        try:
+            doc.check_access('read')
+        except AccessError:
+            raise request.not_found()
+        doc._acknowledge_read()
+        return request.redirect(f'/odoo/document.control/{doc.id}')
+
+    @http.route('/document_control/acknowledge', type='jsonrpc', auth='user', methods=['POST'])
+    def acknowledge(self, document_ids):
+        """Confirmación desde clientes externos; devuelve los documentos confirmados en esta llamada"""
+        docs = request.env['document.control'].browse([int(i) for i in document_ids]).exists()
+        docs.check_access('read')
+        return {'acknowledged': docs._acknowledge_read()}
+
+    # =========================================================
+    # ESPEJO DE PERMISOS DE CARPETA
+    # =========================================================
+    def _check_acl_consumer(self):
+        if not request.env.user.has_group('custom_document_control.group_document_manager'):
+            raise AccessError("Solo los administradores de documentos pueden leer los permisos de carpeta.")
+
+    @http.route('/document_control/api/acl_changes', type='http', auth='user', methods=['GET'], readonly=True)
+    def acl_changes(self, since=0, limit=1000, **kw):
+        """Deltas de permisos efectivos con secuencia mayor a 'since'"""
+        self._check_acl_consumer()
+        try:
+            since, limit = int(since), min(max(int(limit), 1), 10000)
+        except ValueError:
+            return request.make_json_response({'error': 'Secuencia inválida'}, status=400)
+        changes = request.env['document.folder.acl.log']._get_changes(since=since, limit=limit)
+        return request.make_json_response({
+            'changes': changes,
+            'last_sequence': changes[-1]['sequence'] if changes else since,
+            'has_more': len(changes) == limit,
+        })
+
+    @http.route('/document_control/api/acl_snapshot', type='http', auth='user', methods=['GET'], readonly=True)
+    def acl_snapshot(self, **kw):
+        """Foto completa para el arranque de un espejo; luego se siguen los deltas desde 'sequence'"""
+        self._check_acl_consumer()
+        AclLog = request.env['document.folder.acl.log'].sudo()
+        # Misma transacción que la foto: todo lo confirmado antes tiene secuencia <= a esta
+        sequence = AclLog._get_last_sequence()
+        folders = request.env['document.folder'].sudo().search([])
+        snapshot = AclLog._get_acl_snapshot(folders)
+        return request.make_json_response({
+            'sequence': sequence,
+            'folders': [{
+                'folder_id': folder.id,
+                'folder': folder.complete_name,
+                'access': [{'user_id': user_id or None, 'access_level': level} for user_id, level in sorted(snapshot[folder.id].items())],
+            } for folder in folders],
+        })
+
+    # =========================================================
+    # PENDIENTES (contador de la barra superior)
+    # =========================================================
+    @http.route('/document_control/pending_tasks', type='jsonrpc', auth='user', methods=['POST'], readonly=True)
+    def pending_tasks(self, limit=10, offset=0, **kw):
+        """Conteos por tipo y la primera página de tareas del usuario en una sola llamada"""
+        limit, offset = min(max(int(limit), 1), 100), max(int(offset), 0)
+        return request.env['document.control']._get_pending_tasks(limit=limit, offset=offset)
+
+    # =========================================================
+    # ÁRBOL DE CARPETAS
+    # =========================================================
+    @http.route('/document_control/folder_tree', type='jsonrpc', auth='user', methods=['POST'], readonly=True)
+    def folder_tree(self, parent_id=False, **kw):
+        """Un nivel del árbol (hijos legibles de 'parent_id', o las raíces) con conteos precalculados"""
+        return request.env['document.folder']._get_tree_level(int(parent_id) if parent_id else False)
+
+    # =========================================================
+    # TABLERO
+    # =========================================================
+    @http.route('/document_control/api/dashboard', type='http', auth='user', methods=['GET'], readonly=True)
+    def dashboard_kpis(self, months=12, **kw):
+        """KPIs del tablero desde la tabla de agregados (tiempo constante respecto al número de documentos)"""
+        try:
+            months = min(max(int(months), 1), 60)
+        except ValueError:
+            return request.make_json_response({'error': 'Número de meses inválido'}, status=400)
+        return request.make_json_response(request.env['document.dashboard.stat']._get_kpis(months=months))
+
+    @http.route('/document_control/api/cycle_times', type='http', auth='user', methods=['GET'], readonly=True)
+    def cycle_times(self, date_from=None, date_to=None, **kw):
+        """Tiempos de ciclo (promedio y percentiles, en horas) desde la bitácora de transiciones"""
+        if not request.env.user.has_group('custom_document_control.group_document_manager'):
+            raise AccessError("Solo los administradores de documentos pueden ver los tiempos de ciclo.")
+        try:
+            date_from = fields.Date.to_date(date_from)
+            date_to = fields.Date.to_date(date_to)
+        except ValueError:
+            return request.make_json_response({'error': 'Fecha inválida'}, status=400)
+        return request.make_json_response(
+            request.env['document.state.transition'].sudo()._get_cycle_time_stats(date_from=date_from, date_to=date_to)
+        )
+
+    # =========================================================
+    # RENDIMIENTO
+    # =========================================================
+    @http.route('/document_control/perf_stats.csv', type='http', auth='user', methods=['GET'], readonly=True)
+    def perf_stats_csv(self, **kw):
+        data = request.env['document.perf.stat']._get_summary_csv()
+        return request.make_response(data, headers=[
+            ('Content-Type', 'text/csv; charset=utf-8'),
+            ('Content-Disposition', content_disposition(f"rendimiento_{fields.Date.today()}.csv")),
+        ])
+
+    # =========================================================
+    # SUBIDA POR PARTES (archivos grandes)
+    # =========================================================
+    @http.route('/document_control/upload/start', type='jsonrpc', auth='user', methods=['POST'])
+    def upload_start(self, document_id, field, filename, size, checksum=None):
+        """Abre o reanuda una subida; devuelve token y bytes ya recibidos"""
+        if field not in self._file_fields:
+            raise request.not_found()
+        return request.env['document.upload.session']._start(document_id, field, filename, size, checksum=checksum)
+
+    # Sin csrf_token: el cuerpo es el archivo crudo y el token de la URL ya liga la subida al usuario
+    # (_get_session solo encuentra sesiones abiertas del usuario de la sesión web)
+    @http.route('/document_control/upload/<string:token>/chunk', type='http', auth='user', methods=['POST', 'PUT'], csrf=False)
+    def upload_chunk(self, token, offset=0, **kw):
+        """Cuerpo crudo (application/octet-stream) a partir del byte 'offset'"""
+        session = request.env['document.upload.session']._get_session(token)
+        offset = int(offset)
+        if offset != session.received_size:
+            return request.make_json_response({'received_size': int(session.received_size)}, status=409)
+        received = session._append_chunk(offset, request.httprequest.stream)
+        return request.make_json_response({'received_size': received})
+
+    @http.route('/document_control/upload/<string:token>/finish', type='jsonrpc', auth='user', methods=['POST'])
+    def upload_finish(self, token):
+        """Verifica checksum y adjunta el archivo al documento"""
+        return request.env['document.upload.session']._get_session(token)._finish()
@@ -1 +1,18 @@
+from . import document_perf_stat
+from . import document_folder_acl_log
 from . import document_control
+from . import document_change_feed
+from . import document_preview
+from . import document_optimize
+from . import document_review
+from . import document_acknowledgment
+from . import document_pending
+from . import document_searchpanel
+from . import document_folder_tree
+from . import document_folder_move
+from . import document_dashboard
+from . import document_transition
+from . import document_archive
+from . import document_download
+from . import document_certificate
+from . import document_upload_session
@@ -0,0 +1,140 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields
+from odoo.tools import SQL
+from markupsafe import Markup
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Destinatarios por correo de la cola (el programador de correo los envía por lotes)
+MAIL_RECIPIENTS_PER_BATCH = 100
+
+
+class DocumentAcknowledgment(models.Model):
+    """Constancia de lectura: una fila por (versión publicada, lector)"""
+    _name = 'document.acknowledgment'
+    _description = 'Confirmación de Lectura'
+    _order = 'read_date desc, id'
+
+    document_id = fields.Many2one('document.control', string='Documento', required=True, ondelete='cascade', readonly=True)
+    user_id = fields.Many2one('res.users', string='Usuario', required=True, ondelete='cascade', readonly=True, index=True)
+    read_date = fields.Datetime('Leído el', readonly=True)
+
+    _sql_constraints = [('document_user_uniq', 'unique(document_id, user_id)', 'El usuario ya tiene esta lectura asignada')]
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    # Agregados incrementales (no se recuentan al abrir el documento)
+    ack_total = fields.Integer('Lectores', readonly=True, copy=False)
+    ack_done = fields.Integer('Lecturas confirmadas', readonly=True, copy=False)
+    ack_pending = fields.Boolean(compute='_compute_ack_pending')
+
+    def _compute_ack_pending(self):
+        pending = self.env['document.acknowledgment'].sudo().search([
+            ('document_id', 'in', self.ids), ('user_id', '=', self.env.uid), ('read_date', '=', False),
+        ]).document_id
+        for doc in self:
+            doc.ack_pending = doc in pending
+
+    def action_approve(self):
+        res = super().action_approve()
+        self._distribute_for_reading()
+        return res
+
+    # =========================================================
+    # DISTRIBUCIÓN
+    # =========================================================
+    def _get_effective_reader_ids(self):
+        """
+        Lectores efectivos según la regla de lectura de documentos:
+        la carpeta y su padre deben ser públicos o incluir al usuario (access_ids o grupos).
+        """
+        self.ensure_one()
+        restrictions = []
+        for folder in (self.folder_id, self.folder_id.parent_id):
+            if folder and folder.access_ids:
+                restrictions.append(set(folder.access_ids.user_id.ids) | set(folder.access_user_ids.ids))
+        allowed = set.intersection(*restrictions) if restrictions else None
+        self.env.cr.execute(SQL("""
+            SELECT id FROM res_users
+             WHERE active AND NOT share AND id != %s AND (%s OR id = ANY(%s))
+        """, self.owner_id.id, allowed is None, list(allowed or [])))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _distribute_for_reading(self):
+        """Crea las constancias pendientes con un INSERT por documento y encola un aviso por lotes"""
+        Mail = self.env['mail.mail'].sudo()
+        mail_vals = []
+        for doc in self.sudo():
+            user_ids = doc._get_effective_reader_ids()
+            if not user_ids:
+                continue
+            self.env.cr.execute(SQL("""
+                INSERT INTO document_acknowledgment (document_id, user_id, create_uid, write_uid, create_date, write_date)
+                SELECT %(doc)s, u, %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+                  FROM unnest(%(users)s::int[]) AS u
+                ON CONFLICT (document_id, user_id) DO NOTHING
+                RETURNING user_id
+            """, doc=doc.id, uid=self.env.uid, users=user_ids))
+            new_user_ids = [row[0] for row in self.env.cr.fetchall()]
+            if not new_user_ids:
+                continue
+            self.env.cr.execute(SQL(
+                "UPDATE document_control SET ack_total = ack_total + %s WHERE id = %s", len(new_user_ids), doc.id,
+            ))
+            partner_ids = self.env['res.users'].browse(new_user_ids).partner_id.filtered('email').ids
+            url = f"{doc.get_base_url()}/document_control/acknowledge/{doc.id}"
+            body = Markup(
+                '<p>Se publicó <strong>%s v%s - %s</strong>.</p>'
+                '<p>Léelo y confirma la lectura: <a href="%s">%s</a></p>'
+            ) % (doc.code, doc.version, doc.name, url, url)
+            for i in range(0, len(partner_ids), MAIL_RECIPIENTS_PER_BATCH):
+                mail_vals.append({
+                    'subject': f"Lectura obligatoria: {doc.code} v{doc.version}",
+                    'body_html': body,
+                    'model': doc._name,
+                    'res_id': doc.id,
+                    'recipient_ids': [(6, 0, partner_ids[i:i + MAIL_RECIPIENTS_PER_BATCH])],
+                    'auto_delete': True,
+                })
+        self.invalidate_model(['ack_total'])
+        if mail_vals:
+            # Sin envío inmediato: la cola de correo los procesa en segundo plano
+            Mail.create(mail_vals)
+
+    # =========================================================
+    # CONFIRMACIÓN DE LECTURA
+    # =========================================================
+    def _acknowledge_read(self):
+        """Marca como leídos estos documentos para el usuario actual; devuelve los ids confirmados ahora"""
+        if not self:
+            return []
+        self.env.cr.execute(SQL("""
+            UPDATE document_acknowledgment
+               SET read_date = now() at time zone 'UTC', write_date = now() at time zone 'UTC', write_uid = %(uid)s
+             WHERE document_id = ANY(%(docs)s) AND user_id = %(uid)s AND read_date IS NULL
+            RETURNING document_id
+        """, uid=self.env.uid, docs=self.ids))
+        doc_ids = [row[0] for row in self.env.cr.fetchall()]
+        if doc_ids:
+            self.env.cr.execute(SQL("UPDATE document_control SET ack_done = ack_done + 1 WHERE id = ANY(%s)", doc_ids))
+            self.invalidate_model(['ack_done'])
+            self.env['document.acknowledgment'].invalidate_model(['read_date'])
+        return doc_ids
+
+    def action_acknowledge(self):
+        self.check_access('read')
+        self._acknowledge_read()
+
+    def action_view_acknowledgments(self):
+        self.ensure_one()
+        return {
+            'name': f'Lecturas: {self.code} v{self.version}',
+            'type': 'ir.actions.act_window',
+            'res_model': 'document.acknowledgment',
+            'view_mode': 'list',
+            'domain': [('document_id', '=', self.id)],
+            'context': {'search_default_pending': 1},
+        }
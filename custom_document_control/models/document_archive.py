@@ -0,0 +1,280 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.http import Stream
+from odoo.tools import SQL, config
+from datetime import timedelta
+import glob
+import logging
+import lzma
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_logger = logging.getLogger(__name__)
+
+# store_fname de los adjuntos movidos al archivo frío: 'cold/<checksum>'
+COLD_PREFIX = 'cold/'
+PACK_MAX_SIZE = 256 * 1024 * 1024
+
+
+def compress(data):
+    if zstandard:
+        return 'zstd', zstandard.ZstdCompressor(level=19).compress(data)
+    return 'xz', lzma.compress(data, preset=6)
+
+
+def evict_lru(directory, max_bytes):
+    """Borra los archivos menos usados (mtime) de un directorio de caché hasta quedar bajo max_bytes. Devuelve el tamaño final"""
+    files = []
+    for root, _dirs, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _mtime, size, _path in files)
+    for _mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+
+# Tamaño conocido de cada directorio de caché en este proceso: se recorre el disco solo al pasarse del límite
+_cache_sizes = {}
+_cache_sizes_lock = threading.Lock()
+
+
+def track_cache_insert(directory, size, max_bytes):
+    """Registra un archivo nuevo en la caché y desaloja lo menos usado si el total supera max_bytes"""
+    with _cache_sizes_lock:
+        total = _cache_sizes.get(directory)
+        if total is None or total + size > max_bytes:
+            # Primera vez en este proceso o límite superado: tamaño real (incluye lo escrito por otros workers)
+            total = evict_lru(directory, max_bytes)
+        else:
+            total += size
+        _cache_sizes[directory] = total
+
+
+def decompress(codec, data):
+    if codec == 'zstd':
+        if not zstandard:
+            raise RuntimeError("El archivo frío usa zstd y el módulo 'zstandard' no está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return lzma.decompress(data)
+
+
+class DocumentArchiveEntry(models.Model):
+    """
+    Índice del archivo frío: dónde está (paquete, desplazamiento, largo) cada contenido comprimido.
+    Un contenido (checksum) se guarda una sola vez aunque lo usen varios adjuntos.
+    Cada transacción escribe en sus propios paquetes: si se revierte, esos paquetes quedan sin
+    entradas y _gc_orphan_packs los borra (nunca hay bytes huérfanos dentro de un paquete con datos).
+    """
+    _name = 'document.archive.entry'
+    _description = 'Archivo Frío'
+    _order = 'id desc'
+
+    checksum = fields.Char(required=True, readonly=True)
+    pack = fields.Char('Paquete', required=True, readonly=True)
+    offset = fields.Integer(readonly=True)
+    length = fields.Integer('Comprimido (bytes)', readonly=True, aggregator='sum')
+    size = fields.Integer('Original (bytes)', readonly=True, aggregator='sum')
+    reclaimed = fields.Integer('Liberado (bytes)', readonly=True, aggregator='sum')
+    codec = fields.Char(readonly=True)
+
+    _sql_constraints = [('checksum_uniq', 'unique(checksum)', 'Contenido ya archivado')]
+
+    # =========================================================
+    # ALMACÉN
+    # =========================================================
+    @api.model
+    def _get_archive_dir(self):
+        path = self.env['ir.config_parameter'].sudo().get_param('custom_document_control.archive_path') \
+            or os.path.join(config['data_dir'], 'document_archive', self.env.cr.dbname)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @api.model
+    def _get_cache_dir(self):
+        path = os.path.join(config['data_dir'], 'document_archive_cache', self.env.cr.dbname)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @api.model
+    def _get_current_pack(self, codec):
+        """Paquete de esta transacción para el codec (uno nuevo al llenarse); nunca uno ya confirmado"""
+        packs = self.env.cr.precommit.data.setdefault('custom_document_control.archive_packs', {})
+        pack = packs.get(codec)
+        if not pack or os.path.getsize(os.path.join(self._get_archive_dir(), pack)) >= PACK_MAX_SIZE:
+            pack = packs[codec] = f'pack-{time.strftime("%Y%m%d%H%M%S")}-{uuid.uuid4().hex[:8]}.{codec}'
+        return pack
+
+    @api.model
+    def _store(self, checksum, data):
+        """Agrega el contenido comprimido al paquete actual y lo indexa. Devuelve (entrada, si es nueva)"""
+        entry = self.search([('checksum', '=', checksum)], limit=1)
+        if entry:
+            return entry, False
+        codec, blob = compress(data)
+        pack = self._get_current_pack(codec)
+        with open(os.path.join(self._get_archive_dir(), pack), 'ab') as f:
+            offset = f.tell()
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        return self.create({
+            'checksum': checksum,
+            'pack': pack,
+            'offset': offset,
+            'length': len(blob),
+            'size': len(data),
+            'codec': codec,
+        }), True
+
+    def _read_blob(self):
+        self.ensure_one()
+        with open(os.path.join(self._get_archive_dir(), self.pack), 'rb') as f:
+            f.seek(self.offset)
+            return decompress(self.codec, f.read(self.length))
+
+    @api.model
+    def _materialize(self, checksum):
+        """Ruta del contenido descomprimido en la caché local (se descomprime una vez)"""
+        path = os.path.join(self._get_cache_dir(), checksum)
+        if os.path.exists(path):
+            os.utime(path)  # LRU: marca de último uso
+            return path
+        entry = self.sudo().search([('checksum', '=', checksum)], limit=1)
+        if not entry:
+            raise FileNotFoundError(f"El contenido {checksum} no está en el archivo frío")
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(entry._read_blob())
+            size = f.tell()
+        os.replace(tmp, path)
+        track_cache_insert(self._get_cache_dir(), size, self._get_cache_limit())
+        return path
+
+    @api.model
+    def _get_cache_limit(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.archive_cache_mb', 1024)) * 1024 * 1024
+
+    @api.model
+    def _evict_cache(self):
+        """Deja la caché de descompresión bajo el tamaño configurado, borrando lo menos usado"""
+        with _cache_sizes_lock:
+            _cache_sizes[self._get_cache_dir()] = evict_lru(self._get_cache_dir(), self._get_cache_limit())
+
+    @api.autovacuum
+    def _gc_orphan_packs(self):
+        """Paquetes sin ninguna entrada (de transacciones revertidas) con más de un día: se borran"""
+        directory = self._get_archive_dir()
+        self.env.cr.execute("SELECT DISTINCT pack FROM document_archive_entry")
+        used = {row[0] for row in self.env.cr.fetchall()}
+        limit = time.time() - 86400
+        for path in glob.glob(os.path.join(directory, 'pack-*')):
+            if os.path.basename(path) not in used and os.path.getmtime(path) < limit:
+                _logger.info("Archivo frío: borrando el paquete huérfano %s", os.path.basename(path))
+                os.unlink(path)
+
+    # =========================================================
+    # CRON DE ESCALONAMIENTO
+    # =========================================================
+    @api.model
+    def _cron_archive_obsolete(self, batch_size=100, time_limit=600):
+        """
+        Mueve al archivo frío los binarios de documentos obsoletos más antiguos que la edad configurada.
+        Reanudable: cada lote se confirma, y la siguiente ejecución sigue con lo que aún está en caliente.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        days = int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.archive_after_days', 365))
+        limit_date = fields.Datetime.now() - timedelta(days=days)
+        started = time.monotonic()
+        total_reclaimed = done = last_id = 0
+        while time.monotonic() - started < time_limit:
+            self.env.cr.execute(SQL("""
+                SELECT a.id FROM ir_attachment a
+                  JOIN document_control d ON d.id = a.res_id
+                 WHERE a.res_model = 'document.control' AND a.res_field IS NOT NULL
+                   AND a.store_fname IS NOT NULL AND a.store_fname NOT LIKE %s
+                   AND d.state = 'obsolete' AND d.write_date < %s AND a.id > %s
+                 ORDER BY a.id
+                 LIMIT %s
+            """, COLD_PREFIX + '%', limit_date, last_id, batch_size))
+            attachments = Attachment.browse([row[0] for row in self.env.cr.fetchall()])
+            if not attachments:
+                break
+            last_id = attachments.ids[-1]
+            for attachment in attachments:
+                hot_fname = attachment.store_fname
+                data = attachment.raw or b''
+                if len(data) != attachment.file_size:
+                    _logger.warning("Archivo frío: el adjunto %s no se pudo leer completo, se deja en caliente", attachment.id)
+                    continue
+                entry, created = self._store(attachment.checksum, data)
+                self.env.cr.execute(SQL(
+                    "UPDATE ir_attachment SET store_fname = %s WHERE id = %s", COLD_PREFIX + attachment.checksum, attachment.id,
+                ))
+                # Espacio neto: el archivo caliente solo se libera si ya nadie lo usa; el paquete crece si el contenido es nuevo
+                self.env.cr.execute(SQL("SELECT 1 FROM ir_attachment WHERE store_fname = %s LIMIT 1", hot_fname))
+                reclaimed = (0 if self.env.cr.rowcount else len(data)) - (entry.length if created else 0)
+                self.env.cr.execute(SQL(
+                    "UPDATE document_archive_entry SET reclaimed = reclaimed + %s WHERE id = %s", reclaimed, entry.id,
+                ))
+                # El GC del filestore borra el archivo caliente si ya ningún adjunto lo usa
+                Attachment._mark_for_gc(hot_fname)
+                total_reclaimed += reclaimed
+                done += 1
+            Attachment.invalidate_model(['store_fname', 'raw', 'datas'])
+            self.invalidate_model(['reclaimed'])
+            self.env.cr.commit()
+        else:
+            # Se acabó el tiempo: continuar en una nueva ejecución
+            self.env.ref('custom_document_control.ir_cron_document_archive')._trigger()
+        self._evict_cache()
+        if done:
+            _logger.info("Archivo frío: %s binarios archivados, %.1f MB liberados", done, total_reclaimed / 1024 / 1024)
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    # Lectura transparente: los adjuntos archivados se descomprimen bajo demanda (con caché en disco)
+    @api.model
+    def _file_read(self, fname, *args, **kwargs):
+        if fname and fname.startswith(COLD_PREFIX):
+            path = self.env['document.archive.entry']._materialize(fname[len(COLD_PREFIX):])
+            with open(path, 'rb') as f:
+                return f.read()
+        return super()._file_read(fname, *args, **kwargs)
+
+    def _to_http_stream(self):
+        if self.store_fname and self.store_fname.startswith(COLD_PREFIX):
+            path = self.env['document.archive.entry']._materialize(self.store_fname[len(COLD_PREFIX):])
+            stat = os.stat(path)
+            return Stream(
+                type='path',
+                path=path,
+                mimetype=self.mimetype,
+                download_name=self.name,
+                etag=self.checksum,
+                public=self.public,
+                last_modified=stat.st_mtime,
+                size=stat.st_size,
+            )
+        return super()._to_http_stream()
@@ -0,0 +1,132 @@
+#-*- coding: utf-8 -*-
+from odoo import models
+from odoo.exceptions import UserError
+from odoo.tools import format_date, format_datetime, html2plaintext
+from xml.sax.saxutils import escape
+import io
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    from reportlab.platypus.doctemplate import LayoutError
+except ImportError:
+    SimpleDocTemplate = None
+
+REJECTION_MARK = 'DOCUMENTO RECHAZADO'
+
+
+def render_certificate(values):
+    """Certificado en proceso con reportlab (mismos datos que la plantilla QWeb), en milisegundos"""
+    styles = getSampleStyleSheet()
+    small = styles['BodyText'].clone('small', fontSize=8, leading=10)
+    out = io.BytesIO()
+    pdf = SimpleDocTemplate(out, pagesize=A4, leftMargin=18 * mm, rightMargin=18 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+                            title=f"Certificado - {values['code']}", author=values['company'])
+    grid = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+    story = [
+        Paragraph(escape(values['company']), small),
+        Paragraph("Certificado de Control Documental", styles['Title']),
+        Paragraph(f"{escape(values['code'])} - v{escape(values['version'])}", styles['Heading3']),
+        Spacer(0, 6 * mm),
+        Table([
+            [Paragraph("<b>Título del Documento:</b><br/>" + escape(values['name']), styles['BodyText']),
+             Paragraph("<b>Área Responsable:</b><br/>" + escape(values['area']), styles['BodyText'])],
+            [Paragraph("<b>Tipo de Documento:</b><br/>" + escape(values['type']), styles['BodyText']),
+             Paragraph("<b>Fecha de Emisión:</b><br/>" + escape(values['issue_date']), styles['BodyText'])],
+        ], colWidths=['50%', '50%']),
+    ]
+    if values['description']:
+        story += [Spacer(0, 4 * mm), Paragraph("<b>Descripción / Alcance:</b>", styles['BodyText']),
+                  Paragraph(escape(values['description']), styles['BodyText'])]
+    story += [
+        Paragraph("Firmas de Autorización", styles['Heading2']),
+        Table([["Rol", "Usuario", "Fecha", "Firma Digital"]] + values['signatures'], colWidths=['30%', '30%', '20%', '20%'], style=grid),
+        Paragraph("Historial de Cambios y Versiones", styles['Heading2']),
+        Table([["Fecha", "Versión", "Usuario", "Detalle / Motivo"]] + [
+            [log['date'], log['version'], Paragraph(escape(log['user']), small),
+             Paragraph(f"<font color='red'><b>{escape(log['action'])}</b></font>" if log['type'] == 'reject' else escape(log['action']), small)]
+            for log in values['audit_trail']
+        ], colWidths=['18%', '10%', '22%', '50%'], repeatRows=1, style=grid),
+        Spacer(0, 8 * mm),
+        Paragraph("Este documento ha sido generado electrónicamente por el sistema de gestión de calidad. "
+                  "Cualquier copia impresa se considera \"Copia No Controlada\".", small),
+    ]
+    pdf.build(story)
+    return out.getvalue()
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    def get_full_audit_trail(self):
+        """Eventos de todas las versiones del código (creación, revisión, aprobación y rechazos), en orden"""
+        self.ensure_one()
+        versions = self | self.history_ids
+        trail = []
+        for doc in versions:
+            trail.append({'date': doc.create_date, 'version': doc.version, 'user': doc.owner_id.name or '', 'type': 'create',
+                          'action': f"Creación de la versión ({doc.change_reason})" if doc.change_reason else "Creación de la versión"})
+            if doc.review_date:
+                trail.append({'date': doc.review_date, 'version': doc.version, 'user': doc.reviewed_by_id.name or '', 'type': 'review',
+                              'action': "Visto bueno de revisión"})
+            if doc.approval_date:
+                trail.append({'date': doc.approval_date, 'version': doc.version, 'user': doc.approved_by_id.name or '', 'type': 'approve',
+                              'action': "Aprobación y publicación"})
+        rejections = self.env['mail.message'].sudo().search([
+            ('model', '=', self._name), ('res_id', 'in', versions.ids), ('body', 'ilike', REJECTION_MARK),
+        ])
+        version_by_id = {doc.id: doc.version for doc in versions}
+        for message in rejections:
+            trail.append({'date': message.date, 'version': version_by_id.get(message.res_id, ''), 'user': message.author_id.name or '',
+                          'type': 'reject', 'action': html2plaintext(message.body).replace('❌', '').strip()})
+        return sorted(trail, key=lambda log: log['date'])
+
+    def _get_certificate_values(self):
+        self.ensure_one()
+        signatures = [["Propietario / Autor", self.owner_id.name or '', format_date(self.env, self.create_date), "Creado"]]
+        if self.reviewed_by_id:
+            signatures.append(["Revisor Técnico", self.reviewed_by_id.name, format_datetime(self.env, self.review_date), "Validado"])
+        if self.approved_by_id:
+            signatures.append(["Aprobación Final", self.approved_by_id.name, format_datetime(self.env, self.approval_date), "Aprobado"])
+        return {
+            'company': self.env.company.name,
+            'code': self.code or '',
+            'version': self.version or '',
+            'name': self.name or '',
+            'area': f"{self.area_id.name} ({self.area_id.code})",
+            'type': self.type_id.name or '',
+            'issue_date': format_date(self.env, self.issue_date) if self.issue_date else '',
+            'description': self.description or '',
+            'signatures': signatures,
+            'audit_trail': [dict(log, date=format_datetime(self.env, log['date'])) for log in self.get_full_audit_trail()],
+        }
+
+    def _render_certificate_pdf(self):
+        """Motor elegido con 'custom_document_control.certificate_engine': 'qweb' (por defecto) o 'reportlab'"""
+        engine = self.env['ir.config_parameter'].sudo().get_param('custom_document_control.certificate_engine', 'qweb')
+        if engine == 'reportlab' and SimpleDocTemplate:
+            try:
+                return render_certificate(self._get_certificate_values())
+            except LayoutError as e:
+                # Un texto que no cabe en la página (p. ej. una descripción enorme)
+                raise UserError(f"No se pudo generar el certificado: {e}") from e
+        return super()._render_certificate_pdf()
+
+    def action_view_certificate(self):
+        engine = self.env['ir.config_parameter'].sudo().get_param('custom_document_control.certificate_engine', 'qweb')
+        if engine != 'reportlab' or not SimpleDocTemplate:
+            return super().action_view_certificate()
+        self._generate_certificate()
+        attachment = self._get_certificate_attachment()
+        if not attachment:
+            raise UserError("No se pudo generar el certificado; revisa el registro del servidor e inténtalo de nuevo.")
+        return {'type': 'ir.actions.act_url', 'url': f'/web/content/{attachment.id}', 'target': 'new'}
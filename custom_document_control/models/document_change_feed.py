@@ -0,0 +1,105 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from datetime import timedelta
+
+from .document_folder_acl_log import lock_commit_order
+
+
+class DocumentChangeFeed(models.Model):
+    """
+    Última secuencia de cambio de cada documento, asignada al confirmar y en orden de commit
+    (a costa de confirmar de a uno las transacciones que cambian documentos, ver lock_commit_order).
+    Una fila por documento (se reemplaza en cada cambio); las bajas quedan como lápidas
+    ('deleted') hasta que vence su retención.
+    """
+    _name = 'document.change.feed'
+    _description = 'Secuencia de Cambios de Documentos'
+    _log_access = False
+    _order = 'sequence'
+
+    document_ref = fields.Integer('ID Documento', required=True, readonly=True)
+    sequence = fields.Integer('Secuencia', required=True, readonly=True, index=True)
+    deleted = fields.Boolean('Borrado', readonly=True)
+    date = fields.Datetime('Fecha', required=True, readonly=True)
+
+    def init(self):
+        cr = self.env.cr
+        tools.create_unique_index(cr, 'document_change_feed_document_ref_uniq', self._table, ['document_ref'])
+        cr.execute("CREATE SEQUENCE IF NOT EXISTS document_change_feed_seq")
+        # Documentos existentes al instalar: entran en el orden en que se escribieron
+        cr.execute("""
+            INSERT INTO document_change_feed (document_ref, sequence, deleted, date)
+            SELECT id, nextval('document_change_feed_seq'), FALSE, now() at time zone 'UTC'
+              FROM (SELECT id FROM document_control ORDER BY write_date, id) ordered
+            ON CONFLICT (document_ref) DO NOTHING
+        """)
+
+    @api.model
+    def _register(self, document_ids, deleted=False):
+        pending = self.env.cr.precommit.data.setdefault('custom_document_control.change_feed', {})
+        if not pending:
+            self.env.cr.precommit.add(self._assign_sequences)
+        for document_id in document_ids:
+            pending[document_id] = deleted
+
+    @api.model
+    def _assign_sequences(self):
+        pending = self.env.cr.precommit.data.pop('custom_document_control.change_feed', {})
+        if not pending:
+            return
+        ids = sorted(pending)
+        # Los commits que cambian documentos se confirman de a uno desde aquí hasta el COMMIT
+        # (ver lock_commit_order); los de la bitácora de permisos usan otro bloqueo
+        lock_commit_order(self.env.cr, self._name)
+        self.env.cr.execute(SQL("""
+            INSERT INTO document_change_feed (document_ref, sequence, deleted, date)
+            SELECT id, nextval('document_change_feed_seq'), deleted, %s
+              FROM (SELECT * FROM unnest(%s::int[], %s::bool[]) AS t(id, deleted) ORDER BY id) ordered
+            ON CONFLICT (document_ref) DO UPDATE
+            SET sequence = EXCLUDED.sequence, deleted = EXCLUDED.deleted, date = EXCLUDED.date
+        """, fields.Datetime.now(), ids, [pending[i] for i in ids]))
+
+    @api.model
+    def _get_changes(self, after, limit):
+        """[(secuencia, id de documento, borrado)] confirmados después de 'after'"""
+        self.env.cr.execute(SQL("""
+            SELECT sequence, document_ref, deleted FROM document_change_feed
+             WHERE sequence > %s ORDER BY sequence LIMIT %s
+        """, after, limit))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _get_pruned_sequence(self):
+        """Cursores por debajo de este valor pueden haber perdido lápidas: hay que recargar desde cero"""
+        return int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.feed_pruned_sequence', 0))
+
+    @api.autovacuum
+    def _gc_tombstones(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        days = int(ICP.get_param('custom_document_control.feed_tombstone_days', 90))
+        self.env.cr.execute(SQL("""
+            DELETE FROM document_change_feed WHERE deleted AND date < %s RETURNING sequence
+        """, fields.Datetime.now() - timedelta(days=days)))
+        pruned = [row[0] for row in self.env.cr.fetchall()]
+        if pruned:
+            ICP.set_param('custom_document_control.feed_pruned_sequence', max(max(pruned), self._get_pruned_sequence()))
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['document.change.feed']._register(records.ids)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['document.change.feed']._register(self.ids)
+        return res
+
+    def unlink(self):
+        self.env['document.change.feed']._register(self.ids, deleted=True)
+        return super().unlink()
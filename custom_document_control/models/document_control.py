@@ -2,19 +2,23 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 import base64
-import io
 import csv
 import openai
 import re
 import html
+import urllib.parse
+import logging
+
+from .document_perf_stat import profiled
+from .watermark import PyPdfError, stamp_pdf
 
 try:
-    from pypdf import PdfReader, PdfWriter
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter
+    from pypdf import PdfReader
 except ImportError:
     PdfReader = None
 
+_logger = logging.getLogger(__name__)
+
 # ==========================================
 # 1. CONFIGURACIÓN
 # ==========================================
@@ -56,6 +60,32 @@ class DocumentFolderAccess(models.Model):
         ('write', 'Lectura y Escritura')
     ], string='Nivel', default='read', required=True)
 
+    # Cambios directos sobre los permisos (fuera de la ficha de carpeta) -> bitácora
+    def _log_acl_change(self, folders, operation):
+        AclLog = self.env['document.folder.acl.log']
+        before = AclLog._get_acl_snapshot(folders)
+        res = operation()
+        AclLog._log_changes(before, AclLog._get_acl_snapshot(folders.exists()))
+        return res
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if self.env.context.get('document_acl_logged'):
+            return super().create(vals_list)
+        folders = self.env['document.folder'].browse({v['folder_id'] for v in vals_list if v.get('folder_id')})
+        return self._log_acl_change(folders, lambda: super(DocumentFolderAccess, self).create(vals_list))
+
+    def write(self, vals):
+        if self.env.context.get('document_acl_logged'):
+            return super().write(vals)
+        folders = self.folder_id | self.env['document.folder'].browse(vals.get('folder_id') or [])
+        return self._log_acl_change(folders, lambda: super(DocumentFolderAccess, self).write(vals))
+
+    def unlink(self):
+        if self.env.context.get('document_acl_logged'):
+            return super().unlink()
+        return self._log_acl_change(self.folder_id, lambda: super(DocumentFolderAccess, self).unlink())
+
 class DocumentFolder(models.Model):
     _name = 'document.folder'
     _description = 'Carpetas'
@@ -130,6 +160,7 @@ class DocumentFolder(models.Model):
         return new_access, new_groups
 
     @api.model
+    @profiled('document.folder.create')
     def create(self, vals):
         """Al crear, si tiene padre, heredamos sus permisos automáticamente"""
         if vals.get('parent_id'):
@@ -142,8 +173,14 @@ class DocumentFolder(models.Model):
             if p_groups and not vals.get('allowed_group_ids'):
                 vals['allowed_group_ids'] = p_groups
                 
-        return super(DocumentFolder, self).create(vals)
+        record = super(DocumentFolder, self.with_context(document_acl_logged=True)).create(vals)
+
+        # Bitácora de permisos: la carpeta nueva otorga sus permisos iniciales
+        AclLog = self.env['document.folder.acl.log']
+        AclLog._log_changes({}, AclLog._get_acl_snapshot(record))
+        return record.with_env(self.env)
 
+    @profiled('document.folder.write')
     def write(self, vals):
         """
         1. Si cambiamos de padre -> Actualizamos nuestros permisos.
@@ -160,8 +197,16 @@ class DocumentFolder(models.Model):
                 if p_groups:
                     vals['allowed_group_ids'] = p_groups
 
+        # Foto de permisos efectivos antes del cambio (para la bitácora)
+        AclLog = self.env['document.folder.acl.log']
+        acl_fields = {'access_ids', 'allowed_group_ids', 'parent_id'}
+        acl_before = AclLog._get_acl_snapshot(self) if acl_fields & set(vals) else None
+
         # Ejecutamos la escritura normal
-        res = super(DocumentFolder, self).write(vals)
+        res = super(DocumentFolder, self.with_context(document_acl_logged=True)).write(vals)
+
+        if acl_before is not None:
+            AclLog._log_changes(acl_before, AclLog._get_acl_snapshot(self))
 
         # CASO 2: Cascada hacia abajo (Si cambié mis permisos, actualizo a mis hijos)
         if 'access_ids' in vals or 'allowed_group_ids' in vals:
@@ -182,6 +227,16 @@ class DocumentFolder(models.Model):
                         if child_vals:
                             child.write(child_vals)
         return res
+
+    def unlink(self):
+        """Al borrar, revocamos en la bitácora los permisos de la carpeta y de toda su descendencia"""
+        AclLog = self.env['document.folder.acl.log']
+        subtree = self.sudo().search([('id', 'child_of', self.ids)])
+        before = AclLog._get_acl_snapshot(subtree)
+        names = {f.id: f.complete_name for f in subtree.sudo()}
+        res = super(DocumentFolder, self.with_context(document_acl_logged=True)).unlink()
+        AclLog._log_changes(before, {}, folder_names=names)
+        return res
     @api.constrains('folder_id')
     def _check_folder_write_permission(self):
         """Bloquea guardar si el usuario solo tiene permiso de lectura en la carpeta"""
@@ -214,7 +269,7 @@ class DocumentControl(models.Model):
     _name = 'document.control'
     _description = 'Control de Documentos'
     _inherit = ['mail.thread', 'mail.activity.mixin']
-    _order = 'code desc, version desc'
+    _order = 'code desc, version_major desc, version_minor desc'
 
     name = fields.Char(string='Título', required=True, tracking=True)
     code = fields.Char(string='Código', default='Borrador', readonly=True, index=True)
@@ -230,6 +285,9 @@ class DocumentControl(models.Model):
     sequence_number = fields.Integer(readonly=True)
 
     version = fields.Char(default='1.0', required=True, tracking=True)
+    # Versión estructurada (mayor, menor): '1.10' va después de '1.9'
+    version_major = fields.Integer(compute='_compute_version_parts', store=True)
+    version_minor = fields.Integer(compute='_compute_version_parts', store=True)
     change_reason = fields.Text(tracking=True)
     source_document_id = fields.Many2one('document.control', readonly=True)
     active_revision_id = fields.Many2one('document.control', readonly=True)
@@ -336,10 +394,34 @@ class DocumentControl(models.Model):
     def _compute_history_ids(self):
         for r in self:
             if r.code and r.code != 'Borrador':
-                r.history_ids = self.search([('code', '=', r.code), ('id', '!=', r.id)], order='version desc')
+                r.history_ids = self.search([('code', '=', r.code), ('id', '!=', r.id)], order='version_major desc, version_minor desc')
             else:
                 r.history_ids = False
 
+    @staticmethod
+    def _parse_version(version):
+        """'1.9' -> (1, 9); '2' -> (2, 0); cualquier otro formato -> None"""
+        major, _sep, minor = (version or '').strip().partition('.')
+        if not major.isdigit() or (_sep and not minor.isdigit()):
+            return None
+        return int(major), int(minor or 0)
+
+    @api.depends('version')
+    def _compute_version_parts(self):
+        for r in self:
+            parts = self._parse_version(r.version)
+            if parts is None:
+                # Versiones antiguas con otro formato: no se frena la actualización, van al final del orden
+                _logger.warning("Documento %s con versión inválida '%s': se ordena como 0.0", r.id, r.version)
+                parts = (0, 0)
+            r.version_major, r.version_minor = parts
+
+    @api.constrains('version')
+    def _check_version(self):
+        for r in self:
+            if self._parse_version(r.version) is None:
+                raise ValidationError(f"Versión inválida '{r.version}': debe ser 'mayor.menor' numérico (por ejemplo 1.0).")
+
     @api.constrains('reviewer_ids', 'approver_ids')
     def _check_conflict(self):
         for r in self:
@@ -358,7 +440,9 @@ class DocumentControl(models.Model):
             if r.pdf_file and r.pdf_filename:
                 url = f"/web/content/document.control/{r.id}/pdf_file"
                 if r.pdf_filename.lower().endswith('.pdf'):
-                    r.preview_html = f'<iframe src="{url}" width="100%" height="85vh" style="border:none;"></iframe>'
+                    # pdf.js pide el PDF por rangos: con la copia linealizada muestra la 1ª página enseguida
+                    viewer = f"/web/static/lib/pdfjs/web/viewer.html?file={urllib.parse.quote(r._get_preview_url(), safe='')}"
+                    r.preview_html = f'<iframe src="{viewer}" width="100%" height="85vh" style="border:none;"></iframe>'
                 else:
                     r.preview_html = f'<div class="text-center p-3"><a href="{url}" class="btn btn-primary">Descargar</a></div>'
             elif r.editable_file:
@@ -390,41 +474,47 @@ class DocumentControl(models.Model):
 
     def _apply_watermark(self, text, prefix):
         if not PdfReader or not self.pdf_file: return
+        ICP = self.env['ir.config_parameter'].sudo()
+        # PDF grandes: páginas en paralelo en un proceso auxiliar fuera del worker (ver watermark.py)
         try:
-            data = base64.b64decode(self.pdf_file)
-            reader = PdfReader(io.BytesIO(data))
-            writer = PdfWriter()
-            packet = io.BytesIO()
-            c = canvas.Canvas(packet, pagesize=letter)
-            c.setFont("Helvetica-Bold", 50)
-            c.setFillColorRGB(0.5, 0.5, 0.5, 0.2)
-            c.saveState()
-            c.translate(300, 400); c.rotate(45); c.drawCentredString(0, 0, text)
-            c.restoreState()
-            c.save()
-            packet.seek(0)
-            water = PdfReader(packet)
-            for page in reader.pages:
-                page.merge_page(water.pages[0])
-                writer.add_page(page)
-            out = io.BytesIO()
-            writer.write(out)
-            self.write({'pdf_file': base64.b64encode(out.getvalue()), 'pdf_filename': f"{prefix} - {self.pdf_filename}"})
-        except: pass
+            out = stamp_pdf(
+                base64.b64decode(self.pdf_file), text,
+                parallel_threshold=int(ICP.get_param('custom_document_control.watermark_parallel_pages', 200)),
+                max_workers=int(ICP.get_param('custom_document_control.watermark_workers', 0)) or None,
+            )
+        except PyPdfError:
+            # PDF dañado o cifrado: se publica sin marca, pero queda registrado
+            _logger.warning("No se pudo aplicar la marca de agua '%s' al documento %s", text, self.id, exc_info=True)
+            return
+        self.write({'pdf_file': base64.b64encode(out), 'pdf_filename': f"{prefix} - {self.pdf_filename}"})
+
+    def _render_certificate_pdf(self):
+        """PDF del certificado (QWeb + wkhtmltopdf); document_certificate.py agrega el motor reportlab"""
+        pdf, _ = self.env.ref('custom_document_control.action_report_document_certificate')._render_qweb_pdf(self.id)
+        return pdf
+
+    def _get_certificate_attachment(self):
+        self.ensure_one()
+        fname = f"Certificado - {self.code} - v{self.version}.pdf"
+        return self.env['ir.attachment'].search([('name', '=', fname), ('res_model', '=', self._name), ('res_id', '=', self.id)], limit=1)
 
     def _generate_certificate(self):
         self.ensure_one()
         fname = f"Certificado - {self.code} - v{self.version}.pdf"
-        if self.env['ir.attachment'].search([('name', '=', fname), ('res_id', '=', self.id)]): return
+        if self._get_certificate_attachment(): return
         try:
-            pdf, _ = self.env.ref('custom_document_control.action_report_document_certificate')._render_qweb_pdf(self.id)
-            self.env['ir.attachment'].create({'name': fname, 'datas': base64.b64encode(pdf), 'res_model': 'document.control', 'res_id': self.id})
-        except: pass
+            pdf = self._render_certificate_pdf()
+        except (UserError, OSError):
+            # Sin wkhtmltopdf o falla del motor: el documento se publica igual y el certificado se reintenta al verlo
+            _logger.warning("No se pudo generar el certificado del documento %s", self.id, exc_info=True)
+            return
+        self.env['ir.attachment'].create({'name': fname, 'datas': base64.b64encode(pdf), 'res_model': 'document.control', 'res_id': self.id})
 
     def action_view_certificate(self):
         self._generate_certificate()
         return {'type': 'ir.actions.report', 'report_name': 'custom_document_control.report_document_certificate_template', 'res_model': 'document.control', 'res_ids': [self.id]}
 
+    @profiled('action_start_flow')
     def action_start_flow(self):
         if self.code == 'Borrador':
             prefix = f"{self.area_id.code}-{self.category_id.code or 'EXT'}-{self.type_id.code}-"
@@ -437,31 +527,108 @@ class DocumentControl(models.Model):
         self.write({'state': 'approved', 'issue_date': fields.Date.today()})
         self._generate_certificate()
 
+    @profiled('action_submit_review')
     def action_submit_review(self):
         if self.revision_type == 'minor' and not self.approver_ids: raise ValidationError("Faltan Aprobadores")
         if self.revision_type == 'major' and not self.reviewer_ids: raise ValidationError("Faltan Revisores")
         self.state = 'validate' if self.revision_type == 'minor' else 'review'
 
+    @profiled('action_review_pass')
     def action_review_pass(self):
         self.write({'state': 'validate', 'reviewed_by_id': self.env.user.id, 'review_date': fields.Datetime.now()})
 
+    @profiled('action_approve')
     def action_approve(self):
         self._apply_watermark("COPIA CONTROLADA", "APROBADO")
         self.write({'state': 'approved', 'issue_date': fields.Date.today(), 'approved_by_id': self.env.user.id, 'approval_date': fields.Datetime.now()})
         self._generate_certificate()
-        if self.source_document_id: self.source_document_id.write({'state': 'obsolete', 'active_revision_id': False})
+        if self.source_document_id:
+            # La marca OBSOLETO se aplica recién ahora: si la revisión no se aprueba, el original queda intacto
+            self.source_document_id._apply_watermark("OBSOLETO", "OBSOLETO")
+            self.source_document_id.write({'state': 'obsolete', 'active_revision_id': False})
+
+    def _close_activity_for_current_user(self, feedback=False):
+        """Cierra (marca como hechas) las actividades del usuario actual en todos los documentos de una vez"""
+        activities = self.env['mail.activity'].search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+            ('user_id', '=', self.env.user.id),
+        ])
+        if activities:
+            activities.action_feedback(feedback=feedback)
+
+    def _schedule_owner_activities(self, summary, note, activity_xmlid='mail.mail_activity_data_todo'):
+        """Crea una actividad para el dueño de cada documento con un único create"""
+        if not self:
+            return self.env['mail.activity']
+        activity_type = self.env.ref(activity_xmlid)
+        model_id = self.env['ir.model']._get_id(self._name)
+        deadline = fields.Date.context_today(self)
+        return self.env['mail.activity'].create([{
+            'activity_type_id': activity_type.id,
+            'res_model_id': model_id,
+            'res_id': doc.id,
+            'user_id': doc.owner_id.id,
+            'summary': summary,
+            'note': note,
+            'date_deadline': deadline,
+        } for doc in self])
 
     def action_reject(self):
         return {'name': 'Rechazar', 'type': 'ir.actions.act_window', 'res_model': 'document.reject.wizard', 'view_mode': 'form', 'target': 'new', 'context': {'default_document_id': self.id}}
 
+    def _get_revision_vals(self, revision_type):
+        """Solo los metadatos que necesita la nueva revisión (sin archivos, seguidores ni mensajes)"""
+        self.ensure_one()
+        if self._parse_version(self.version) is None:
+            raise ValidationError(f"{self.display_name}: versión inválida '{self.version}', corríjala antes de crear la revisión.")
+        major, minor = self._parse_version(self.version)
+        major, minor = (major + 1, 0) if revision_type == 'major' else (major, minor + 1)
+        return {
+            'name': self.name,
+            'code': self.code,
+            'sequence_number': self.sequence_number,
+            'version': f"{major}.{minor}",
+            'area_id': self.area_id.id,
+            'category_id': self.category_id.id,
+            'type_id': self.type_id.id,
+            'folder_id': self.folder_id.id,
+            'document_scope': self.document_scope,
+            'description': self.description,
+            'owner_id': self.owner_id.id,
+            # (6, ids): solo filas en la tabla de relación, sin leer los registros
+            'tag_ids': [(6, 0, self.tag_ids.ids)],
+            'reviewer_ids': [(6, 0, self.reviewer_ids.ids)],
+            'approver_ids': [(6, 0, self.approver_ids.ids)],
+            'state': 'upload',
+            'revision_type': revision_type,
+            'source_document_id': self.id,
+        }
+
+    @profiled('_create_rev')
+    def _create_revisions(self, revision_type):
+        """Crea la revisión de todos los documentos con un único create"""
+        invalid = self.filtered(lambda d: d.state != 'approved' or d.active_revision_id)
+        if invalid:
+            raise UserError("Solo se pueden revisar documentos publicados sin otra revisión en curso:\n" + "\n".join(invalid.mapped('display_name')))
+        self.fetch(['name', 'code', 'sequence_number', 'version', 'area_id', 'category_id', 'type_id', 'folder_id',
+                    'document_scope', 'description', 'owner_id', 'tag_ids', 'reviewer_ids', 'approver_ids'])
+        revisions = self.with_context(mail_create_nosubscribe=True, mail_create_nolog=True, tracking_disable=True).create(
+            [doc._get_revision_vals(revision_type) for doc in self])
+        # Por write(): cada documento apunta a una revisión distinta y así se enteran los demás módulos
+        # (avisos de refresco, tablero, pendientes, transiciones, feed de cambios)
+        for doc, revision in zip(self, revisions):
+            doc.write({'active_revision_id': revision.id})
+        return revisions.with_env(self.env)
+
     def _create_rev(self, t):
-        self._apply_watermark("OBSOLETO", "OBSOLETO")
-        v = float(self.version) if self.version.replace('.','').isdigit() else 1.0
-        nv = f"{int(v)+1}.0" if t == 'major' else f"{v+0.1:.1f}"
-        new = self.copy({'version': nv, 'state': 'upload', 'source_document_id': self.id, 'revision_type': t, 'editable_file': False, 'pdf_file': False})
-        self.active_revision_id = new.id
+        new = self._create_revisions(t)
         return {'type': 'ir.actions.act_window', 'res_model': 'document.control', 'res_id': new.id, 'view_mode': 'form', 'target': 'current'}
 
+    def action_create_minor_revs(self):
+        revisions = self._create_revisions('minor')
+        return {'name': 'Revisiones creadas', 'type': 'ir.actions.act_window', 'res_model': 'document.control', 'view_mode': 'list,form', 'domain': [('id', 'in', revisions.ids)]}
+
     def action_create_minor_rev(self): return self._create_rev('minor')
     def action_create_major_rev(self): return self._create_rev('major')
     def action_open_from_list(self): return {'type': 'ir.actions.act_window', 'res_model': 'document.control', 'res_id': self.id, 'view_mode': 'form', 'target': 'current'}
@@ -0,0 +1,179 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.tools import SQL
+from collections import Counter
+from dateutil.relativedelta import relativedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Campos del documento que cambian su fila en el tablero
+DASHBOARD_DEPENDS = {'state', 'folder_id', 'area_id', 'type_id', 'approval_date', 'issue_date', 'last_review_date'}
+
+DASHBOARD_KEY = "folder_id, area_id, type_id, state, overdue, COALESCE(approval_month, '1970-01-01'::date)"
+
+
+class DocumentDashboardStat(models.Model):
+    """
+    Tablero materializado: conteo de documentos por (carpeta, área, tipo, estado, revisión vencida, mes de aprobación).
+    Se actualiza por deltas al confirmar cada transacción (incluidos los cambios de próxima revisión hechos
+    por SQL) y se reconstruye cada noche (la marca de 'vencida' también depende del paso de los días).
+    """
+    _name = 'document.dashboard.stat'
+    _description = 'Tablero de Documentos'
+    _log_access = False
+    _order = 'approval_month desc, state'
+
+    folder_id = fields.Many2one('document.folder', string='Carpeta', readonly=True, ondelete='cascade')
+    area_id = fields.Many2one('document.area', string='Área', readonly=True, ondelete='cascade')
+    type_id = fields.Many2one('document.type', string='Tipo', readonly=True, ondelete='cascade')
+    state = fields.Selection(selection=lambda self: self.env['document.control']._fields['state'].selection, string='Estado', readonly=True)
+    overdue = fields.Boolean('Revisión vencida', readonly=True)
+    approval_month = fields.Date('Mes de aprobación', readonly=True)
+    doc_count = fields.Integer('Documentos', readonly=True, aggregator='sum')
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS document_dashboard_stat_key_uniq ON {self._table} ({DASHBOARD_KEY})
+        """)
+        # Solo al instalar (tabla vacía): en cada actualización sería un bloqueo y un recuento completo;
+        # la conciliación nocturna (_rebuild) ya corrige cualquier desvío
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.fetchone():
+            self._refresh(self.env.cr)
+
+    @api.model
+    def _refresh(self, cr):
+        """Recuento completo en el cursor dado; el bloqueo va antes del primer SELECT de la transacción"""
+        cr.execute(SQL("LOCK TABLE %s IN SHARE ROW EXCLUSIVE MODE", SQL.identifier(self._table)))
+        cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        cr.execute(SQL("""
+            INSERT INTO %s (folder_id, area_id, type_id, state, overdue, approval_month, doc_count)
+            SELECT folder_id, area_id, type_id, COALESCE(state, 'draft'),
+                   (state = 'approved' AND next_review_date < %s) IS TRUE,
+                   date_trunc('month', approval_date)::date,
+                   COUNT(*)
+              FROM document_control
+             GROUP BY 1, 2, 3, 4, 5, 6
+        """, SQL.identifier(self._table), fields.Date.today()))
+        return cr.rowcount
+
+    @api.model
+    def _rebuild(self):
+        """
+        Conciliación nocturna (también recalcula 'vencida'), en una transacción propia. Las lecturas no se
+        bloquean, pero las que aplican deltas sí: su paso final de confirmación espera a que termine el
+        recuento (un GROUP BY sobre document_control) y luego suma sobre el recuento nuevo.
+        """
+        self.env.flush_all()
+        with self.env.registry.cursor() as cr:
+            _logger.info("Tablero de documentos reconstruido: %s filas", self._refresh(cr))
+
+    # =========================================================
+    # DELTAS
+    # =========================================================
+    @api.model
+    def _get_dashboard_keys(self, documents, next_review_dates=None):
+        """next_review_dates: {id: fecha} para calcular 'vencida' con otra fecha que la actual (la anterior)"""
+        today = fields.Date.today()
+        review_date = (lambda doc: next_review_dates[doc.id]) if next_review_dates else (lambda doc: doc.next_review_date)
+        return [(
+            doc.folder_id.id or None,
+            doc.area_id.id or None,
+            doc.type_id.id or None,
+            doc.state or 'draft',
+            bool(doc.state == 'approved' and review_date(doc) and review_date(doc) < today),
+            doc.approval_date.date().replace(day=1) if doc.approval_date else None,
+        ) for doc in documents.sudo()]
+
+    @api.model
+    def _register_delta(self, keys, sign):
+        deltas = self.env.cr.precommit.data.setdefault('custom_document_control.dashboard', Counter())
+        if not deltas:
+            self.env.cr.precommit.add(self._apply_deltas)
+        for key in keys:
+            deltas[key] += sign
+
+    @api.model
+    def _apply_deltas(self):
+        deltas = self.env.cr.precommit.data.pop('custom_document_control.dashboard', Counter())
+        rows = [key + (delta,) for key, delta in deltas.items() if delta]
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        self.env.cr.execute(SQL(f"""
+            INSERT INTO document_dashboard_stat (folder_id, area_id, type_id, state, overdue, approval_month, doc_count)
+            SELECT * FROM unnest(%s::int[], %s::int[], %s::int[], %s::varchar[], %s::bool[], %s::date[], %s::int[])
+            ON CONFLICT ({DASHBOARD_KEY}) DO UPDATE
+            SET doc_count = document_dashboard_stat.doc_count + EXCLUDED.doc_count
+        """, *[list(column) for column in columns]))
+
+    # =========================================================
+    # KPIs
+    # =========================================================
+    @api.model
+    def _get_kpis(self, months=12):
+        """KPIs del usuario actual: suma sobre las filas de sus carpetas legibles (sin tocar document_control)"""
+        folder_ids = list(self.env['document.folder.count']._get_readable_folder_ids())
+        first_month = fields.Date.today().replace(day=1) - relativedelta(months=months - 1)
+
+        def grouped(column, extra=SQL("TRUE")):
+            self.env.cr.execute(SQL("""
+                SELECT %s, SUM(doc_count) FROM document_dashboard_stat
+                 WHERE folder_id = ANY(%s) AND doc_count > 0 AND %s
+                 GROUP BY 1 ORDER BY 1
+            """, SQL.identifier(column), folder_ids, extra))
+            return self.env.cr.fetchall()
+
+        areas = {area.id: area.code for area in self.env['document.area'].sudo().search([])}
+        types = {doc_type.id: doc_type.code for doc_type in self.env['document.type'].sudo().search([])}
+        live = SQL("state != 'obsolete'")
+        return {
+            'by_state': dict(grouped('state')),
+            'by_area': {areas.get(key, key): count for key, count in grouped('area_id', live)},
+            'by_type': {types.get(key, key): count for key, count in grouped('type_id', live)},
+            'overdue_reviews': sum(count for overdue, count in grouped('overdue', SQL("state = 'approved'")) if overdue),
+            'approvals_per_month': {
+                fields.Date.to_string(month)[:7]: count
+                for month, count in grouped('approval_month', SQL("approval_month >= %s", first_month))
+            },
+        }
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        Stat = self.env['document.dashboard.stat']
+        Stat._register_delta(Stat._get_dashboard_keys(records), 1)
+        return records
+
+    def write(self, vals):
+        if not DASHBOARD_DEPENDS & set(vals):
+            return super().write(vals)
+        Stat = self.env['document.dashboard.stat']
+        before = Stat._get_dashboard_keys(self)
+        # La próxima revisión de estos documentos cambia dentro del write: la cubren las claves antes/después
+        res = super(DocumentControl, self.with_context(dashboard_tracked_ids=tuple(self.ids))).write(vals)
+        Stat._register_delta(before, -1)
+        Stat._register_delta(Stat._get_dashboard_keys(self), 1)
+        return res
+
+    @api.model
+    def _recompute_next_review_dates(self, where):
+        """Cambios de intervalo en tipos o áreas: 'vencida' puede cambiar en documentos que nadie escribió"""
+        changed = super()._recompute_next_review_dates(where)
+        tracked = set(self.env.context.get('dashboard_tracked_ids', ()))
+        docs = self.browse([doc_id for doc_id in changed if doc_id not in tracked])
+        if docs:
+            Stat = self.env['document.dashboard.stat']
+            Stat._register_delta(Stat._get_dashboard_keys(docs, next_review_dates=changed), -1)
+            Stat._register_delta(Stat._get_dashboard_keys(docs), 1)
+        return changed
+
+    def unlink(self):
+        Stat = self.env['document.dashboard.stat']
+        Stat._register_delta(Stat._get_dashboard_keys(self), -1)
+        return super().unlink()
@@ -0,0 +1,111 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.tools import config
+import hashlib
+import os
+import shutil
+import tempfile
+
+from .document_archive import evict_lru, track_cache_insert
+from .watermark import PdfReader, make_footer_stamp, make_header_stamp, stamp_fitted
+
+DEFAULT_HEADER = "COPIA NO CONTROLADA AL IMPRIMIR"
+DEFAULT_FOOTER = "Descargado por {user} el {date}"
+
+
+def render_footer(template, **values):
+    """Reemplaza solo los marcadores conocidos: cualquier otra llave de la plantilla queda tal cual"""
+    for key, value in values.items():
+        template = template.replace('{%s}' % key, value)
+    return template
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_cached(path):
+    """Contenido de la caché (y marca de último uso para el LRU), o None si no está o la desalojó otro worker"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    @api.model
+    def _get_download_cache_dir(self):
+        path = os.path.join(config['data_dir'], 'document_download_cache', self.env.cr.dbname)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @api.model
+    def _get_download_cache_limit(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.download_cache_mb', 2048)) * 1024 * 1024
+
+    def _get_stamped_download(self):
+        """
+        PDF sellado para el usuario actual, con dos niveles de caché en disco (mismo límite LRU):
+        1. Base por (checksum, plantilla): el PDF con la franja fija ya estampada (una vez por versión).
+        2. Copia final por (usuario, día): la base con el pie de nombre y fecha; las descargas repetidas
+           del mismo día no vuelven a estampar.
+        """
+        self.ensure_one()
+        attachment = self._get_pdf_attachment()
+        if not PdfReader or not attachment or attachment.mimetype != 'application/pdf':
+            return None
+        ICP = self.env['ir.config_parameter'].sudo()
+        header = ICP.get_param('custom_document_control.download_stamp_header', DEFAULT_HEADER)
+        footer = ICP.get_param('custom_document_control.download_stamp_footer', DEFAULT_FOOTER)
+        today = fields.Date.context_today(self)
+        text = render_footer(footer, user=self.env.user.name, date=today.strftime('%d/%m/%Y'))
+        template = hashlib.sha1(header.encode()).hexdigest()[:12]
+        stamp = hashlib.sha1(f'{header}\0{text}'.encode()).hexdigest()[:12]
+        cache_dir = self._get_download_cache_dir()
+        limit = self._get_download_cache_limit()
+
+        user_path = os.path.join(cache_dir, 'users', today.isoformat(), f'{self.env.uid}-{attachment.checksum}-{stamp}.pdf')
+        data = _read_cached(user_path)
+        if data is not None:
+            return data
+
+        base_path = os.path.join(cache_dir, 'base', f'{attachment.checksum}-{template}.pdf')
+        base = _read_cached(base_path)
+        if base is None:
+            base = stamp_fitted(attachment.raw, make_header_stamp, header)
+            _write_atomic(base_path, base)
+            track_cache_insert(cache_dir, len(base), limit)
+
+        data = stamp_fitted(base, make_footer_stamp, text)
+        _write_atomic(user_path, data)
+        track_cache_insert(cache_dir, len(data), limit)
+        return data
+
+    def action_download_stamped(self):
+        self.ensure_one()
+        return {'type': 'ir.actions.act_url', 'url': f'/document_control/download/{self.id}', 'target': 'self'}
+
+    @api.autovacuum
+    def _gc_download_cache(self):
+        """Barrido periódico (además del desalojo al insertar): copias por usuario de días pasados y LRU"""
+        cache_dir = self._get_download_cache_dir()
+        users_dir = os.path.join(cache_dir, 'users')
+        today = fields.Date.context_today(self).isoformat()
+        if os.path.isdir(users_dir):
+            # Las copias llevan la fecha en el pie: las de otros días ya no se vuelven a servir
+            for day in os.listdir(users_dir):
+                if day < today:
+                    shutil.rmtree(os.path.join(users_dir, day), ignore_errors=True)
+        evict_lru(cache_dir, self._get_download_cache_limit())
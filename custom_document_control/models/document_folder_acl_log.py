@@ -0,0 +1,145 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+# Nivel de acceso efectivo: 'write' incluye lectura
+ACL_RANK = {'read': 1, 'write': 2}
+
+# Primera mitad de la clave del bloqueo consultivo que ordena por commit las secuencias ('DOCC');
+# la segunda mitad identifica el feed
+COMMIT_ORDER_LOCK = 0x444F4343
+
+
+def lock_commit_order(cr, feed):
+    """
+    Bloqueo del feed 'feed' hasta el fin de la transacción (se toma en precommit). Los números que
+    se asignen después salen en orden de commit: nadie toma uno mayor hasta que esta transacción sea visible.
+    Costo: los commits que escriben en el mismo feed se confirman de a uno (solo el paso final, desde
+    el bloqueo hasta el COMMIT); cada feed tiene su propio bloqueo y no espera a los demás.
+    """
+    cr.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", [COMMIT_ORDER_LOCK, feed])
+
+
+class DocumentFolderAclLog(models.Model):
+    """
+    Bitácora de cambios de permisos efectivos de carpeta (solo se agregan filas).
+    'sequence' es el número que usan los espejos externos para pedir deltas: se asigna al confirmar,
+    en orden de commit (el id se asigna al insertar y una transacción larga podría quedar atrás).
+    user_ref = 0 significa 'todos' (carpeta sin permisos = pública).
+    """
+    _name = 'document.folder.acl.log'
+    _description = 'Bitácora de Permisos de Carpeta'
+    _order = 'sequence, id'
+
+    folder_ref = fields.Integer('ID Carpeta', required=True, index=True, readonly=True)
+    folder_name = fields.Char('Carpeta', readonly=True)
+    user_ref = fields.Integer('ID Usuario', required=True, readonly=True)
+    user_login = fields.Char('Usuario', readonly=True)
+    operation = fields.Selection([('grant', 'Otorgar'), ('revoke', 'Revocar')], string='Operación', required=True, readonly=True)
+    access_level = fields.Selection([('read', 'Solo Lectura'), ('write', 'Lectura y Escritura')], string='Nivel', readonly=True)
+    sequence = fields.Integer('Secuencia', readonly=True, index=True, copy=False)
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS document_folder_acl_log_commit_seq")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        pending = self.env.cr.precommit.data.setdefault('custom_document_control.acl_log_ids', [])
+        if not pending:
+            self.env.cr.precommit.add(self._assign_sequences)
+        pending.extend(records.ids)
+        return records
+
+    @api.model
+    def _assign_sequences(self):
+        ids = self.env.cr.precommit.data.pop('custom_document_control.acl_log_ids', [])
+        if not ids:
+            return
+        # Serializa solo los commits que cambian permisos (ver lock_commit_order)
+        lock_commit_order(self.env.cr, self._name)
+        self.env.cr.execute(SQL("""
+            UPDATE document_folder_acl_log log SET sequence = s.seq
+              FROM (SELECT id, nextval('document_folder_acl_log_commit_seq') AS seq
+                      FROM (SELECT unnest(%s::int[]) AS id ORDER BY 1) ordered) s
+             WHERE log.id = s.id
+        """, ids))
+        self.invalidate_model(['sequence'])
+
+    @api.model
+    def _get_last_sequence(self):
+        self.env.cr.execute("SELECT COALESCE(MAX(sequence), 0) FROM document_folder_acl_log")
+        return self.env.cr.fetchone()[0]
+
+    def write(self, vals):
+        raise UserError("La bitácora de permisos no se puede modificar.")
+
+    def unlink(self):
+        raise UserError("La bitácora de permisos no se puede borrar.")
+
+    @api.model
+    def _get_acl_snapshot(self, folders):
+        """Permisos efectivos {carpeta: {usuario: nivel}} con una consulta por tabla"""
+        folders = folders.sudo()
+        snapshot = {folder.id: {} for folder in folders}
+        if not folders:
+            return snapshot
+        rows = self.env['document.folder.access'].sudo().search_read(
+            [('folder_id', 'in', folders.ids)], ['folder_id', 'user_id', 'access_level'])
+        for row in rows:
+            acl = snapshot[row['folder_id'][0]]
+            user = row['user_id'][0]
+            if ACL_RANK[row['access_level']] > ACL_RANK.get(acl.get(user), 0):
+                acl[user] = row['access_level']
+        for folder in folders:
+            acl = snapshot[folder.id]
+            if not acl:
+                # Sin permisos explícitos: todos leen y escriben
+                acl[0] = 'write'
+                continue
+            for user in folder.access_user_ids:
+                acl.setdefault(user.id, 'read')
+        return snapshot
+
+    @api.model
+    def _log_changes(self, before, after, folder_names=None):
+        """Compara dos fotos de permisos y agrega una fila por cada diferencia"""
+        vals_list = []
+        for folder_id in sorted(set(before) | set(after)):
+            old, new = before.get(folder_id, {}), after.get(folder_id, {})
+            for user_id in sorted(set(old) | set(new)):
+                if old.get(user_id) == new.get(user_id):
+                    continue
+                vals_list.append({
+                    'folder_ref': folder_id,
+                    'user_ref': user_id,
+                    'operation': 'grant' if user_id in new else 'revoke',
+                    'access_level': new.get(user_id) or old.get(user_id),
+                })
+        if not vals_list:
+            return self.browse()
+        names = dict(folder_names or {})
+        missing = {v['folder_ref'] for v in vals_list} - set(names)
+        names.update((f.id, f.complete_name) for f in self.env['document.folder'].sudo().browse(list(missing)).exists())
+        users = self.env['res.users'].sudo().browse({v['user_ref'] for v in vals_list} - {0})
+        logins = {u.id: u.login for u in users}
+        for vals in vals_list:
+            vals['folder_name'] = names.get(vals['folder_ref'])
+            vals['user_login'] = logins.get(vals['user_ref'], '*')
+        return self.sudo().create(vals_list)
+
+    @api.model
+    def _get_changes(self, since=0, limit=1000):
+        """Deltas confirmados desde una secuencia dada, listos para serializar"""
+        logs = self.sudo().search([('sequence', '>', since)], limit=limit, order='sequence')
+        return [{
+            'sequence': log.sequence,
+            'folder_id': log.folder_ref,
+            'folder': log.folder_name,
+            'user_id': log.user_ref or None,
+            'login': log.user_login,
+            'operation': log.operation,
+            'access_level': log.access_level,
+            'date': fields.Datetime.to_string(log.create_date),
+        } for log in logs]
@@ -0,0 +1,129 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+
+class DocumentFolder(models.Model):
+    _inherit = 'document.folder'
+
+    def _get_move_tops(self):
+        """Solo las carpetas más altas de la selección: sus descendientes se mueven con ellas"""
+        paths = {folder.id: folder.parent_path for folder in self.sudo()}
+        return self.browse([folder_id for folder_id, path in paths.items()
+                            if not any(other != folder_id and path.startswith(other_path) for other, other_path in paths.items())])
+
+    def _get_inherited_acl_sources(self, target, tops):
+        """
+        Reproduce la cascada de write() sobre este subárbol (estructura previa al movimiento) al mover 'tops'
+        bajo 'target' (que tiene permisos):
+        la carpeta movida toma los usuarios y/o grupos que tenga el padre; cada carpeta alcanzada pasa a sus
+        hijas sus usuarios si tiene y sus grupos si tiene (si no, la hija conserva los suyos), y la cascada
+        sigue solo por las carpetas que quedan con usuarios o grupos.
+        Devuelve ({carpeta: carpeta de la que copia usuarios}, {carpeta: carpeta de la que copia grupos});
+        una carpeta de origen nunca se reescribe (es 'target' o una que conserva lo suyo).
+        """
+        folders = (self | target).sudo()
+        has_access = {folder.id: bool(folder.access_ids) for folder in folders}
+        has_groups = {folder.id: bool(folder.allowed_group_ids) for folder in folders}
+        access_src, groups_src = {}, {}
+        effective = {target.id: (target.id, target.id)}
+        for folder in self.sudo().sorted(lambda f: f.parent_path.count('/')):
+            parent = target.id if folder in tops else folder.parent_id.id
+            if parent not in effective:
+                continue  # la cascada no llegó a la carpeta padre
+            parent_access, parent_groups = effective[parent]
+            own_access = own_groups = folder.id
+            if has_access[parent_access]:
+                own_access = access_src[folder.id] = parent_access
+            if has_groups[parent_groups]:
+                own_groups = groups_src[folder.id] = parent_groups
+            if has_access[own_access] or has_groups[own_groups]:
+                effective[folder.id] = (own_access, own_groups)
+        return access_src, groups_src
+
+    def _bulk_move(self, target, dry_run=False):
+        """
+        Mueve estas carpetas (con sus subárboles) bajo 'target' (vacío = raíz) en sentencias de conjunto:
+        parent_path y complete_name de todos los subárboles, y la herencia de permisos del nuevo padre
+        aplicada una vez por subárbol (lo mismo que haría write() carpeta por carpeta, con su cascada).
+        Con dry_run=True no cambia nada y devuelve la vista previa.
+        """
+        tops = self._get_move_tops().sudo()
+        target = target.sudo()
+        if target and any(target.parent_path.startswith(top.parent_path) for top in tops):
+            raise UserError("No se puede mover una carpeta dentro de sí misma o de una de sus subcarpetas.")
+        tops.with_env(self.env).check_access('write')
+        if target:
+            target.with_env(self.env).check_access('write')
+
+        self.env.flush_all()
+        new_prefix = {top.id: f"{target.parent_path or ''}{top.id}/" for top in tops}
+        new_name = {top.id: f"{target.complete_name} / {top.name}" if target else top.name for top in tops}
+        self.env.cr.execute(SQL("""
+            SELECT t.id, COUNT(DISTINCT f.id), COALESCE(SUM(k.doc_count), 0)
+              FROM document_folder t JOIN document_folder f ON f.parent_path LIKE t.parent_path || '%%'
+              LEFT JOIN document_folder_count k ON k.folder_id = f.id
+             WHERE t.id = ANY(%s) GROUP BY t.id
+        """, tops.ids))
+        sizes = {top_id: (folders, docs) for top_id, folders, docs in self.env.cr.fetchall()}
+        inherits_acl = bool(target.access_ids or target.allowed_group_ids)
+        preview = [{
+            'folder_id': top.id,
+            'old_name': top.complete_name,
+            'new_name': new_name[top.id],
+            'folder_count': sizes.get(top.id, (1, 0))[0],
+            'document_count': sizes.get(top.id, (1, 0))[1],
+            'inherits_acl': inherits_acl,
+        } for top in tops if top.parent_id != target]
+        if dry_run or not preview:
+            return preview
+
+        moving = tops.browse([line['folder_id'] for line in preview])
+        subtree = self.sudo().search([('id', 'child_of', moving.ids)])
+        # Las subcarpetas se reescriben con SQL: el usuario debe poder escribir en todas, no solo en las movidas
+        subtree.with_env(self.env).check_access('write')
+        AclLog = self.env['document.folder.acl.log']
+        acl_before = AclLog._get_acl_snapshot(subtree) if inherits_acl else None
+        access_src, groups_src = subtree._get_inherited_acl_sources(target, moving) if inherits_acl else ({}, {})
+
+        # 1. Estructura: padre, rutas y nombres completos de todos los subárboles a la vez
+        self.env.cr.execute(SQL("""
+            UPDATE document_folder SET parent_id = %s, write_uid = %s, write_date = %s WHERE id = ANY(%s)
+        """, target.id or None, self.env.uid, fields.Datetime.now(), moving.ids))
+        old_prefixes = [top.parent_path for top in moving]
+        old_names = [top.complete_name or top.name for top in moving]
+        self.env.cr.execute(SQL("""
+            UPDATE document_folder f
+               SET parent_path = m.new_prefix || substr(f.parent_path, length(m.old_prefix) + 1),
+                   complete_name = m.new_name || substr(f.complete_name, length(m.old_name) + 1)
+              FROM unnest(%s::varchar[], %s::varchar[], %s::varchar[], %s::varchar[]) AS m(old_prefix, new_prefix, old_name, new_name)
+             WHERE f.parent_path LIKE m.old_prefix || '%%'
+        """, old_prefixes, [new_prefix[top.id] for top in moving], old_names, [new_name[top.id] for top in moving]))
+
+        # 2. Permisos: los mismos que dejaría write() con su cascada, aplicados en sentencias de conjunto
+        if access_src:
+            self.env.cr.execute(SQL("""
+                DELETE FROM document_folder_access WHERE folder_id = ANY(%(nodes)s);
+                INSERT INTO document_folder_access (folder_id, user_id, access_level, create_uid, write_uid, create_date, write_date)
+                SELECT m.node, a.user_id, a.access_level, %(uid)s, %(uid)s, %(now)s, %(now)s
+                  FROM unnest(%(nodes)s::int[], %(sources)s::int[]) AS m(node, src)
+                  JOIN document_folder_access a ON a.folder_id = m.src
+            """, nodes=list(access_src), sources=list(access_src.values()), uid=self.env.uid, now=fields.Datetime.now()))
+        if groups_src:
+            # Los mismos grupos implican los mismos usuarios: ambas relaciones se copian de la carpeta de origen
+            for field_name in ('allowed_group_ids', 'access_user_ids'):
+                field = self._fields[field_name]
+                self.env.cr.execute(SQL("""
+                    DELETE FROM %(rel)s WHERE %(col1)s = ANY(%(nodes)s);
+                    INSERT INTO %(rel)s (%(col1)s, %(col2)s)
+                    SELECT m.node, r.%(col2)s FROM unnest(%(nodes)s::int[], %(sources)s::int[]) AS m(node, src)
+                      JOIN %(rel)s r ON r.%(col1)s = m.src
+                """, rel=SQL.identifier(field.relation), col1=SQL.identifier(field.column1),
+                    col2=SQL.identifier(field.column2), nodes=list(groups_src), sources=list(groups_src.values())))
+        self.env.invalidate_all()
+        self.env['document.folder.count']._bump_access_version()
+
+        if acl_before is not None:
+            AclLog._log_changes(acl_before, AclLog._get_acl_snapshot(subtree))
+        return preview
@@ -0,0 +1,83 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class DocumentFolder(models.Model):
+    _inherit = 'document.folder'
+
+    # Derivados de document.folder.count al leer: las filas de carpeta no se tocan al subir documentos
+    child_count = fields.Integer('Subcarpetas', compute='_compute_tree_counts')
+    document_count = fields.Integer('Documentos', compute='_compute_tree_counts')
+    subtree_document_count = fields.Integer('Documentos (con subcarpetas)', compute='_compute_tree_counts')
+
+    @api.depends_context('uid')
+    def _compute_tree_counts(self):
+        # Mismo criterio que el árbol: sin acceso total, solo cuenta lo que el usuario puede leer
+        counts = self.sudo()._get_tree_counts(self.ids, self._get_visible_folder_ids())
+        for folder in self:
+            folder.child_count, folder.document_count, folder.subtree_document_count = counts.get(folder.id, (0, 0, 0))
+
+    @api.model
+    def _get_tree_counts(self, folder_ids, readable_ids=None):
+        """
+        {carpeta: (subcarpetas, documentos, documentos del subárbol)} de las carpetas pedidas.
+        Con readable_ids solo cuentan las subcarpetas y los documentos de esas carpetas
+        (para no revelar lo que hay en carpetas ocultas). Suma sobre la tabla de conteos, no sobre documentos.
+        """
+        if not folder_ids:
+            return {}
+        self.env['document.control'].flush_model(['folder_id', 'state'])
+        self.flush_model(['parent_id', 'parent_path'])
+        visible = SQL("AND c.id = ANY(%s)", list(readable_ids)) if readable_ids is not None else SQL()
+        self.env.cr.execute(SQL("""
+            SELECT n.id,
+                   (SELECT COUNT(*) FROM document_folder c WHERE c.parent_id = n.id %(visible)s),
+                   (SELECT COALESCE(SUM(k.doc_count), 0) FROM document_folder_count k WHERE k.folder_id = n.id),
+                   (SELECT COALESCE(SUM(k.doc_count), 0)
+                      FROM document_folder c JOIN document_folder_count k ON k.folder_id = c.id
+                     WHERE c.parent_path LIKE n.parent_path || '%%' %(visible)s)
+              FROM document_folder n
+             WHERE n.id = ANY(%(ids)s)
+        """, ids=list(folder_ids), visible=visible))
+        return {folder_id: (children, docs, subtree) for folder_id, children, docs, subtree in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_visible_folder_ids(self):
+        """Carpetas legibles del usuario actual, o None si puede leerlas todas (no hace falta filtrar)"""
+        readable = self.env['document.folder.count']._get_readable_folder_ids()
+        return None if len(readable) == self.sudo().search_count([]) else readable
+
+    # =========================================================
+    # ÁRBOL PEREZOSO (un nivel por llamada)
+    # =========================================================
+    @api.model
+    def _get_tree_level(self, parent_id=False):
+        """
+        Hijos legibles de 'parent_id' (o las raíces visibles del usuario) con sus conteos.
+        Con acceso a todas las carpetas se cuenta todo; si no, las subcarpetas y el subárbol se
+        suman solo sobre las carpetas legibles para no revelar documentos de carpetas ocultas.
+        """
+        readable = self.env['document.folder.count']._get_readable_folder_ids()
+        if parent_id and parent_id not in readable:
+            return []
+        Folder = self.sudo()
+        if parent_id:
+            nodes = Folder.search([('parent_id', '=', parent_id), ('id', 'in', list(readable))], order='name')
+        else:
+            # Raíz visible: carpetas sin padre o cuyo padre el usuario no puede leer
+            nodes = Folder.search([('id', 'in', list(readable)), '|', ('parent_id', '=', False),
+                                   ('parent_id', 'not in', list(readable))], order='complete_name')
+        if not nodes:
+            return []
+        nodes.fetch(['name', 'complete_name'])
+
+        counts = Folder._get_tree_counts(nodes.ids, self._get_visible_folder_ids())
+        return [{
+            'id': node.id,
+            'name': node.name,
+            'complete_name': node.complete_name,
+            'child_count': counts[node.id][0],
+            'document_count': counts[node.id][1],
+            'subtree_document_count': counts[node.id][2],
+        } for node in nodes]
@@ -0,0 +1,93 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, tools
+from odoo.tools import SQL
+from psycopg2 import errors
+import base64
+import io
+import logging
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = None
+
+_logger = logging.getLogger(__name__)
+
+
+def optimize_pdf(data):
+    """
+    Optimización sin pérdida con pypdf: comprime los content streams, une imágenes/fuentes
+    idénticas y descarta objetos huérfanos. No recomprime imágenes (no baja la calidad del escaneo).
+    """
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(data)))
+    for page in writer.pages:
+        page.compress_content_streams()
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    # Copia derivada: el PDF controlado (pdf_file) nunca se reescribe
+    pdf_optimized_file = fields.Binary('PDF optimizado', attachment=True, copy=False, readonly=True)
+    pdf_size_before = fields.Integer('Tamaño subido (bytes)', readonly=True, copy=False)
+    pdf_size_after = fields.Integer('Tamaño optimizado (bytes)', readonly=True, copy=False)
+
+    def write(self, vals):
+        # Un PDF nuevo invalida la copia optimizada del anterior. La subida por partes crea el adjunto
+        # directamente y solo escribe el nombre: se cubre igual que la vista previa (document_preview.py)
+        if ('pdf_file' in vals or 'pdf_filename' in vals) and not self.env.context.get('document_pdf_processed'):
+            vals = dict(vals, pdf_optimized_file=False, pdf_size_before=0, pdf_size_after=0)
+        return super().write(vals)
+
+    def _get_pdf_attachment(self):
+        """Adjunto a entregar: la copia optimizada si existe, si no el PDF subido"""
+        self.ensure_one()
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name), ('res_field', 'in', ['pdf_optimized_file', 'pdf_file']), ('res_id', '=', self.id),
+        ])
+        return attachments.filtered(lambda a: a.res_field == 'pdf_optimized_file')[:1] or attachments[:1]
+
+    def _lock_unchanged(self):
+        """
+        Control optimista: bloquea la fila si nadie la modificó desde el inicio de la transacción.
+        En REPEATABLE READ, si otro la cambió (PDF nuevo, avance del flujo) el bloqueo falla.
+        """
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(SQL("SELECT state FROM document_control WHERE id = %s FOR NO KEY UPDATE NOWAIT", self.id))
+                return self.env.cr.fetchone()[0] in ('draft', 'upload')
+        except (errors.SerializationFailure, errors.LockNotAvailable):
+            return False
+
+    def _process_uploaded_pdf(self, data):
+        """
+        Etapa opcional (parámetro 'custom_document_control.pdf_optimize'), en el cron de la vista previa.
+        Solo en Borrador/Carga: lo que ya está en flujo o publicado no se toca.
+        """
+        data = super()._process_uploaded_pdf(data)
+        ICP = self.env['ir.config_parameter'].sudo()
+        if not PdfReader or not tools.str2bool(ICP.get_param('custom_document_control.pdf_optimize', 'False')):
+            return data
+        if self.state not in ('draft', 'upload'):
+            return data
+        min_saving = float(ICP.get_param('custom_document_control.pdf_optimize_min_saving', 10))
+        try:
+            optimized = optimize_pdf(data)
+        except Exception:
+            _logger.warning("No se pudo optimizar el PDF del documento %s", self.id, exc_info=True)
+            return data
+        if not self._lock_unchanged():
+            _logger.info("PDF del documento %s cambiado durante la optimización: se descarta", self.id)
+            return data
+        vals = {'pdf_size_before': len(data), 'pdf_size_after': len(data)}
+        # Si no ahorra lo suficiente, se conserva solo el original
+        if len(optimized) <= len(data) * (1 - min_saving / 100):
+            vals.update(pdf_optimized_file=base64.b64encode(optimized), pdf_size_after=len(optimized))
+            data = optimized
+        self.with_context(document_pdf_processed=True).write(vals)
+        return data
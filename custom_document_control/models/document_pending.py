@@ -0,0 +1,117 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+# Tipo de tarea -> etiqueta (mismo criterio que el Escritorio de Trabajo)
+TASK_KINDS = {
+    'review': 'Por revisar',
+    'validate': 'Por aprobar',
+    'upload': 'Por cargar',
+}
+
+# Campos que deciden a quién le toca cada documento
+PENDING_FIELDS = {'state', 'owner_id', 'reviewer_ids', 'approver_ids', 'folder_id'}
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # Búsqueda por usuario primero (la PK de la relación empieza por el documento)
+        for field_name in ('reviewer_ids', 'approver_ids'):
+            field = self._fields[field_name]
+            tools.create_index(cr, f'{field.relation}_user_document_idx', field.relation, [field.column2, field.column1])
+        tools.create_index(cr, 'document_control_in_flow_idx', self._table, ['state', 'id'],
+                           where="state IN ('review', 'validate')")
+        tools.create_index(cr, 'document_control_owner_pending_idx', self._table, ['owner_id', 'state'],
+                           where="state IN ('draft', 'upload')")
+
+    @api.model
+    def _get_pending_tasks_query(self):
+        """Tareas del usuario actual en carpetas legibles: una rama por tipo, cada una por su índice"""
+        reviewers, approvers = self._fields['reviewer_ids'], self._fields['approver_ids']
+        folder_ids = list(self.env['document.folder.count']._get_readable_folder_ids())
+        return SQL("""
+            SELECT d.id, 'review' AS kind, d.write_date FROM %(rev)s r JOIN document_control d ON d.id = r.%(rev_doc)s
+             WHERE r.%(rev_user)s = %(uid)s AND d.state = 'review' AND d.folder_id = ANY(%(folders)s)
+            UNION ALL
+            SELECT d.id, 'validate', d.write_date FROM %(app)s a JOIN document_control d ON d.id = a.%(app_doc)s
+             WHERE a.%(app_user)s = %(uid)s AND d.state = 'validate' AND d.folder_id = ANY(%(folders)s)
+            UNION ALL
+            SELECT d.id, 'upload', d.write_date FROM document_control d
+             WHERE d.owner_id = %(uid)s AND d.state IN ('draft', 'upload') AND d.folder_id = ANY(%(folders)s)
+        """, rev=SQL.identifier(reviewers.relation), rev_doc=SQL.identifier(reviewers.column1),
+            rev_user=SQL.identifier(reviewers.column2), app=SQL.identifier(approvers.relation),
+            app_doc=SQL.identifier(approvers.column1), app_user=SQL.identifier(approvers.column2),
+            uid=self.env.uid, folders=folder_ids)
+
+    @api.model
+    def _get_pending_tasks(self, limit=10, offset=0):
+        """
+        Conteos por tipo y una página (más recientes primero). La consulta usa la caché de carpetas
+        legibles para acotar los candidatos (pocos por usuario); luego todos pasan por las reglas del
+        usuario antes de contar y paginar, así conteos y página salen del mismo conjunto.
+        """
+        self.env.flush_model(['state', 'owner_id', 'folder_id', 'reviewer_ids', 'approver_ids'])
+        self.env.cr.execute(SQL("SELECT id, kind FROM (%s) t ORDER BY write_date DESC, id DESC",
+                                self._get_pending_tasks_query()))
+        kinds = dict(self.env.cr.fetchall())
+        allowed = self.browse(list(kinds))._filtered_access('read')
+        counts = dict.fromkeys(TASK_KINDS, 0)
+        for doc in allowed:
+            counts[kinds[doc.id]] += 1
+        docs = allowed[offset:offset + limit]
+        docs.fetch(['code', 'name', 'version', 'state', 'folder_id', 'write_date'])
+        return {
+            'total': len(allowed),
+            'counts': [{'kind': kind, 'label': label, 'count': counts[kind]} for kind, label in TASK_KINDS.items()],
+            'tasks': [{
+                'id': doc.id,
+                'kind': kinds[doc.id],
+                'label': TASK_KINDS[kinds[doc.id]],
+                'code': doc.code,
+                'name': doc.name,
+                'version': doc.version,
+                'folder': doc.folder_id.complete_name,
+                'write_date': fields.Datetime.to_string(doc.write_date),
+            } for doc in docs],
+        }
+
+    # =========================================================
+    # AVISO AL CONTADOR DE LA BARRA SUPERIOR
+    # =========================================================
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._notify_pending_tasks()
+        return records
+
+    def write(self, vals):
+        if not PENDING_FIELDS & set(vals):
+            return super().write(vals)
+        self._notify_pending_tasks()  # quienes dejan de tenerlo pendiente
+        res = super().write(vals)
+        self._notify_pending_tasks()  # quienes pasan a tenerlo
+        return res
+
+    def unlink(self):
+        self._notify_pending_tasks()
+        return super().unlink()
+
+    def _notify_pending_tasks(self):
+        """Junta a los usuarios afectados y les avisa una sola vez al confirmar"""
+        users = self.sudo().mapped(lambda doc: doc.owner_id | doc.reviewer_ids | doc.approver_ids)
+        if not users:
+            return
+        pending = self.env.cr.precommit.data.setdefault('custom_document_control.pending_tasks', set())
+        if not pending:
+            self.env.cr.precommit.add(self._send_pending_tasks)
+        pending.update(users.ids)
+
+    @api.model
+    def _send_pending_tasks(self):
+        user_ids = self.env.cr.precommit.data.pop('custom_document_control.pending_tasks', set())
+        users = self.env['res.users'].sudo().browse(sorted(user_ids)).exists()
+        users._bus_send('custom_document_control/pending_tasks', {})
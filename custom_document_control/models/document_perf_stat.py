@@ -0,0 +1,109 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+import csv
+import functools
+import io
+import threading
+import time
+
+
+def profiled(operation):
+    """Decorador opcional: mide consultas, tiempo SQL, tiempo Python y tamaño de la carga.
+    Solo actúa si el parámetro 'custom_document_control.profiling' está activo."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            Stat = self.env['document.perf.stat']
+            if not Stat._is_profiling_enabled():
+                return method(self, *args, **kwargs)
+            thread = threading.current_thread()
+            queries = self.env.cr.sql_log_count
+            sql_time = getattr(thread, 'query_time', 0.0)
+            start = time.perf_counter()
+            res = method(self, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            sql_time = getattr(thread, 'query_time', 0.0) - sql_time
+            Stat._record(operation, self, {
+                'query_count': self.env.cr.sql_log_count - queries,
+                'sql_time': sql_time,
+                'python_time': max(elapsed - sql_time, 0.0),
+                'payload_size': Stat._get_payload_size(self, args),
+            })
+            return res
+        return wrapper
+    return decorator
+
+
+class DocumentPerfStat(models.Model):
+    _name = 'document.perf.stat'
+    _description = 'Estadísticas de Rendimiento'
+    _order = 'id desc'
+
+    operation = fields.Char('Operación', required=True, index=True, readonly=True)
+    res_model = fields.Char('Modelo', readonly=True)
+    record_count = fields.Integer('Registros', readonly=True, aggregator='sum')
+    query_count = fields.Integer('Consultas SQL', readonly=True, aggregator='avg')
+    sql_time = fields.Float('Tiempo SQL (s)', digits=(16, 4), readonly=True, aggregator='avg')
+    python_time = fields.Float('Tiempo Python (s)', digits=(16, 4), readonly=True, aggregator='avg')
+    payload_size = fields.Integer('Carga (bytes)', readonly=True, aggregator='avg')
+    user_id = fields.Many2one('res.users', string='Usuario', readonly=True)
+
+    @api.model
+    @tools.ormcache()
+    def _is_profiling_enabled(self):
+        return tools.str2bool(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.profiling', 'False'))
+
+    @api.model
+    def _get_payload_size(self, records, args):
+        """Documentos: peso de los archivos adjuntos. Carpetas: tamaño de los valores escritos."""
+        if records._name == 'document.control' and records.ids:
+            attachments = self.env['ir.attachment'].sudo().search_read([
+                ('res_model', '=', 'document.control'),
+                ('res_field', 'in', ['pdf_file', 'editable_file']),
+                ('res_id', 'in', records.ids),
+            ], ['file_size'])
+            return sum(a['file_size'] for a in attachments)
+        return len(repr(args))
+
+    @api.model
+    def _record(self, operation, records, values):
+        self.sudo().create(dict(
+            values,
+            operation=operation,
+            res_model=records._name,
+            record_count=len(records) or 1,
+            user_id=self.env.uid,
+        ))
+
+    @api.autovacuum
+    def _gc_rolling_window(self):
+        """Ventana deslizante: conserva solo las últimas N mediciones"""
+        limit = int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.profiling_limit', 10000))
+        self.env.cr.execute("""
+            DELETE FROM document_perf_stat
+            WHERE id < (SELECT COALESCE(MIN(id), 0) FROM (
+                SELECT id FROM document_perf_stat ORDER BY id DESC LIMIT %s
+            ) AS recent)
+        """, [limit])
+
+    @api.model
+    def _get_summary_csv(self):
+        """Resumen por operación en CSV (promedios y máximos)"""
+        self.check_access('read')
+        groups = self.sudo()._read_group(
+            [], ['operation'],
+            ['__count', 'query_count:avg', 'query_count:max', 'sql_time:avg', 'sql_time:max',
+             'python_time:avg', 'python_time:max', 'payload_size:avg'],
+            order='operation',
+        )
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(['operation', 'calls', 'queries_avg', 'queries_max', 'sql_time_avg', 'sql_time_max',
+                         'python_time_avg', 'python_time_max', 'payload_avg'])
+        for row in groups:
+            writer.writerow([row[0], row[1]] + [round(v or 0, 4) for v in row[2:]])
+        return out.getvalue().encode()
+
+    def action_export_csv(self):
+        """Se descarga directo desde el controlador: no queda ningún adjunto guardado"""
+        return {'type': 'ir.actions.act_url', 'url': '/document_control/perf_stats.csv', 'target': 'self'}
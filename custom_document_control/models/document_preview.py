@@ -0,0 +1,110 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+import base64
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+_logger = logging.getLogger(__name__)
+
+
+def linearize_pdf(data):
+    """PDF linealizado ('fast web view'): la primera página se muestra con los primeros KB.
+    pypdf no sabe linealizar; usamos pikepdf o el binario qpdf si están disponibles."""
+    if pikepdf:
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            out = io.BytesIO()
+            pdf.save(out, linearize=True)
+            return out.getvalue()
+    qpdf = shutil.which('qpdf')
+    if qpdf:
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = os.path.join(tmp, 'in.pdf'), os.path.join(tmp, 'out.pdf')
+            with open(src, 'wb') as f:
+                f.write(data)
+            # qpdf devuelve 3 cuando solo hubo advertencias
+            proc = subprocess.run([qpdf, '--linearize', src, dst], capture_output=True, timeout=600)
+            if proc.returncode in (0, 3) and os.path.exists(dst):
+                with open(dst, 'rb') as f:
+                    return f.read()
+            _logger.warning("qpdf no pudo linealizar el PDF: %s", proc.stderr.decode(errors='replace'))
+    return None
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    # Copia linealizada del PDF solo para la vista previa (se genera en segundo plano)
+    pdf_preview_file = fields.Binary(attachment=True, copy=False)
+    pdf_preview_pending = fields.Boolean(copy=False, index=True)
+
+    def _get_preview_url(self):
+        """'unique' es el checksum del archivo que se servirá (copia linealizada o el original)"""
+        self.ensure_one()
+        attachments = self.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', self._name), ('res_field', 'in', ['pdf_preview_file', 'pdf_file']), ('res_id', '=', self.id),
+        ], ['res_field', 'checksum'])
+        checksums = {a['res_field']: a['checksum'] for a in attachments}
+        unique = checksums.get('pdf_preview_file') or checksums.get('pdf_file') or ''
+        return f"/document_control/preview/{self.id}?unique={unique}"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('pdf_file'):
+                vals['pdf_preview_pending'] = True
+        records = super().create(vals_list)
+        if any(records.mapped('pdf_preview_pending')):
+            self._trigger_preview_cron()
+        return records
+
+    def write(self, vals):
+        # document_pdf_processed: escritura hecha por el propio proceso en segundo plano
+        if ('pdf_file' in vals or 'pdf_filename' in vals) and not self.env.context.get('document_pdf_processed'):
+            vals = dict(vals, pdf_preview_pending=True, pdf_preview_file=False)
+            self._trigger_preview_cron()
+        return super().write(vals)
+
+    @api.model
+    def _trigger_preview_cron(self):
+        cron = self.env.ref('custom_document_control.ir_cron_document_preview', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def _process_uploaded_pdf(self, data):
+        """Punto de extensión: etapas sobre el PDF subido antes de generar la vista previa"""
+        return data
+
+    @api.model
+    def _cron_build_previews(self, batch_size=20):
+        """Linealiza los PDF pendientes por lotes; cada lote se confirma por separado"""
+        Attachment = self.env['ir.attachment'].sudo()
+        while True:
+            docs = self.sudo().search([('pdf_preview_pending', '=', True)], limit=batch_size)
+            if not docs:
+                break
+            attachments = {a.res_id: a for a in Attachment.search([
+                ('res_model', '=', self._name), ('res_field', '=', 'pdf_file'), ('res_id', 'in', docs.ids),
+            ])}
+            for doc in docs:
+                attachment = attachments.get(doc.id)
+                preview = False
+                if attachment and attachment.mimetype == 'application/pdf':
+                    try:
+                        preview = linearize_pdf(doc._process_uploaded_pdf(attachment.raw))
+                    except Exception:
+                        _logger.warning("No se pudo linealizar el PDF del documento %s", doc.id, exc_info=True)
+                # write completo (el resto de extensiones lo ve); el contexto evita volver a marcarlo pendiente
+                doc.with_context(document_pdf_processed=True).write({
+                    'pdf_preview_file': preview and base64.b64encode(preview),
+                    'pdf_preview_pending': False,
+                })
+            self.env.cr.commit()
@@ -0,0 +1,153 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Campos que cambian la próxima fecha de revisión de un documento
+REVIEW_DEPENDS = {'state', 'issue_date', 'last_review_date', 'type_id', 'area_id'}
+
+
+# ==========================================
+# INTERVALO DE REVISIÓN (por tipo o por área)
+# ==========================================
+class DocumentType(models.Model):
+    _inherit = 'document.type'
+
+    review_interval_months = fields.Integer('Revisión cada (meses)', default=0,
+                                            help="0 = usar el intervalo del área")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'review_interval_months' in vals:
+            self.env['document.control']._recompute_next_review_dates(SQL("d.type_id = ANY(%s)", self.ids))
+        return res
+
+
+class DocumentArea(models.Model):
+    _inherit = 'document.area'
+
+    review_interval_months = fields.Integer('Revisión cada (meses)', default=0,
+                                            help="Se usa si el tipo de documento no define uno propio. 0 = sin revisión periódica")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'review_interval_months' in vals:
+            self.env['document.control']._recompute_next_review_dates(SQL("d.area_id = ANY(%s)", self.ids))
+        return res
+
+
+# ==========================================
+# REVISIÓN PERIÓDICA (ISO 9001 7.5.2 / 7.5.3)
+# ==========================================
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    last_review_date = fields.Date('Última Revisión', readonly=True, copy=False, tracking=True)
+    next_review_date = fields.Date('Próxima Revisión', readonly=True, copy=False)
+    # Fecha de revisión para la que ya se creó la actividad (evita duplicados entre ejecuciones)
+    review_activity_date = fields.Date(readonly=True, copy=False)
+
+    def init(self):
+        super().init()
+        # El cron solo mira documentos publicados
+        tools.create_index(self.env.cr, 'document_control_next_review_date_idx', self._table,
+                           ['next_review_date'], where="state = 'approved'")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if REVIEW_DEPENDS & set(vals):
+            self._recompute_next_review_dates(SQL("d.id = ANY(%s)", self.ids))
+        return res
+
+    @api.model
+    def _recompute_next_review_dates(self, where):
+        """
+        Próxima revisión = (última revisión o fecha de emisión) + intervalo del tipo (o del área).
+        Un solo UPDATE para todos los documentos filtrados; solo reescribe las filas que cambian.
+        Devuelve {id: fecha anterior} de los documentos cambiados.
+        """
+        self.env['document.type'].flush_model(['review_interval_months'])
+        self.env['document.area'].flush_model(['review_interval_months'])
+        self.flush_model(['state', 'issue_date', 'last_review_date', 'type_id', 'area_id', 'next_review_date'])
+        self.env.cr.execute(SQL("""
+            UPDATE document_control dc
+               SET next_review_date = s.next_date
+              FROM (
+                    SELECT d.id, d.next_review_date AS old_date,
+                           CASE WHEN d.state = 'approved' AND COALESCE(NULLIF(t.review_interval_months, 0), a.review_interval_months, 0) > 0
+                                THEN (COALESCE(d.last_review_date, d.issue_date, d.create_date::date)
+                                      + make_interval(months => COALESCE(NULLIF(t.review_interval_months, 0), a.review_interval_months)))::date
+                           END AS next_date
+                      FROM document_control d
+                      JOIN document_type t ON t.id = d.type_id
+                      JOIN document_area a ON a.id = d.area_id
+                     WHERE %s
+                   ) s
+             WHERE dc.id = s.id AND dc.next_review_date IS DISTINCT FROM s.next_date
+            RETURNING dc.id, s.old_date
+        """, where))
+        changed = dict(self.env.cr.fetchall())
+        if changed:
+            self.invalidate_model(['next_review_date'])
+        return changed
+
+    def action_mark_reviewed(self):
+        """El dueño confirma que el documento sigue vigente: reinicia el ciclo y cierra la actividad"""
+        self.write({'last_review_date': fields.Date.context_today(self)})
+        activity_type = self.env.ref('custom_document_control.mail_activity_type_periodic_review', raise_if_not_found=False)
+        if activity_type:
+            activities = self.env['mail.activity'].search([
+                ('res_model', '=', self._name),
+                ('res_id', 'in', self.ids),
+                ('activity_type_id', '=', activity_type.id),
+            ])
+            if activities:
+                activities.action_feedback(feedback="Revisión periódica realizada")
+
+    @api.model
+    def _cron_schedule_periodic_reviews(self, batch_size=2000):
+        """
+        Crea la actividad de revisión para los documentos que vencen dentro del margen configurado.
+        Un lote por ejecución (un solo create de mail.activity); si quedan más, se vuelve a disparar.
+        """
+        activity_type = self.env.ref('custom_document_control.mail_activity_type_periodic_review', raise_if_not_found=False)
+        if not activity_type:
+            return
+        lead_days = int(self.env['ir.config_parameter'].sudo().get_param('custom_document_control.review_lead_days', 30))
+        limit_date = fields.Date.context_today(self) + timedelta(days=lead_days)
+        self.flush_model(['next_review_date', 'review_activity_date', 'state', 'owner_id'])
+        self.env.cr.execute(SQL("""
+            SELECT d.id, d.owner_id, d.next_review_date, d.code, d.version
+              FROM document_control d
+              JOIN res_users u ON u.id = d.owner_id AND u.active
+             WHERE d.state = 'approved'
+               AND d.next_review_date <= %s
+               AND d.review_activity_date IS DISTINCT FROM d.next_review_date
+             ORDER BY d.next_review_date, d.id
+             LIMIT %s
+        """, limit_date, batch_size))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return
+
+        model_id = self.env['ir.model']._get_id(self._name)
+        # mail_activity_quick_update: sin correo de asignación por cada actividad
+        self.env['mail.activity'].sudo().with_context(mail_activity_quick_update=True).create([{
+            'activity_type_id': activity_type.id,
+            'res_model_id': model_id,
+            'res_id': doc_id,
+            'user_id': owner_id,
+            'date_deadline': next_date,
+            'summary': f"Revisión periódica {code} v{version}",
+        } for doc_id, owner_id, next_date, code, version in rows])
+        self.env.cr.execute(SQL("""
+            UPDATE document_control SET review_activity_date = next_review_date WHERE id = ANY(%s)
+        """, [row[0] for row in rows]))
+        self.invalidate_model(['review_activity_date'])
+        _logger.info("Revisión periódica: %s actividades creadas", len(rows))
+
+        if len(rows) == batch_size:
+            self.env.ref('custom_document_control.ir_cron_document_periodic_review')._trigger()
@@ -0,0 +1,309 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from collections import Counter
+
+# Versión de permisos de carpetas (clave de la caché de carpetas legibles)
+ACCESS_VERSION_KEY = 'custom_document_control.access_version'
+
+
+class DocumentFolderCount(models.Model):
+    """
+    Conteo de documentos por (carpeta, estado), mantenido por deltas.
+    Como la regla de lectura de documentos depende solo de la carpeta, el conteo de un usuario
+    es la suma sobre las carpetas que puede leer: no hace falta un GROUP BY con la regla por usuario.
+    """
+    _name = 'document.folder.count'
+    _description = 'Conteo de Documentos por Carpeta'
+    _log_access = False
+
+    folder_id = fields.Many2one('document.folder', required=True, ondelete='cascade', readonly=True)
+    state = fields.Char(required=True, readonly=True)
+    doc_count = fields.Integer(readonly=True)
+
+    def init(self):
+        tools.create_unique_index(self.env.cr, 'document_folder_count_folder_state_uniq', self._table, ['folder_id', 'state'])
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """Recuento completo (instalación, actualización y conciliación nocturna)"""
+        self.env['document.control'].flush_model(['folder_id', 'state'])
+        self.env.cr.execute("""
+            DELETE FROM document_folder_count;
+            INSERT INTO document_folder_count (folder_id, state, doc_count)
+            SELECT folder_id, COALESCE(state, 'draft'), COUNT(*)
+              FROM document_control
+             WHERE folder_id IS NOT NULL
+             GROUP BY folder_id, COALESCE(state, 'draft');
+        """)
+
+    # =========================================================
+    # DELTAS (se aplican una sola vez al confirmar la transacción)
+    # =========================================================
+    @api.model
+    def _register_delta(self, pairs, sign):
+        deltas = self.env.cr.precommit.data.setdefault('custom_document_control.folder_count', Counter())
+        if not deltas:
+            self.env.cr.precommit.add(self._apply_deltas)
+        for folder_id, state in pairs:
+            if folder_id:
+                deltas[(folder_id, state or 'draft')] += sign
+
+    @api.model
+    def _apply_deltas(self):
+        deltas = self.env.cr.precommit.data.pop('custom_document_control.folder_count', Counter())
+        rows = [(folder_id, state, delta) for (folder_id, state), delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO document_folder_count (folder_id, state, doc_count)
+            SELECT f, s, d FROM unnest(%s::int[], %s::varchar[], %s::int[]) AS t(f, s, d)
+              JOIN document_folder ON document_folder.id = t.f
+            ON CONFLICT (folder_id, state) DO UPDATE
+            SET doc_count = document_folder_count.doc_count + EXCLUDED.doc_count
+        """, [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]))
+
+    # =========================================================
+    # LECTURA
+    # =========================================================
+    @api.model
+    def _get_access_version(self):
+        """
+        Contador explícito, subido al confirmar por cualquier cambio de carpetas, permisos o grupos.
+        Se lee con SQL (no get_param, que tiene su propia caché) en la misma instantánea que la búsqueda
+        de carpetas: la caché nunca guarda un resultado bajo una versión que no le corresponde.
+        """
+        self.env.cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", [ACCESS_VERSION_KEY])
+        row = self.env.cr.fetchone()
+        return int(row[0]) if row else 0
+
+    @api.model
+    def _bump_access_version(self):
+        if not self.env.cr.precommit.data.get(ACCESS_VERSION_KEY):
+            self.env.cr.precommit.data[ACCESS_VERSION_KEY] = True
+            self.env.cr.precommit.add(self._apply_access_version)
+
+    @api.model
+    def _apply_access_version(self):
+        self.env.cr.precommit.data.pop(ACCESS_VERSION_KEY, None)
+        self.env.cr.execute(SQL("""
+            INSERT INTO ir_config_parameter (key, value, create_uid, write_uid, create_date, write_date)
+            VALUES (%(key)s, '1', %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC')
+            ON CONFLICT (key) DO UPDATE
+            SET value = (ir_config_parameter.value::int + 1)::text, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+        """, key=ACCESS_VERSION_KEY, uid=self.env.uid))
+
+    @api.model
+    def _get_readable_folder_ids(self):
+        """Carpetas legibles del usuario actual, en caché por (usuario, versión de permisos)"""
+        return self._get_readable_folders(self.env.uid, self._get_access_version())
+
+    @tools.ormcache('uid', 'version')
+    def _get_readable_folders(self, uid, version):
+        return frozenset(self.env['document.folder'].with_user(uid).search([]).ids)
+
+    @api.model
+    def _get_counts(self, states):
+        """
+        Conteo por carpeta visible para el usuario actual. Lee solo la tabla de agregados
+        (carpetas x estados filas), sin importar cuántos documentos haya.
+        """
+        folder_ids = self._get_readable_folder_ids()
+        self.env.cr.execute(SQL("""
+            SELECT folder_id, SUM(doc_count) FROM document_folder_count
+             WHERE folder_id = ANY(%s) AND state = ANY(%s) AND doc_count > 0
+             GROUP BY folder_id
+        """, list(folder_ids), list(states)))
+        return dict(self.env.cr.fetchall())
+
+
+def domain_selection_values(domain, field_name, all_values):
+    """
+    Valores de una selección que cumple un dominio formado solo por condiciones sobre ese campo.
+    Devuelve None si el dominio tiene cualquier otra condición (entonces no sirve el agregado).
+    """
+    tokens = list(domain)
+    pos = 0
+
+    def parse():
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        if token == '!':
+            return all_values - parse()
+        if token in ('&', '|'):
+            left, right = parse(), parse()
+            return left & right if token == '&' else left | right
+        field, operator, value = token
+        if field in (0, 1):  # FALSE_LEAF / TRUE_LEAF
+            return all_values if field == value else frozenset()
+        if field != field_name or operator not in ('=', '!=', 'in', 'not in'):
+            raise ValueError
+        values = frozenset(value if isinstance(value, (list, tuple)) else [value]) & all_values
+        return values if operator in ('=', 'in') else all_values - values
+
+    result = all_values
+    try:
+        while pos < len(tokens):
+            result &= parse()
+    except (ValueError, TypeError, IndexError):
+        return None
+    return result
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    # =========================================================
+    # MANTENIMIENTO DEL AGREGADO
+    # =========================================================
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['document.folder.count']._register_delta([(d.folder_id.id, d.state) for d in records.sudo()], 1)
+        return records
+
+    def write(self, vals):
+        if 'state' not in vals and 'folder_id' not in vals:
+            return super().write(vals)
+        before = [(d.folder_id.id, d.state) for d in self.sudo()]
+        res = super().write(vals)
+        Count = self.env['document.folder.count']
+        Count._register_delta(before, -1)
+        Count._register_delta([(d.folder_id.id, d.state) for d in self.sudo()], 1)
+        return res
+
+    def unlink(self):
+        self.env['document.folder.count']._register_delta([(d.folder_id.id, d.state) for d in self.sudo()], -1)
+        return super().unlink()
+
+    # =========================================================
+    # PANEL DE BÚSQUEDA
+    # =========================================================
+    def _get_searchpanel_states(self, *domains):
+        all_states = frozenset(key for key, _label in self._fields['state'].selection)
+        return domain_selection_values([leaf for domain in domains for leaf in domain or []], 'state', all_states)
+
+    @api.model
+    def search_panel_select_range(self, field_name, **kwargs):
+        """Carpetas: conteos desde el agregado si la acción/búsqueda solo filtra por estado"""
+        states = None
+        if field_name == 'folder_id' and kwargs.get('enable_counters'):
+            states = self._get_searchpanel_states(
+                kwargs.get('search_domain'), kwargs.get('category_domain'), kwargs.get('filter_domain'))
+        if states is None:
+            return super().search_panel_select_range(field_name, **kwargs)
+
+        # expand=True: la lista de carpetas sale de document.folder, sin el GROUP BY sobre documentos
+        res = super().search_panel_select_range(field_name, **dict(kwargs, enable_counters=False, expand=True))
+        counts = self.env['document.folder.count']._get_counts(states)
+        values = res['values']
+        for value in values:
+            value['__count'] = 0
+        parent_field = res.get('parent_field') if kwargs.get('hierarchize', True) else None
+        by_id = {value['id']: value for value in values}
+        for folder_id, count in counts.items():
+            node, seen = folder_id, set()
+            while node in by_id and node not in seen:
+                seen.add(node)
+                by_id[node]['__count'] += count
+                if not parent_field:
+                    break
+                node = by_id[node].get(parent_field)
+                if isinstance(node, (list, tuple)):
+                    node = node[0]
+        if not kwargs.get('expand'):
+            res['values'] = [value for value in values if value['__count']]
+        return res
+
+    @api.model
+    def search_panel_select_multi_range(self, field_name, **kwargs):
+        """Estados: conteos desde el agregado, acotados a la carpeta elegida en el panel"""
+        category_domain = kwargs.get('category_domain') or []
+        states = None
+        if field_name == 'state' and kwargs.get('enable_counters') and not kwargs.get('group_by') and len(category_domain) <= 1:
+            states = self._get_searchpanel_states(kwargs.get('search_domain'), kwargs.get('filter_domain'))
+        folder_ids = None
+        if states is not None:
+            Count = self.env['document.folder.count']
+            folder_ids = Count._get_readable_folder_ids()
+            if category_domain:
+                field, operator, value = category_domain[0]
+                if field != 'folder_id' or operator not in ('=', 'child_of'):
+                    folder_ids = None
+                else:
+                    folder_ids = folder_ids & frozenset(
+                        self.env['document.folder'].sudo()._search([('id', operator if operator == 'child_of' else '=', value)]))
+        if folder_ids is None:
+            return super().search_panel_select_multi_range(field_name, **kwargs)
+
+        res = super().search_panel_select_multi_range(field_name, **dict(kwargs, enable_counters=False, expand=True))
+        self.env.cr.execute(SQL("""
+            SELECT state, SUM(doc_count) FROM document_folder_count
+             WHERE folder_id = ANY(%s) AND state = ANY(%s)
+             GROUP BY state
+        """, list(folder_ids), list(states)))
+        counts = dict(self.env.cr.fetchall())
+        for value in res['values']:
+            value['__count'] = counts.get(value['id'], 0)
+        if not kwargs.get('expand'):
+            res['values'] = [value for value in res['values'] if value['__count']]
+        return res
+
+
+# =========================================================
+# CAMBIOS QUE INVALIDAN LAS CARPETAS LEGIBLES
+# =========================================================
+class DocumentFolder(models.Model):
+    _inherit = 'document.folder'
+
+    @api.model
+    def create(self, vals):
+        self.env['document.folder.count']._bump_access_version()
+        return super().create(vals)
+
+    def write(self, vals):
+        if {'parent_id', 'access_ids', 'allowed_group_ids', 'access_user_ids'} & set(vals):
+            self.env['document.folder.count']._bump_access_version()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['document.folder.count']._bump_access_version()
+        return super().unlink()
+
+
+class DocumentFolderAccess(models.Model):
+    _inherit = 'document.folder.access'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['document.folder.count']._bump_access_version()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['document.folder.count']._bump_access_version()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['document.folder.count']._bump_access_version()
+        return super().unlink()
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    def write(self, vals):
+        # Pertenencia a grupos (el nombre del campo cambia entre versiones: se detecta por el modelo)
+        if any(self._fields[name].comodel_name == 'res.groups' for name in vals if name in self._fields):
+            self.env['document.folder.count']._bump_access_version()
+        return super().write(vals)
+
+
+class ResGroups(models.Model):
+    _inherit = 'res.groups'
+
+    def write(self, vals):
+        if any(self._fields[name].comodel_name == 'res.users' for name in vals if name in self._fields):
+            self.env['document.folder.count']._bump_access_version()
+        return super().write(vals)
@@ -0,0 +1,202 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Métricas de ciclo: percentiles que devuelven los informes
+PERCENTILES = (0.5, 0.9, 0.95)
+
+
+class DocumentStateTransition(models.Model):
+    """
+    Bitácora compacta de cambios de estado. Cada fila es una "estadía": el documento entra en
+    'to_state' en 'date' y sale en 'date_end' (vacío mientras siga ahí); la duración queda guardada.
+    """
+    _name = 'document.state.transition'
+    _description = 'Transición de Estado de Documento'
+    _log_access = False
+    _order = 'date desc, id desc'
+    _rec_name = 'document_id'
+
+    document_id = fields.Many2one('document.control', string='Documento', required=True, readonly=True, ondelete='cascade')
+    from_state = fields.Selection(selection=lambda self: self.env['document.control']._fields['state'].selection, string='Desde', readonly=True)
+    to_state = fields.Selection(selection=lambda self: self.env['document.control']._fields['state'].selection, string='Hacia', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Usuario', readonly=True, ondelete='set null')
+    date = fields.Datetime('Fecha', required=True, readonly=True)
+    date_end = fields.Datetime('Salida', readonly=True)
+    duration_hours = fields.Float('Horas en el estado', readonly=True, aggregator='avg')
+
+    def init(self):
+        cr = self.env.cr
+        tools.create_index(cr, 'document_state_transition_document_date_idx', self._table, ['document_id', 'date'])
+        tools.create_index(cr, 'document_state_transition_to_state_date_idx', self._table, ['to_state', 'date'])
+        # Solo una estadía abierta por documento: es la que se cierra en cada cambio
+        tools.create_index(cr, 'document_state_transition_open_idx', self._table, ['document_id'], where='date_end IS NULL')
+        # Límite del historial a migrar: lo posterior a la instalación ya se registra en vivo
+        ICP = self.env['ir.config_parameter'].sudo()
+        if not ICP.get_param('custom_document_control.transition_backfill_until'):
+            cr.execute("SELECT COALESCE(MAX(id), 0) FROM mail_tracking_value")
+            ICP.set_param('custom_document_control.transition_backfill_until', cr.fetchone()[0])
+
+    @api.model
+    def _log_transitions(self, rows):
+        """rows: [(document_id, from_state, to_state)]. Cierra la estadía abierta y abre la nueva, en dos sentencias"""
+        if not rows:
+            return
+        now = fields.Datetime.now()
+        doc_ids, from_states, to_states = (list(column) for column in zip(*rows))
+        self.env.cr.execute(SQL("""
+            UPDATE document_state_transition
+               SET date_end = %(now)s, duration_hours = EXTRACT(EPOCH FROM %(now)s - date) / 3600
+             WHERE document_id = ANY(%(ids)s) AND date_end IS NULL
+        """, now=now, ids=doc_ids))
+        self.env.cr.execute(SQL("""
+            INSERT INTO document_state_transition (document_id, from_state, to_state, user_id, date)
+            SELECT doc_id, from_state, to_state, %s, %s
+              FROM unnest(%s::int[], %s::varchar[], %s::varchar[]) AS t(doc_id, from_state, to_state)
+        """, self.env.uid, now, doc_ids, from_states, to_states))
+        self.invalidate_model()
+
+    # =========================================================
+    # INFORMES
+    # =========================================================
+    @api.model
+    def _get_cycle_time_stats(self, date_from=None, date_to=None):
+        """
+        Tiempos de ciclo en horas: por estado (estadías cerradas que empezaron en el período) y de punta
+        a punta (primer envío a revisión/aprobación hasta la aprobación, para aprobaciones del período).
+        """
+        def period(alias):
+            return SQL("%s >= %s AND %s < %s", SQL.identifier(alias, 'date'), date_from or '1970-01-01',
+                       SQL.identifier(alias, 'date'), date_to or '9999-12-31')
+
+        percentiles = SQL("percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY hours)", list(PERCENTILES))
+        self.env.cr.execute(SQL("""
+            SELECT to_state, COUNT(*), AVG(hours), %s
+              FROM (SELECT to_state, duration_hours AS hours FROM document_state_transition
+                     WHERE date_end IS NOT NULL AND %s) stays
+             GROUP BY to_state
+        """, percentiles, period('document_state_transition')))
+        by_state = {state: self._format_stats(count, avg, values) for state, count, avg, values in self.env.cr.fetchall()}
+        self.env.cr.execute(SQL("""
+            SELECT COUNT(*), AVG(hours), %s
+              FROM (SELECT EXTRACT(EPOCH FROM a.date - s.date) / 3600 AS hours
+                      FROM document_state_transition a
+                      JOIN LATERAL (SELECT MIN(date) AS date FROM document_state_transition
+                                     WHERE document_id = a.document_id AND from_state = 'upload'
+                                       AND to_state IN ('review', 'validate') AND date <= a.date) s ON s.date IS NOT NULL
+                     WHERE a.to_state = 'approved' AND %s) cycles
+        """, percentiles, period('a')))
+        count, avg, values = self.env.cr.fetchone()
+        self.env.cr.execute(SQL("""
+            SELECT COUNT(*) FROM document_state_transition
+             WHERE from_state IN ('review', 'validate') AND to_state = 'upload' AND %s
+        """, period('document_state_transition')))
+        return {
+            'by_state': by_state,
+            'submit_to_approval': self._format_stats(count, avg, values),
+            'rejections': self.env.cr.fetchone()[0],
+        }
+
+    @api.model
+    def _format_stats(self, count, avg, values):
+        stats = {'count': count, 'avg': round(avg, 2) if avg is not None else None}
+        for percentile, value in zip(PERCENTILES, values or [None] * len(PERCENTILES)):
+            stats[f'p{int(percentile * 100)}'] = round(value, 2) if value is not None else None
+        return stats
+
+    # =========================================================
+    # MIGRACIÓN DEL HISTORIAL (mail.tracking.value)
+    # =========================================================
+    @api.model
+    def _get_state_label_map(self):
+        """El seguimiento guarda la etiqueta (en el idioma de quien cambió), no la clave"""
+        mapping = {}
+        for lang, _name in self.env['res.lang'].get_installed():
+            for key, label in self.env['document.control'].with_context(lang=lang).fields_get(['state'])['state']['selection']:
+                mapping[label] = mapping[key] = key
+        return mapping
+
+    @api.model
+    def _cron_backfill_from_tracking(self, batch_size=10000, time_limit=600):
+        """
+        Migra una sola vez los cambios de estado anteriores a la instalación. Lotes por id de seguimiento,
+        confirmados uno a uno; al terminar el cron se desactiva solo.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        until = int(ICP.get_param('custom_document_control.transition_backfill_until', 0))
+        last_id = int(ICP.get_param('custom_document_control.transition_backfill_last_id', 0))
+        field_id = self.env['ir.model.fields']._get('document.control', 'state').id
+        labels = self._get_state_label_map()
+        started = time.monotonic()
+        done = 0
+        while last_id < until and time.monotonic() - started < time_limit:
+            self.env.cr.execute(SQL("""
+                SELECT v.id, m.res_id, v.old_value_char, v.new_value_char, m.create_uid, m.date
+                  FROM mail_tracking_value v
+                  JOIN mail_message m ON m.id = v.mail_message_id
+                  JOIN document_control d ON d.id = m.res_id
+                 WHERE v.field_id = %s AND m.model = 'document.control' AND v.id > %s AND v.id <= %s
+                 ORDER BY v.id
+                 LIMIT %s
+            """, field_id, last_id, until, batch_size))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                last_id = until
+                break
+            last_id = rows[-1][0]
+            values = [(res_id, labels.get(old), labels[new], uid, date)
+                      for _id, res_id, old, new, uid, date in rows if new in labels]
+            if values:
+                doc_ids, from_states, to_states, uids, dates = (list(column) for column in zip(*values))
+                self.env.cr.execute(SQL("""
+                    INSERT INTO document_state_transition (document_id, from_state, to_state, user_id, date)
+                    SELECT * FROM unnest(%s::int[], %s::varchar[], %s::varchar[], %s::int[], %s::timestamp[])
+                """, doc_ids, from_states, to_states, uids, dates))
+                self._recompute_stays(list(set(doc_ids)))
+                done += len(values)
+            ICP.set_param('custom_document_control.transition_backfill_last_id', last_id)
+            self.env.cr.commit()
+        if last_id >= until:
+            self.env.ref('custom_document_control.ir_cron_document_transition_backfill').active = False
+            _logger.info("Transiciones: migración del historial terminada")
+        else:
+            self.env.ref('custom_document_control.ir_cron_document_transition_backfill')._trigger()
+        if done:
+            _logger.info("Transiciones: %s cambios de estado migrados desde el seguimiento", done)
+
+    @api.model
+    def _recompute_stays(self, doc_ids):
+        """Re-encadena las estadías de los documentos dados (las migradas llegan fuera de orden)"""
+        self.env.cr.execute(SQL("""
+            UPDATE document_state_transition t
+               SET date_end = n.next_date, duration_hours = EXTRACT(EPOCH FROM n.next_date - t.date) / 3600
+              FROM (SELECT id, LEAD(date) OVER (PARTITION BY document_id ORDER BY date, id) AS next_date
+                      FROM document_state_transition WHERE document_id = ANY(%s)) n
+             WHERE t.id = n.id AND t.date_end IS DISTINCT FROM n.next_date
+        """, doc_ids))
+        self.invalidate_model()
+
+
+class DocumentControl(models.Model):
+    _inherit = 'document.control'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['document.state.transition']._log_transitions([(doc.id, None, doc.state or 'draft') for doc in records])
+        return records
+
+    def write(self, vals):
+        """Cubre todas las acciones del flujo (inicio, envío, revisión, aprobación y rechazo), que cambian 'state' con write"""
+        if 'state' not in vals:
+            return super().write(vals)
+        before = {doc.id: doc.state for doc in self}
+        res = super().write(vals)
+        self.env['document.state.transition']._log_transitions([
+            (doc.id, before[doc.id], doc.state) for doc in self if doc.state != before[doc.id]
+        ])
+        return res
@@ -0,0 +1,186 @@
+#-*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import config
+from odoo.tools.mimetypes import guess_mimetype
+from datetime import timedelta
+import hashlib
+import os
+import shutil
+import uuid
+
+CHUNK_READ_SIZE = 1024 * 1024
+# ir.attachment.file_size es int4: por encima no se puede registrar el tamaño en el adjunto
+INT4_MAX = 2 ** 31 - 1
+
+
+class DocumentUploadSession(models.Model):
+    """
+    Subida por partes y reanudable de archivos grandes (PDF / editables).
+    Las partes se escriben en un archivo temporal y al terminar se enlazan (o copian)
+    directamente al filestore, sin pasar nunca por base64; el temporal se borra al confirmar.
+    """
+    _name = 'document.upload.session'
+    _description = 'Subida por Partes'
+
+    token = fields.Char(required=True, readonly=True, index=True, default=lambda self: uuid.uuid4().hex)
+    document_id = fields.Many2one('document.control', required=True, ondelete='cascade', readonly=True)
+    field_name = fields.Selection([('pdf_file', 'PDF'), ('editable_file', 'Editable')], required=True, readonly=True)
+    filename = fields.Char(required=True, readonly=True)
+    # Float (double precision, exacto hasta 2^53): un Integer es int4 y no llega a 2 GiB
+    total_size = fields.Float(required=True, readonly=True)
+    received_size = fields.Float(default=0, readonly=True)
+    checksum = fields.Char('SHA-1 esperado', readonly=True)
+    user_id = fields.Many2one('res.users', default=lambda self: self.env.user, required=True, readonly=True)
+    state = fields.Selection([('open', 'En curso'), ('done', 'Terminada')], default='open', required=True, readonly=True)
+
+    _sql_constraints = [('token_uniq', 'unique(token)', 'Token de subida duplicado')]
+
+    # =========================================================
+    # AYUDANTES
+    # =========================================================
+    @api.model
+    def _get_upload_dir(self):
+        path = os.path.join(config['data_dir'], 'document_uploads', self.env.cr.dbname)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _get_part_path(self):
+        self.ensure_one()
+        return os.path.join(self._get_upload_dir(), f'{self.token}.part')
+
+    @api.model
+    def _get_session(self, token):
+        session = self.sudo().search([('token', '=', token), ('user_id', '=', self.env.uid), ('state', '=', 'open')], limit=1)
+        if not session:
+            raise UserError("La sesión de subida no existe o ya terminó.")
+        return session
+
+    # =========================================================
+    # PROTOCOLO: start -> chunk* -> finish
+    # =========================================================
+    @api.model
+    def _start(self, document_id, field_name, filename, total_size, checksum=None):
+        """Abre (o reanuda) una sesión. Devuelve el token y cuántos bytes ya tenemos."""
+        doc = self.env['document.control'].browse(int(document_id)).exists()
+        if not doc:
+            raise UserError("El documento no existe.")
+        doc.check_access('write')
+        doc._check_write_permission(doc.folder_id)
+        vals = {
+            'document_id': doc.id,
+            'field_name': field_name,
+            'filename': filename,
+            'total_size': int(total_size),
+            'checksum': checksum or False,
+        }
+        session = self.sudo().search([(k, '=', v) for k, v in vals.items()] + [
+            ('user_id', '=', self.env.uid), ('state', '=', 'open'),
+        ], limit=1)
+        if session:
+            # Reanudar: el archivo temporal manda sobre lo registrado
+            part = session._get_part_path()
+            received = os.path.getsize(part) if os.path.exists(part) else 0
+            session.received_size = min(received, session.total_size)
+        else:
+            session = self.sudo().create(dict(vals, user_id=self.env.uid))
+        return {'token': session.token, 'received_size': int(session.received_size)}
+
+    def _append_chunk(self, offset, stream):
+        """Escribe una parte leyendo el cuerpo de la petición por bloques"""
+        self.ensure_one()
+        if offset != self.received_size:
+            raise ValidationError(f"Desfase de subida: se esperaba el byte {self.received_size}.")
+        part = self._get_part_path()
+        if os.path.exists(part) and os.stat(part).st_nlink > 1:
+            # Enlazada al filestore por un _finish revertido: no modificar ese archivo en el lugar
+            shutil.copyfile(part, f'{part}.tmp')
+            os.replace(f'{part}.tmp', part)
+        with open(part, 'r+b' if os.path.exists(part) else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            while True:
+                block = stream.read(CHUNK_READ_SIZE)
+                if not block:
+                    break
+                f.write(block)
+                if f.tell() > self.total_size:
+                    f.truncate(offset)
+                    raise ValidationError("La subida supera el tamaño declarado.")
+            received = f.tell()
+        self.received_size = received
+        return received
+
+    def _finish(self):
+        """Verifica tamaño y checksum y enlaza el archivo al filestore como adjunto del campo"""
+        self.ensure_one()
+        part = self._get_part_path()
+        if not os.path.exists(part) or os.path.getsize(part) != self.total_size:
+            raise ValidationError("La subida está incompleta.")
+
+        sha = hashlib.sha1()
+        with open(part, 'rb') as f:
+            head = f.read(1024)
+            sha.update(head)
+            for block in iter(lambda: f.read(CHUNK_READ_SIZE), b''):
+                sha.update(block)
+        checksum = sha.hexdigest()
+        if self.checksum and self.checksum.lower() != checksum:
+            raise ValidationError("El checksum del archivo no coincide; vuelve a subirlo.")
+
+        doc = self.document_id.with_user(self.user_id)
+        Attachment = self.env['ir.attachment'].sudo()
+        Attachment.search([
+            ('res_model', '=', doc._name), ('res_field', '=', self.field_name), ('res_id', '=', doc.id),
+        ]).unlink()
+        vals = {
+            'name': self.field_name,
+            'res_model': doc._name,
+            'res_field': self.field_name,
+            'res_id': doc.id,
+            'type': 'binary',
+            'mimetype': guess_mimetype(head),
+        }
+        if Attachment._storage() == 'file':
+            fname = f'{checksum[:2]}/{checksum}'
+            full_path = Attachment._full_path(fname)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if not os.path.exists(full_path):
+                self._link_into_filestore(part, full_path)
+                # Si la transacción falla, el GC del filestore limpia la copia (la parte sigue para reintentar)
+                Attachment._mark_for_gc(fname)
+            vals.update(store_fname=fname, file_size=int(self.total_size) if self.total_size <= INT4_MAX else 0, checksum=checksum)
+        else:
+            with open(part, 'rb') as f:
+                vals['raw'] = f.read()
+        Attachment.create(vals)
+
+        doc.invalidate_recordset([self.field_name])
+        filename_field = self.field_name.replace('_file', '_filename')
+        doc.write({filename_field: self.filename})
+        self.state = 'done'
+        # El archivo temporal se borra solo si el adjunto quedó confirmado
+        self.env.cr.postcommit.add(lambda: os.path.exists(part) and os.unlink(part))
+        return {'document_id': doc.id, 'field': self.field_name, 'checksum': checksum, 'size': int(self.total_size)}
+
+    @staticmethod
+    def _link_into_filestore(part, full_path):
+        """Enlace duro si el filestore está en el mismo disco; si no, copia atómica (temporal + rename)"""
+        try:
+            os.link(part, full_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            tmp_path = f'{full_path}.{uuid.uuid4().hex}.tmp'
+            shutil.copyfile(part, tmp_path)
+            os.replace(tmp_path, full_path)
+
+    @api.autovacuum
+    def _gc_stale_sessions(self):
+        """Sesiones abandonadas más de 2 días: borrar registro y archivo temporal"""
+        stale = self.sudo().search(['|', ('state', '=', 'done'), ('write_date', '<', fields.Datetime.now() - timedelta(days=2))])
+        for session in stale:
+            part = session._get_part_path()
+            if os.path.exists(part):
+                os.unlink(part)
+        stale.unlink()
@@ -0,0 +1,178 @@
+#-*- coding: utf-8 -*-
+"""
+Motor de marca de agua. Funciones puras (sin ORM ni cursor): los PDF grandes se estampan
+en un proceso aparte (este mismo archivo ejecutado como script, sin Odoo), que los parte
+en rangos de páginas, los estampa en paralelo en un ProcessPoolExecutor y los vuelve a
+unir en orden. El servidor nunca hace fork: en modo multihilo (y en los tests) hay otros
+hilos vivos y en prefork el worker es un proceso vigilado; el proceso auxiliar arranca
+limpio (un solo hilo) y ahí el pool con fork es seguro.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.errors import PyPdfError
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+except ImportError:
+    PdfReader = None
+    PyPdfError = ValueError
+
+_logger = logging.getLogger(__name__)
+
+# Páginas por tarea: suficientes para amortizar el parseo del PDF en cada proceso
+MIN_PAGES_PER_CHUNK = 25
+# Por debajo de este tamaño el costo de arrancar los procesos supera lo que se gana
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+# Tope para el proceso auxiliar; si se pasa, se estampa en serie
+PARALLEL_TIMEOUT = 600
+
+# PDF y sello del proceso hijo: llegan una sola vez por proceso (initializer), no en cada tarea
+_worker_args = None
+
+
+def make_stamp(text):
+    """PDF de una página con el texto en diagonal (mismo diseño de siempre)"""
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=letter)
+    c.setFont("Helvetica-Bold", 50)
+    c.setFillColorRGB(0.5, 0.5, 0.5, 0.2)
+    c.saveState()
+    c.translate(300, 400); c.rotate(45); c.drawCentredString(0, 0, text)
+    c.restoreState()
+    c.save()
+    return packet.getvalue()
+
+
+def _stamp_pages(data, stamp, start, end):
+    """Estampa las páginas [start, end) y devuelve un PDF solo con ellas"""
+    reader = PdfReader(io.BytesIO(data))
+    water = PdfReader(io.BytesIO(stamp)).pages[0]
+    writer = PdfWriter()
+    for page in reader.pages[start:end]:
+        page.merge_page(water)
+        writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def _init_worker(data, stamp):
+    global _worker_args
+    _worker_args = (data, stamp)
+
+
+def _stamp_range(start, end):
+    data, stamp = _worker_args
+    return _stamp_pages(data, stamp, start, end)
+
+
+def _split(pages, workers):
+    size = max(MIN_PAGES_PER_CHUNK, -(-pages // (workers * 2)))
+    return [(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+
+def _stamp_parallel(data, text, workers):
+    """Dentro del proceso auxiliar: estampa por rangos en un pool y une las partes en orden"""
+    stamp = make_stamp(text)
+    pages = len(PdfReader(io.BytesIO(data)).pages)
+    ranges = _split(pages, workers)
+    if len(ranges) < 2 or threading.active_count() > 1:
+        return _stamp_pages(data, stamp, 0, pages)
+    # fork: los hijos heredan el PDF sin serializarlo; cada tarea lleva solo su rango
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=multiprocessing.get_context('fork'),
+                             initializer=_init_worker, initargs=(data, stamp)) as pool:
+        parts = list(pool.map(_stamp_range, *zip(*ranges)))
+    writer = PdfWriter()
+    for part in parts:
+        for page in PdfReader(io.BytesIO(part)).pages:
+            writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def _stamp_in_subprocess(data, text, workers):
+    """Lanza este archivo como script: el PDF va por stdin y vuelve por stdout"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), text, str(workers)],
+        input=data, capture_output=True, check=True, timeout=PARALLEL_TIMEOUT,
+    )
+    return result.stdout
+
+
+def stamp_pdf(data, text, parallel_threshold=200, max_workers=None, min_bytes=PARALLEL_MIN_BYTES):
+    """
+    Marca de agua en todas las páginas.
+    - parallel_threshold: desde cuántas páginas se estampa en paralelo (0 = nunca).
+    - min_bytes: tamaño mínimo del PDF para estampar en paralelo.
+    - max_workers: procesos del pool (por defecto, núcleos disponibles hasta 4).
+    """
+    pages = len(PdfReader(io.BytesIO(data)).pages)
+    workers = max_workers or min(4, os.cpu_count() or 1)
+    if parallel_threshold and pages >= parallel_threshold and len(data) >= min_bytes and workers >= 2:
+        try:
+            return _stamp_in_subprocess(data, text, workers)
+        except (OSError, subprocess.SubprocessError):
+            # Sin recursos para crear procesos, PDF que el auxiliar no pudo leer o tiempo agotado:
+            # se hace en serie (y si el PDF está dañado, el error sale de aquí con su tipo)
+            _logger.warning("Marca de agua en paralelo no disponible, se hace en serie", exc_info=True)
+    return _stamp_pages(data, make_stamp(text), 0, pages)
+
+
+# =========================================================
+# SELLO DINÁMICO DE DESCARGA
+# =========================================================
+def make_header_stamp(text, width, height):
+    """Franja superior (parte fija del sello), al tamaño de la página"""
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=(width, height))
+    c.setFont("Helvetica-Bold", 10)
+    c.setFillColorRGB(0.7, 0, 0)
+    c.drawCentredString(width / 2, height - 18, text)
+    c.save()
+    return packet.getvalue()
+
+
+def make_footer_stamp(text, width, height):
+    """Pie con quién y cuándo descargó (parte variable del sello)"""
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=(width, height))
+    c.setFont("Helvetica", 8)
+    c.setFillColorRGB(0.7, 0, 0)
+    c.drawCentredString(width / 2, 12, text)
+    c.save()
+    return packet.getvalue()
+
+
+def stamp_fitted(data, make_stamp_page, text):
+    """Estampa cada página con un sello del mismo tamaño; un sello por tamaño de página distinto"""
+    reader = PdfReader(io.BytesIO(data))
+    writer = PdfWriter()
+    stamps = {}
+    for page in reader.pages:
+        width, height = float(page.mediabox.width), float(page.mediabox.height)
+        key = (round(width), round(height))
+        if key not in stamps:
+            stamps[key] = PdfReader(io.BytesIO(make_stamp_page(text, width, height))).pages[0]
+        page.merge_page(stamps[key])
+        writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+if __name__ == '__main__':
+    # Proceso auxiliar de stamp_pdf: argumentos texto y procesos; PDF por stdin, resultado por stdout
+    try:
+        sys.stdout.buffer.write(_stamp_parallel(sys.stdin.buffer.read(), sys.argv[1], int(sys.argv[2])))
+    except BrokenProcessPool:
+        sys.exit(1)
@@ -0,0 +1,60 @@
+/** @odoo-module **/
+/**
+ * Árbol de carpetas perezoso: cada nodo pide sus hijos al servidor solo al expandirse.
+ */
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { rpc } from "@web/core/network/rpc";
+import { useService } from "@web/core/utils/hooks";
+
+export class FolderTreeNode extends Component {
+    static template = "custom_document_control.FolderTreeNode";
+    static props = ["node", "loadChildren", "openFolder"];
+
+    setup() {
+        this.state = useState({ expanded: false, loading: false, children: null });
+    }
+
+    async toggle() {
+        if (!this.props.node.child_count) {
+            return;
+        }
+        if (!this.state.children) {
+            this.state.loading = true;
+            this.state.children = await this.props.loadChildren(this.props.node.id);
+            this.state.loading = false;
+        }
+        this.state.expanded = !this.state.expanded;
+    }
+}
+FolderTreeNode.components = { FolderTreeNode };
+
+export class FolderTree extends Component {
+    static template = "custom_document_control.FolderTree";
+    static components = { FolderTreeNode };
+    static props = ["*"];
+
+    setup() {
+        this.action = useService("action");
+        this.state = useState({ roots: [] });
+        onWillStart(async () => {
+            this.state.roots = await this.loadChildren(false);
+        });
+    }
+
+    loadChildren(parentId) {
+        return rpc("/document_control/folder_tree", { parent_id: parentId });
+    }
+
+    openFolder(node) {
+        this.action.doAction({
+            type: "ir.actions.act_window",
+            name: node.complete_name,
+            res_model: "document.control",
+            views: [[false, "list"], [false, "form"]],
+            domain: [["folder_id", "child_of", node.id]],
+        });
+    }
+}
+
+registry.category("actions").add("document_control.folder_tree", FolderTree);
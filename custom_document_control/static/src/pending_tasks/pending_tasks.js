@@ -0,0 +1,51 @@
+/** @odoo-module **/
+/**
+ * Contador de documentos pendientes en la barra superior: conteos y primera página en una sola llamada.
+ * El servidor avisa por el bus cuando cambian los pendientes del usuario y el contador se recarga.
+ */
+import { Component, onMounted, onWillStart, onWillUnmount, useState } from "@odoo/owl";
+import { Dropdown } from "@web/core/dropdown/dropdown";
+import { DropdownItem } from "@web/core/dropdown/dropdown_item";
+import { registry } from "@web/core/registry";
+import { rpc } from "@web/core/network/rpc";
+import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+
+export class PendingTasksSystray extends Component {
+    static template = "custom_document_control.PendingTasksSystray";
+    static components = { Dropdown, DropdownItem };
+    static props = {};
+
+    setup() {
+        this.action = useService("action");
+        this.busService = useService("bus_service");
+        this.state = useState({ total: 0, counts: [], tasks: [] });
+        onWillStart(() => this.load());
+        // Ráfagas de avisos (p. ej. un cambio masivo) se agrupan en una sola recarga
+        const reload = debounce(() => this.load(), 1000);
+        onMounted(() => this.busService.subscribe("custom_document_control/pending_tasks", reload));
+        onWillUnmount(() => {
+            this.busService.unsubscribe("custom_document_control/pending_tasks", reload);
+            reload.cancel();
+        });
+    }
+
+    async load() {
+        Object.assign(this.state, await rpc("/document_control/pending_tasks", { limit: 10 }));
+    }
+
+    openTask(task) {
+        this.action.doAction({
+            type: "ir.actions.act_window",
+            res_model: "document.control",
+            res_id: task.id,
+            views: [[false, "form"]],
+        });
+    }
+
+    openAll() {
+        this.action.doAction("custom_document_control.action_my_pending_tasks");
+    }
+}
+
+registry.category("systray").add("document_control.pending_tasks", { Component: PendingTasksSystray }, { sequence: 25 });
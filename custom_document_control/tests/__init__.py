@@ -0,0 +1,11 @@
+from . import test_performance
+from . import test_document_transition
+from . import test_document_folder_move
+from . import test_document_watermark
+from . import test_document_revision
+from . import test_document_upload
+from . import test_document_download
+from . import test_document_folder_tree
+from . import test_document_pending
+from . import test_document_dashboard
+from . import test_document_certificate
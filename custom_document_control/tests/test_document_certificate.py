@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from unittest import skipIf
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.custom_document_control.models.document_certificate import SimpleDocTemplate
+
+
+@tagged('post_install', '-at_install')
+@skipIf(not SimpleDocTemplate, 'reportlab no disponible')
+class TestDocumentCertificate(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.env['ir.config_parameter'].sudo().set_param('custom_document_control.certificate_engine', 'reportlab')
+        area = cls.env['document.area'].create({'name': 'Certificados', 'code': 'CER'})
+        doc_type = cls.env['document.type'].create({'name': 'Certificados', 'code': 'CER'})
+        cls.doc = cls.env['document.control'].create({
+            'name': 'Procedimiento <certificado>', 'code': 'CER-001', 'version': '1.0', 'state': 'approved',
+            'area_id': area.id, 'type_id': doc_type.id, 'description': 'Alcance & límites',
+        })
+
+    def test_reportlab_engine_renders_pdf(self):
+        self.assertTrue(self.doc._render_certificate_pdf().startswith(b'%PDF'))
+        action = self.doc.action_view_certificate()
+        self.assertEqual(action['type'], 'ir.actions.act_url')
+        self.assertTrue(self.doc._get_certificate_attachment())
+
+    def test_missing_certificate_raises_user_error(self):
+        with patch.object(type(self.doc), '_render_certificate_pdf', side_effect=UserError('sin motor')):
+            with self.assertRaises(UserError):
+                self.doc.action_view_certificate()
+        self.assertFalse(self.doc._get_certificate_attachment())
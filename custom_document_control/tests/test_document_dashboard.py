@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentDashboard(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Stat = cls.env['document.dashboard.stat']
+        cls.reader = mail_new_test_user(cls.env, login='dashboard_reader', groups='base.group_user')
+        cls.area = cls.env['document.area'].create({'name': 'Tablero', 'code': 'TAB'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Tablero', 'code': 'TAB'})
+        cls.folder = cls.env['document.folder'].create({'name': 'Tablero'})
+
+    def _create_document(self, **vals):
+        # Los borradores comparten el código 'Borrador': cada uno con su versión
+        self.version_minor = getattr(self, 'version_minor', 0) + 1
+        return self.env['document.control'].create(dict({
+            'name': 'Procedimiento', 'version': f'1.{self.version_minor}',
+            'area_id': self.area.id, 'type_id': self.doc_type.id, 'folder_id': self.folder.id,
+        }, **vals))
+
+    def test_kpis_match_documents(self):
+        for state in ('draft', 'review', 'approved', 'approved'):
+            self._create_document(state=state)
+        self.env.flush_all()
+        self.Stat._refresh(self.env.cr)
+
+        kpis = self.Stat.with_user(self.reader)._get_kpis()
+        Document = self.env['document.control'].with_user(self.reader)
+        # El tablero agrupa por carpeta: los documentos sin carpeta no cuentan
+        filed = [('folder_id', '!=', False)]
+        self.assertEqual(sum(kpis['by_state'].values()), Document.search_count(filed))
+        self.assertEqual(kpis['by_state'].get('approved', 0), Document.search_count(filed + [('state', '=', 'approved')]))
+        self.assertEqual(kpis['by_area']['TAB'], 4)
+
+    def _snapshot(self):
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT folder_id, area_id, type_id, state, overdue, approval_month, doc_count
+              FROM document_dashboard_stat WHERE doc_count != 0
+        """)
+        return {row[:-1]: row[-1] for row in self.env.cr.fetchall()}
+
+    def test_deltas_match_full_refresh(self):
+        self.env.flush_all()
+        self.Stat._refresh(self.env.cr)
+        other_folder = self.env['document.folder'].create({'name': 'Tablero 2'})
+        published = [self._create_document(state='approved', issue_date='2000-01-01',
+                                            approval_date='2000-01-15 10:00:00') for _i in range(3)]
+        draft = self._create_document()
+        gone = self._create_document(state='review')
+
+        draft.write({'state': 'review', 'folder_id': other_folder.id})
+        published[0].write({'folder_id': other_folder.id})
+        gone.unlink()
+        # Intervalo del área: la próxima revisión cambia por SQL y los publicados quedan vencidos
+        self.area.write({'review_interval_months': 12})
+        self.assertTrue(all(doc.next_review_date for doc in published))
+
+        self.Stat._apply_deltas()
+        by_deltas = self._snapshot()
+        self.Stat._refresh(self.env.cr)
+        self.assertEqual(by_deltas, self._snapshot())
+        self.assertEqual(by_deltas[(self.folder.id, self.area.id, self.doc_type.id, 'approved', True,
+                                    fields.Date.to_date('2000-01-01'))], 2)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import shutil
+from unittest import skipIf
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.custom_document_control.models import document_download
+from odoo.addons.custom_document_control.models.watermark import PdfReader
+
+
+@tagged('post_install', '-at_install')
+@skipIf(not PdfReader, 'pypdf/reportlab no disponibles')
+class TestDocumentDownload(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from reportlab.pdfgen import canvas
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        packet = io.BytesIO()
+        c = canvas.Canvas(packet)
+        c.drawString(100, 750, 'Procedimiento')
+        c.showPage()
+        c.save()
+        area = cls.env['document.area'].create({'name': 'Descargas', 'code': 'DES'})
+        doc_type = cls.env['document.type'].create({'name': 'Descargas', 'code': 'DES'})
+        cls.doc = cls.env['document.control'].create({
+            'name': 'Procedimiento', 'area_id': area.id, 'type_id': doc_type.id,
+            'pdf_file': base64.b64encode(packet.getvalue()), 'pdf_filename': 'proc.pdf',
+        })
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = self.doc._get_download_cache_dir()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+
+    def _download(self):
+        with patch.object(document_download, 'stamp_fitted', wraps=document_download.stamp_fitted) as stamp:
+            data = self.doc._get_stamped_download()
+        return data, stamp.call_count
+
+    def test_repeated_download_served_from_cache(self):
+        first, stamped = self._download()
+        self.assertEqual(stamped, 2)  # franja fija (base) y pie del usuario
+        self.assertIn(self.env.user.name, PdfReader(io.BytesIO(first)).pages[0].extract_text())
+        second, stamped = self._download()
+        self.assertEqual(stamped, 0)
+        self.assertEqual(second, first)
+
+    def test_other_user_reuses_base_only(self):
+        self._download()
+        other = self.env['res.users'].create({'name': 'Otro Lector', 'login': 'document_download_other'})
+        self.doc = self.doc.with_user(other)
+        data, stamped = self._download()
+        self.assertEqual(stamped, 1)
+        self.assertIn('Otro Lector', PdfReader(io.BytesIO(data)).pages[0].extract_text())
+
+    def test_evicted_copy_is_regenerated(self):
+        first, _stamped = self._download()
+        # Otro worker desalojó toda la caché entre la consulta y la lectura
+        shutil.rmtree(self.doc._get_download_cache_dir())
+        second, stamped = self._download()
+        self.assertEqual(stamped, 2)
+        self.assertEqual(len(PdfReader(io.BytesIO(second)).pages), 1)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import AccessError, UserError
+from odoo.tests import TransactionCase, tagged
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentFolderMove(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Folder = cls.env['document.folder']
+        cls.AclLog = cls.env['document.folder.acl.log']
+        cls.area = cls.env['document.area'].create({'name': 'Movimientos', 'code': 'MOV'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Movimientos', 'code': 'MOV'})
+        cls.user = cls.env['res.users'].create({'name': 'Lector', 'login': 'document_move_reader'})
+        cls.group = cls.env['res.groups'].create({'name': 'Documentos A'})
+        cls.other_group = cls.env['res.groups'].create({'name': 'Documentos B'})
+
+    def _create_tree(self, prefix):
+        """origen / A / B / C: A con un grupo; B (y por cascada C) con otro; ninguna con usuarios"""
+        source = self.Folder.create({'name': f'{prefix} Origen'})
+        top = self.Folder.create({'name': 'A', 'parent_id': source.id})
+        child = self.Folder.create({'name': 'B', 'parent_id': top.id})
+        grandchild = self.Folder.create({'name': 'C', 'parent_id': child.id})
+        top.write({'allowed_group_ids': [(6, 0, self.group.ids)]})
+        child.write({'allowed_group_ids': [(6, 0, self.other_group.ids)]})
+        return source, top, child, grandchild
+
+    def _acl(self, folder):
+        return (
+            sorted((a.user_id.id, a.access_level) for a in folder.access_ids),
+            sorted(folder.allowed_group_ids.ids),
+            sorted(folder.access_user_ids.ids),
+        )
+
+    def _create_document(self, folder):
+        # Los borradores comparten el código 'Borrador': cada uno con su versión
+        self.version_minor = getattr(self, 'version_minor', 0) + 1
+        return self.env['document.control'].create({
+            'name': 'Procedimiento', 'version': f'1.{self.version_minor}',
+            'area_id': self.area.id, 'type_id': self.doc_type.id, 'folder_id': folder.id,
+        })
+
+    # =========================================================
+    # VALIDACIONES Y VISTA PREVIA
+    # =========================================================
+    def test_dry_run_changes_nothing(self):
+        source, top, child, grandchild = self._create_tree('Prueba')
+        target = self.Folder.create({'name': 'Destino', 'allowed_group_ids': [(6, 0, self.other_group.ids)]})
+        subtree = top | child | grandchild
+        before = [(f.parent_id, f.parent_path, f.complete_name, self._acl(f)) for f in subtree]
+        logs = self.AclLog.search_count([])
+
+        preview = top._bulk_move(target, dry_run=True)
+
+        self.env.invalidate_all()
+        self.assertEqual([(f.parent_id, f.parent_path, f.complete_name, self._acl(f)) for f in subtree], before)
+        self.assertEqual(self.AclLog.search_count([]), logs)
+        self.assertEqual(len(preview), 1)
+        self.assertEqual(preview[0]['folder_id'], top.id)
+        self.assertEqual(preview[0]['new_name'], 'Destino / A')
+        self.assertEqual(preview[0]['folder_count'], 3)
+        self.assertTrue(preview[0]['inherits_acl'])
+
+    def test_move_into_own_subtree_is_rejected(self):
+        source, top, child, grandchild = self._create_tree('Prueba')
+        for target in (top, grandchild):
+            with self.assertRaises(UserError):
+                top._bulk_move(target)
+        self.assertEqual(top.parent_id, source)
+
+    # =========================================================
+    # ESTRUCTURA Y CONTEOS
+    # =========================================================
+    def test_move_rewrites_paths_and_names(self):
+        source, top, child, grandchild = self._create_tree('Prueba')
+        target = self.Folder.create({'name': 'Destino'})
+        top._bulk_move(target)
+
+        self.assertEqual(top.parent_id, target)
+        self.assertEqual(grandchild.parent_path, f'{target.parent_path}{top.id}/{child.id}/{grandchild.id}/')
+        self.assertEqual(grandchild.complete_name, 'Destino / A / B / C')
+        self.assertEqual(self.Folder.search([('id', 'child_of', target.id)]), target | top | child | grandchild)
+
+    def test_move_updates_subtree_counts(self):
+        root = self.Folder.create({'name': 'Raíz'})
+        source, top, child, grandchild = self._create_tree('Prueba')
+        source.parent_id = root
+        target = self.Folder.create({'name': 'Destino', 'parent_id': root.id})
+        for folder in (top, grandchild, grandchild):
+            self._create_document(folder)
+        top._bulk_move(target)
+
+        # Los conteos por carpeta se confirman al hacer commit: en el test se rehacen a mano
+        self.env['document.folder.count']._rebuild()
+        counts = self.Folder._get_tree_counts((root | source | target | top).ids)
+        self.assertEqual(counts[source.id], (0, 0, 0))
+        self.assertEqual(counts[target.id], (1, 0, 3))
+        self.assertEqual(counts[top.id], (1, 1, 3))
+        self.assertEqual(counts[root.id], (2, 0, 3))
+
+    # =========================================================
+    # PERMISOS
+    # =========================================================
+    def test_move_replaces_acl_and_logs_it(self):
+        source, top, child, grandchild = self._create_tree('Prueba')
+        target = self.Folder.create({
+            'name': 'Destino',
+            'access_ids': [(0, 0, {'user_id': self.user.id, 'access_level': 'write'})],
+            'allowed_group_ids': [(6, 0, self.other_group.ids)],
+        })
+        top._bulk_move(target)
+
+        for folder in (top, child, grandchild):
+            self.assertEqual(self._acl(folder), self._acl(target))
+        grants = self.AclLog.search([
+            ('folder_ref', 'in', (top | child | grandchild).ids),
+            ('user_ref', '=', self.user.id), ('operation', '=', 'grant'),
+        ])
+        self.assertEqual(sorted(grants.mapped('folder_ref')), sorted((top | child | grandchild).ids))
+        self.assertEqual(set(grants.mapped('access_level')), {'write'})
+        # C no tenía usuarios explícitos (todos escribían): se revoca el acceso abierto
+        self.assertTrue(self.AclLog.search([('folder_ref', '=', grandchild.id), ('user_ref', '=', 0),
+                                            ('operation', '=', 'revoke')]))
+
+    def test_move_matches_write_cascade(self):
+        # Destino con usuarios y sin grupos: write() pasa los grupos de la carpeta movida a sus hijas
+        target = self.Folder.create({
+            'name': 'Destino', 'access_ids': [(0, 0, {'user_id': self.user.id, 'access_level': 'read'})],
+        })
+        trees = [self._create_tree('Write'), self._create_tree('Masivo')]
+        trees[0][1].write({'parent_id': target.id})
+        trees[1][1]._bulk_move(target)
+
+        by_write, by_bulk = trees[0][1:], trees[1][1:]
+        for written, moved in zip(by_write, by_bulk):
+            self.assertEqual(self._acl(moved), self._acl(written))
+        self.assertEqual(by_bulk[2].allowed_group_ids, self.group)
+
+    def test_move_requires_write_on_whole_subtree(self):
+        mover = mail_new_test_user(self.env, login='document_move_writer', groups='base.group_user')
+        source, top, child, grandchild = self._create_tree('Prueba')
+        # Puede escribir en la carpeta movida pero solo leer una subcarpeta
+        grandchild.write({'access_ids': [(0, 0, {'user_id': mover.id, 'access_level': 'read'})]})
+        target = self.Folder.create({'name': 'Destino'})
+        with self.assertRaises(AccessError):
+            top.with_user(mover)._bulk_move(target)
+        self.assertEqual(top.parent_id, source)
+        self.assertEqual(grandchild.complete_name, 'Prueba Origen / A / B / C')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentFolderTree(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Folder = cls.env['document.folder']
+        cls.reader = mail_new_test_user(cls.env, login='tree_reader', groups='base.group_user')
+        cls.area = cls.env['document.area'].create({'name': 'Árbol', 'code': 'ARB'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Árbol', 'code': 'ARB'})
+        # Árbol / A / A1 y Árbol / B
+        cls.root = cls.Folder.create({'name': 'Árbol'})
+        cls.folder_a = cls.Folder.create({'name': 'A', 'parent_id': cls.root.id})
+        cls.folder_a1 = cls.Folder.create({'name': 'A1', 'parent_id': cls.folder_a.id})
+        cls.folder_b = cls.Folder.create({'name': 'B', 'parent_id': cls.root.id})
+
+    def _create_document(self, folder):
+        # Los borradores comparten el código 'Borrador': cada uno con su versión
+        self.version_minor = getattr(self, 'version_minor', 0) + 1
+        return self.env['document.control'].create({
+            'name': 'Procedimiento', 'version': f'1.{self.version_minor}',
+            'area_id': self.area.id, 'type_id': self.doc_type.id, 'folder_id': folder.id,
+        })
+
+    def _run_precommit(self):
+        # Conteos por carpeta y versión de permisos se aplican al confirmar: en el test se fuerzan
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+
+    def _level(self, parent_id=False):
+        return {node['id']: node for node in self.Folder.with_user(self.reader)._get_tree_level(parent_id)}
+
+    def test_tree_level_counts(self):
+        for folder in (self.root, self.folder_a, self.folder_a, self.folder_a1):
+            self._create_document(folder)
+        self._run_precommit()
+
+        root = self._level()[self.root.id]
+        self.assertEqual((root['child_count'], root['document_count'], root['subtree_document_count']), (2, 1, 4))
+        children = self._level(self.root.id)
+        self.assertEqual(set(children), {self.folder_a.id, self.folder_b.id})
+        self.assertEqual(len(children), root['child_count'])
+        node_a = children[self.folder_a.id]
+        self.assertEqual((node_a['child_count'], node_a['document_count'], node_a['subtree_document_count']), (1, 2, 3))
+        self.assertEqual(node_a['complete_name'], 'Árbol / A')
+
+    def test_counts_hide_unreadable_folders(self):
+        other = mail_new_test_user(self.env, login='tree_other', groups='base.group_user')
+        hidden = self.Folder.create({
+            'name': 'Oculta', 'parent_id': self.root.id,
+            'access_ids': [(0, 0, {'user_id': other.id, 'access_level': 'write'})],
+        })
+        for folder in (self.folder_b, hidden, hidden):
+            self._create_document(folder)
+        self._run_precommit()
+
+        # El lector no ve la carpeta oculta ni sus documentos: ni en el árbol ni en los campos de la lista
+        root = self._level()[self.root.id]
+        self.assertEqual((root['child_count'], root['subtree_document_count']), (2, 1))
+        self.assertNotIn(hidden.id, self._level(self.root.id))
+        as_reader = self.root.with_user(self.reader)
+        self.assertEqual((as_reader.child_count, as_reader.subtree_document_count), (2, 1))
+
+        # Con acceso a todo se cuenta todo
+        as_admin = self.root.with_user(self.env.ref('base.user_admin'))
+        as_admin.invalidate_recordset()
+        self.assertEqual((as_admin.child_count, as_admin.subtree_document_count), (3, 3))
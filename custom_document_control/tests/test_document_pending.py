@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentPending(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.reader = mail_new_test_user(cls.env, login='pending_reader', groups='base.group_user')
+        cls.area = cls.env['document.area'].create({'name': 'Pendientes', 'code': 'PEN'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Pendientes', 'code': 'PEN'})
+        cls.folder = cls.env['document.folder'].create({'name': 'Pendientes'})
+
+    def _create_document(self, **vals):
+        # Los borradores comparten el código 'Borrador': cada uno con su versión
+        self.version_minor = getattr(self, 'version_minor', 0) + 1
+        return self.env['document.control'].create(dict({
+            'name': 'Procedimiento', 'version': f'1.{self.version_minor}',
+            'area_id': self.area.id, 'type_id': self.doc_type.id, 'folder_id': self.folder.id,
+        }, **vals))
+
+    def _pending(self, **kwargs):
+        self.env.flush_all()
+        return self.env['document.control'].with_user(self.reader)._get_pending_tasks(**kwargs)
+
+    def test_counts_and_first_page(self):
+        reviews = [self._create_document(state='review', reviewer_ids=[(6, 0, self.reader.ids)]) for _i in range(3)]
+        approval = self._create_document(state='validate', approver_ids=[(6, 0, self.reader.ids)])
+        self._create_document(state='review')  # de otro revisor
+
+        result = self._pending(limit=2)
+        counts = {count['kind']: count['count'] for count in result['counts']}
+        self.assertEqual(counts, {'review': 3, 'validate': 1, 'upload': 0})
+        self.assertEqual(result['total'], 4)
+        self.assertEqual(len(result['tasks']), 2)
+
+        tasks = self._pending(limit=10)['tasks']
+        self.assertEqual({task['id'] for task in tasks}, {doc.id for doc in reviews} | {approval.id})
+        self.assertEqual({task['kind'] for task in tasks if task['id'] == approval.id}, {'validate'})
+        self.assertEqual(tasks[0]['folder'], 'Pendientes')
+
+    def test_unreadable_tasks_are_not_counted(self):
+        visible = self._create_document(state='review', reviewer_ids=[(6, 0, self.reader.ids)])
+        hidden_folder = self.env['document.folder'].create({'name': 'Pendientes ocultos'})
+        hidden = self._create_document(state='review', reviewer_ids=[(6, 0, self.reader.ids)], folder_id=hidden_folder.id)
+        self.assertEqual(self._pending()['total'], 2)  # deja en caché las carpetas legibles
+
+        # Se cierra la carpeta sin confirmar: la caché de carpetas legibles todavía la incluye
+        other = self.env['res.users'].create({'name': 'Otro', 'login': 'pending_other'})
+        hidden_folder.write({'access_ids': [(0, 0, {'user_id': other.id, 'access_level': 'write'})]})
+        result = self._pending(limit=1)
+        self.assertEqual(result['total'], 1)
+        self.assertEqual([task['id'] for task in result['tasks']], visible.ids)
+        self.assertNotIn(hidden.id, [task['id'] for task in self._pending(offset=1)['tasks']])
+
+    def test_changes_notify_affected_users(self):
+        other = mail_new_test_user(self.env, login='pending_other_reviewer', groups='base.group_user')
+        doc = self._create_document(state='upload', reviewer_ids=[(6, 0, self.reader.ids)])
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+
+        Users = type(self.env['res.users'])
+        with patch.object(Users, '_bus_send', autospec=True) as bus_send:
+            # Cambia de revisor: se avisa al que lo pierde y al que lo recibe, una vez cada uno
+            doc.write({'state': 'review', 'reviewer_ids': [(6, 0, other.ids)]})
+            doc.write({'name': 'Procedimiento renombrado'})
+            self.env.flush_all()
+            self.env.cr.precommit.run()
+        calls = [call for call in bus_send.call_args_list if call.args[1] == 'custom_document_control/pending_tasks']
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(set(calls[0].args[0].ids), {self.reader.id, other.id, doc.owner_id.id})
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentRevision(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.area = cls.env['document.area'].create({'name': 'Revisiones', 'code': 'RVS'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Revisiones', 'code': 'RVS'})
+
+    def _create_published(self, code, version):
+        return self.env['document.control'].create({
+            'name': f'Procedimiento {code}', 'code': code, 'version': version, 'state': 'approved',
+            'area_id': self.area.id, 'type_id': self.doc_type.id,
+        })
+
+    # =========================================================
+    # VERSIÓN ESTRUCTURADA
+    # =========================================================
+    def test_version_parts_order_numerically(self):
+        docs = self._create_published('RVS-001', '1.9') | self._create_published('RVS-001', '1.10')
+        self.assertEqual([(d.version_major, d.version_minor) for d in docs], [(1, 9), (1, 10)])
+        self.assertEqual(self._create_published('RVS-002', '2').version_minor, 0)
+        ordered = self.env['document.control'].search([('code', '=', 'RVS-001')])
+        self.assertEqual(ordered.mapped('version'), ['1.10', '1.9'])
+
+    def test_invalid_version_rejected_on_write(self):
+        doc = self._create_published('RVS-003', '1.0')
+        for version in ('v1', '1.0.1', '1.a'):
+            with self.assertRaises(ValidationError):
+                doc.write({'version': version})
+
+    def test_legacy_invalid_version_does_not_abort_recompute(self):
+        doc = self._create_published('RVS-004', '3.2')
+        # Filas antiguas con otro formato (lo que encuentra la actualización del módulo)
+        self.env.cr.execute("UPDATE document_control SET version = 'v1' WHERE id = %s", [doc.id])
+        doc.invalidate_recordset(['version'])
+        doc._compute_version_parts()
+        self.assertEqual((doc.version_major, doc.version_minor), (0, 0))
+        with self.assertRaises(ValidationError):
+            doc._create_revisions('minor')
+
+    # =========================================================
+    # REVISIONES EN LOTE
+    # =========================================================
+    def test_create_revisions_links_through_write(self):
+        docs = self._create_published('RVS-005', '1.4') | self._create_published('RVS-006', '2.0')
+        minor = docs._create_revisions('minor')
+        self.assertEqual(docs.active_revision_id, minor)
+        self.assertEqual(minor.mapped('version'), ['1.5', '2.1'])
+        self.assertEqual(set(minor.mapped('state')), {'upload'})
+        # El enlace pasó por write(): el feed de cambios registró los documentos de origen
+        self.assertLessEqual(set(docs.ids), set(self.env.cr.precommit.data['custom_document_control.change_feed']))
+
+        major = self._create_published('RVS-007', '1.4')._create_revisions('major')
+        self.assertEqual(major.version, '2.0')
+        with self.assertRaises(UserError):
+            docs._create_revisions('minor')  # ya tienen una revisión en curso
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentTransition(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Transition = cls.env['document.state.transition']
+        cls.area = cls.env['document.area'].create({'name': 'Transiciones', 'code': 'TRA'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Transiciones', 'code': 'TRA'})
+        cls.folder = cls.env['document.folder'].create({'name': 'Transiciones'})
+
+    def _create_document(self, **vals):
+        # Los borradores comparten el código 'Borrador': cada uno con su versión
+        self.version_minor = getattr(self, 'version_minor', 0) + 1
+        return self.env['document.control'].create(dict({
+            'name': 'Procedimiento', 'version': f'1.{self.version_minor}',
+            'area_id': self.area.id, 'type_id': self.doc_type.id, 'folder_id': self.folder.id,
+        }, **vals))
+
+    def _stays(self, doc):
+        return self.Transition.search([('document_id', '=', doc.id)], order='date, id')
+
+    def _insert_stays(self, rows):
+        """rows: [(documento, desde, hacia, fecha, fecha de salida)] con fechas fijas para los informes"""
+        for doc, from_state, to_state, date, date_end in rows:
+            self.env.cr.execute("""
+                INSERT INTO document_state_transition (document_id, from_state, to_state, date, date_end, duration_hours)
+                VALUES (%s, %s, %s, %s, %s, EXTRACT(EPOCH FROM %s::timestamp - %s::timestamp) / 3600)
+            """, [doc.id, from_state, to_state, date, date_end, date_end, date])
+        self.Transition.invalidate_model()
+
+    # =========================================================
+    # REGISTRO EN VIVO
+    # =========================================================
+    def test_log_transitions_opens_and_closes_stays(self):
+        doc = self._create_document()
+        stays = self._stays(doc)
+        self.assertEqual(len(stays), 1)
+        self.assertEqual((stays.from_state, stays.to_state), (False, 'draft'))
+        self.assertFalse(stays.date_end)
+
+        doc.write({'state': 'upload'})
+        first, second = self._stays(doc)
+        self.assertEqual(first.to_state, 'draft')
+        self.assertTrue(first.date_end)
+        self.assertGreaterEqual(first.duration_hours, 0)
+        self.assertEqual((second.from_state, second.to_state), ('draft', 'upload'))
+        self.assertFalse(second.date_end)
+
+    def test_write_without_state_change_logs_nothing(self):
+        doc = self._create_document()
+        doc.write({'state': 'draft', 'name': 'Procedimiento renombrado'})
+        self.assertEqual(len(self._stays(doc)), 1)
+
+    # =========================================================
+    # MIGRACIÓN DEL HISTORIAL
+    # =========================================================
+    def _track(self, doc, old, new, date):
+        message = self.env['mail.message'].create({
+            'model': doc._name, 'res_id': doc.id, 'message_type': 'notification', 'date': date,
+        })
+        return self.env['mail.tracking.value'].create({
+            'field_id': self.env['ir.model.fields']._get('document.control', 'state').id,
+            'old_value_char': old,
+            'new_value_char': new,
+            'mail_message_id': message.id,
+        })
+
+    def _run_backfill(self, since_id, until_id, **kwargs):
+        ICP = self.env['ir.config_parameter'].sudo()
+        ICP.set_param('custom_document_control.transition_backfill_last_id', since_id)
+        ICP.set_param('custom_document_control.transition_backfill_until', until_id)
+        cron = self.env.ref('custom_document_control.ir_cron_document_transition_backfill')
+        cron.active = True
+        # Los lotes se confirman uno a uno: en el test todo queda en la transacción
+        with patch.object(type(self.env.cr), 'commit'), patch.object(type(cron), '_trigger') as trigger:
+            self.Transition._cron_backfill_from_tracking(**kwargs)
+        return cron, trigger
+
+    def test_backfill_maps_labels_from_every_language(self):
+        self.env['res.lang']._activate_lang('fr_FR')
+        Document = self.env['document.control']
+        fields_get = type(Document).fields_get
+        french = {'upload': 'Chargement', 'review': 'Révision', 'validate': 'Approbation'}
+
+        def fake_fields_get(model, allfields=None, attributes=None):
+            res = fields_get(model, allfields, attributes)
+            if model.env.context.get('lang') == 'fr_FR' and 'state' in res:
+                res['state']['selection'] = [(key, french.get(key, label)) for key, label in res['state']['selection']]
+            return res
+
+        doc = self._create_document()
+        now = datetime.now()
+        first = self._track(doc, 'Borrador', 'Carga', now - timedelta(days=10))
+        self._track(doc, 'Chargement', 'Révision', now - timedelta(days=6))
+        self._track(doc, 'review', 'validate', now - timedelta(days=3))
+        last = self._track(doc, 'Approbation', 'Etiqueta desconocida', now - timedelta(days=1))
+        with patch.object(type(Document), 'fields_get', fake_fields_get):
+            self._run_backfill(first.id - 1, last.id)
+
+        migrated = self._stays(doc).filtered(lambda t: t.date < now - timedelta(hours=1))
+        self.assertEqual(
+            [(t.from_state, t.to_state) for t in migrated],
+            [('draft', 'upload'), ('upload', 'review'), ('review', 'validate')],
+        )
+
+    def test_backfill_rechains_with_live_stays(self):
+        doc = self._create_document()
+        live = self._stays(doc)
+        now = live.date
+        first = self._track(doc, 'Carga', 'Revisión', now - timedelta(days=10))
+        last = self._track(doc, 'Revisión', 'Aprobación', now - timedelta(days=4))
+        self._run_backfill(first.id - 1, last.id)
+
+        review, validate, draft = self._stays(doc)
+        self.assertEqual(review.to_state, 'review')
+        self.assertEqual(review.date_end, validate.date)
+        self.assertAlmostEqual(review.duration_hours, 6 * 24, places=2)
+        # La estadía migrada más reciente se cierra donde empieza la registrada en vivo
+        self.assertEqual(validate.date_end, draft.date)
+        self.assertEqual(draft, live)
+        self.assertFalse(draft.date_end)
+
+    def test_backfill_deactivates_at_until(self):
+        doc = self._create_document()
+        first = self._track(doc, 'Borrador', 'Carga', datetime.now() - timedelta(days=2))
+        second = self._track(doc, 'Carga', 'Revisión', datetime.now() - timedelta(days=1))
+
+        # Sin tiempo disponible no migra nada: queda pendiente y se vuelve a disparar
+        cron, trigger = self._run_backfill(first.id - 1, second.id, batch_size=1, time_limit=0)
+        self.assertTrue(cron.active)
+        trigger.assert_called_once()
+
+        # Lo posterior a 'until' ya se registró en vivo: no se migra
+        self._track(doc, 'Revisión', 'Aprobación', datetime.now())
+        cron, trigger = self._run_backfill(first.id - 1, second.id, batch_size=1)
+        self.assertFalse(cron.active)
+        trigger.assert_not_called()
+        self.assertEqual(
+            self.env['ir.config_parameter'].sudo().get_param('custom_document_control.transition_backfill_last_id'),
+            str(second.id),
+        )
+        self.assertEqual(self._stays(doc).mapped('to_state').count('validate'), 0)
+
+    # =========================================================
+    # INFORMES
+    # =========================================================
+    def test_cycle_time_stats(self):
+        docs = [self._create_document(name=f'Procedimiento {i}') for i in range(5)]
+        start = datetime(2001, 1, 1)
+        rows = []
+        for hours, doc in zip((1, 2, 3, 4), docs):
+            submitted = start + timedelta(hours=hours)
+            rows += [
+                (doc, 'upload', 'review', submitted, submitted + timedelta(hours=hours)),
+                (doc, 'review', 'approved', submitted + timedelta(hours=hours), submitted + timedelta(days=30)),
+            ]
+        # Un rechazo tras 24 horas en revisión: cuenta para la revisión, no para el ciclo de punta a punta
+        rows += [
+            (docs[4], 'upload', 'review', start + timedelta(days=1), start + timedelta(days=2)),
+            (docs[4], 'review', 'upload', start + timedelta(days=2), start + timedelta(days=3)),
+        ]
+        self._insert_stays(rows)
+
+        stats = self.Transition._get_cycle_time_stats(date_from=start, date_to=start + timedelta(days=10))
+        review = stats['by_state']['review']
+        # Estadías en revisión: 1, 2, 3, 4 y 24 horas
+        self.assertEqual((review['count'], review['avg']), (5, 6.8))
+        self.assertEqual((review['p50'], review['p90'], review['p95']), (3.0, 16.0, 20.0))
+        self.assertEqual(stats['by_state']['upload']['count'], 1)
+        self.assertEqual(stats['rejections'], 1)
+        # Primer envío -> aprobación: 1, 2, 3 y 4 horas
+        cycle = stats['submit_to_approval']
+        self.assertEqual((cycle['count'], cycle['avg']), (4, 2.5))
+        self.assertEqual((cycle['p50'], cycle['p90'], cycle['p95']), (2.5, 3.7, 3.85))
+
+        empty = self.Transition._get_cycle_time_stats(date_from=datetime(1990, 1, 1), date_to=datetime(1990, 2, 1))
+        self.assertEqual(empty['by_state'], {})
+        self.assertEqual(empty['submit_to_approval'], {'count': 0, 'avg': None, 'p50': None, 'p90': None, 'p95': None})
+        self.assertEqual(empty['rejections'], 0)
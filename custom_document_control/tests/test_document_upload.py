@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+import io
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentUpload(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Session = cls.env['document.upload.session']
+        area = cls.env['document.area'].create({'name': 'Subidas', 'code': 'SUB'})
+        doc_type = cls.env['document.type'].create({'name': 'Subidas', 'code': 'SUB'})
+        cls.doc = cls.env['document.control'].create({
+            'name': 'Procedimiento', 'area_id': area.id, 'type_id': doc_type.id,
+            'pdf_file': base64.b64encode(b'%PDF-1.4 original'), 'pdf_filename': 'original.pdf',
+        })
+
+    def _upload(self, data, filename, chunk_size=7):
+        started = self.Session._start(self.doc.id, 'pdf_file', filename, len(data), hashlib.sha1(data).hexdigest())
+        session = self.Session._get_session(started['token'])
+        for offset in range(started['received_size'], len(data), chunk_size):
+            session._append_chunk(offset, io.BytesIO(data[offset:offset + chunk_size]))
+        return session._finish()
+
+    def test_chunked_upload_replaces_pdf(self):
+        data = b'%PDF-1.4 nuevo, subido por partes'
+        result = self._upload(data, 'nuevo.pdf')
+        self.assertEqual(result['size'], len(data))
+        self.assertEqual(base64.b64decode(self.doc.pdf_file), data)
+        self.assertEqual(self.doc.pdf_filename, 'nuevo.pdf')
+
+    def test_chunked_upload_drops_optimized_copy(self):
+        # Copia optimizada del PDF anterior (la deja el cron de la vista previa)
+        self.doc.with_context(document_pdf_processed=True).write({
+            'pdf_optimized_file': base64.b64encode(b'%PDF-1.4 original optimizado'),
+            'pdf_size_before': 100, 'pdf_size_after': 50,
+        })
+        self.assertEqual(self.doc._get_pdf_attachment().raw, b'%PDF-1.4 original optimizado')
+
+        data = b'%PDF-1.4 reemplazo'
+        self._upload(data, 'reemplazo.pdf')
+        self.assertFalse(self.doc.pdf_optimized_file)
+        self.assertEqual((self.doc.pdf_size_before, self.doc.pdf_size_after), (0, 0))
+        # Descargas y sellado entregan el PDF recién subido, no la copia vieja
+        self.assertEqual(self.doc._get_pdf_attachment().raw, data)
+        self.assertTrue(self.doc.pdf_preview_pending)
+
+    def test_sizes_beyond_int4(self):
+        size = 5 * 1024 ** 3
+        started = self.Session._start(self.doc.id, 'pdf_file', 'enorme.pdf', size)
+        self.assertEqual(started['received_size'], 0)
+        session = self.Session._get_session(started['token'])
+        session.flush_recordset()
+        session.invalidate_recordset()
+        self.assertEqual(int(session.total_size), size)
+        # Reanudar la misma subida encuentra la sesión por su tamaño declarado
+        self.assertEqual(self.Session._start(self.doc.id, 'pdf_file', 'enorme.pdf', size)['token'], started['token'])
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+from unittest import skipIf
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.custom_document_control.models import watermark
+from odoo.addons.custom_document_control.models.watermark import PdfReader, stamp_pdf
+
+
+@tagged('post_install', '-at_install')
+@skipIf(not PdfReader, 'pypdf/reportlab no disponibles')
+class TestDocumentWatermark(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+
+    def _make_pdf(self, pages):
+        from reportlab.pdfgen import canvas
+        packet = io.BytesIO()
+        c = canvas.Canvas(packet)
+        for page in range(pages):
+            c.drawString(100, 750, f'Página {page + 1}')
+            c.showPage()
+        c.save()
+        return packet.getvalue()
+
+    def _page_texts(self, data):
+        return [page.extract_text() for page in PdfReader(io.BytesIO(data)).pages]
+
+    def test_parallel_matches_serial(self):
+        data = self._make_pdf(60)
+        serial = stamp_pdf(data, 'COPIA CONTROLADA', parallel_threshold=0)
+        with patch.object(watermark, '_stamp_in_subprocess', wraps=watermark._stamp_in_subprocess) as helper:
+            parallel = stamp_pdf(data, 'COPIA CONTROLADA', parallel_threshold=1, max_workers=2, min_bytes=0)
+        helper.assert_called_once()
+        # Mismas páginas, en el mismo orden y con el sello
+        self.assertEqual(self._page_texts(parallel), self._page_texts(serial))
+        self.assertIn('Página 60', self._page_texts(parallel)[-1])
+        self.assertIn('COPIA CONTROLADA', self._page_texts(parallel)[0])
+
+    def test_small_pdf_stays_in_process(self):
+        with patch.object(watermark, '_stamp_in_subprocess') as helper:
+            out = stamp_pdf(self._make_pdf(3), 'COPIA CONTROLADA', parallel_threshold=1, max_workers=2)
+        helper.assert_not_called()
+        self.assertEqual(len(PdfReader(io.BytesIO(out)).pages), 3)
+
+    def test_helper_failure_falls_back_to_serial(self):
+        data = self._make_pdf(30)
+        with patch.object(watermark.subprocess, 'run', side_effect=OSError('sin procesos')):
+            out = stamp_pdf(data, 'COPIA CONTROLADA', parallel_threshold=1, max_workers=2, min_bytes=0)
+        self.assertEqual(len(PdfReader(io.BytesIO(out)).pages), 30)
+
+    def test_apply_watermark_skips_damaged_pdf(self):
+        area = self.env['document.area'].create({'name': 'Marca', 'code': 'MAR'})
+        doc_type = self.env['document.type'].create({'name': 'Marca', 'code': 'MAR'})
+        doc = self.env['document.control'].create({
+            'name': 'Procedimiento', 'area_id': area.id, 'type_id': doc_type.id,
+            'pdf_file': base64.b64encode(self._make_pdf(2)), 'pdf_filename': 'proc.pdf',
+        })
+        doc._apply_watermark('COPIA CONTROLADA', 'APROBADO')
+        self.assertEqual(doc.pdf_filename, 'APROBADO - proc.pdf')
+
+        doc.write({'pdf_file': base64.b64encode(b'%PDF-1.4 roto'), 'pdf_filename': 'roto.pdf'})
+        doc._apply_watermark('COPIA CONTROLADA', 'APROBADO')
+        self.assertEqual(doc.pdf_filename, 'roto.pdf')
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de rendimiento para el control de documentos.
+
+No corre con los tests estándar. Se lanza explícitamente con:
+
+    odoo-bin -d <db> -i custom_document_control --test-tags document_benchmark
+
+Variables de entorno:
+    DOCUMENT_BENCHMARK_SIZE       Nº de documentos sintéticos (por defecto 10000, hasta 200000)
+    DOCUMENT_BENCHMARK_DEPTH      Profundidad del árbol de carpetas (por defecto 5)
+    DOCUMENT_BENCHMARK_BRANCHING  Subcarpetas por carpeta (por defecto 3)
+    DOCUMENT_BENCHMARK_TOLERANCE  Margen sobre la línea base antes de fallar (por defecto 1.25)
+    DOCUMENT_BENCHMARK_RECORD     Si vale 1, guarda los resultados como nueva línea base
+
+Un caso sin línea base grabada se omite (skip): la línea base se graba una vez en la máquina
+de referencia (DOCUMENT_BENCHMARK_RECORD=1) y benchmark_baselines.json se versiona con ella.
+Aquí solo se mide; las comprobaciones de comportamiento están en los tests funcionales
+(test_document_*.py), que corren en la CI normal.
+"""
+import base64
+import io
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+from odoo.addons.custom_document_control.models.document_control import PdfReader
+from odoo.addons.custom_document_control.models.watermark import stamp_pdf
+
+_logger = logging.getLogger(__name__)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baselines.json')
+
+
+@tagged('post_install', '-at_install', '-standard', 'document_benchmark')
+class TestDocumentPerformance(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.size = int(os.environ.get('DOCUMENT_BENCHMARK_SIZE', 10000))
+        cls.depth = int(os.environ.get('DOCUMENT_BENCHMARK_DEPTH', 5))
+        cls.branching = int(os.environ.get('DOCUMENT_BENCHMARK_BRANCHING', 3))
+        cls.tolerance = float(os.environ.get('DOCUMENT_BENCHMARK_TOLERANCE', 1.25))
+        cls.record = os.environ.get('DOCUMENT_BENCHMARK_RECORD') == '1'
+        with open(BASELINE_PATH) as f:
+            cls.baselines = json.load(f)
+        cls.results = {}
+
+        cls.env = cls.env(context=dict(
+            cls.env.context, tracking_disable=True, mail_create_nolog=True, mail_notrack=True,
+        ))
+        cls.reader = mail_new_test_user(cls.env, login='bench_reader', groups='base.group_user')
+        cls.writer = mail_new_test_user(cls.env, login='bench_writer', groups='base.group_user')
+        cls.area = cls.env['document.area'].create({'name': 'Benchmark', 'code': 'BEN'})
+        cls.category = cls.env['document.category'].create({'name': 'Benchmark', 'code': 'BE'})
+        cls.doc_type = cls.env['document.type'].create({'name': 'Benchmark', 'code': 'BEN'})
+        cls.folders = cls._create_folder_tree()
+        cls._create_documents()
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.record and cls.results:
+            baselines = dict(cls.baselines, **cls.results)
+            with open(BASELINE_PATH, 'w') as f:
+                json.dump(baselines, f, indent=4, sort_keys=True)
+                f.write('\n')
+        super().tearDownClass()
+
+    # =========================================================
+    # DATOS SINTÉTICOS
+    # =========================================================
+    @classmethod
+    def _create_folder_tree(cls):
+        """Árbol de carpetas profundo; las raíces alternan: pública, lectura, escritura"""
+        Folder = cls.env['document.folder']
+        folders = Folder.browse()
+        level = Folder.browse()
+        for i in range(cls.branching):
+            access = []
+            if i % 3 == 1:
+                access = [(0, 0, {'user_id': cls.reader.id, 'access_level': 'read'})]
+            elif i % 3 == 2:
+                access = [
+                    (0, 0, {'user_id': cls.reader.id, 'access_level': 'read'}),
+                    (0, 0, {'user_id': cls.writer.id, 'access_level': 'write'}),
+                ]
+            level |= Folder.create({'name': f'Raíz {i}', 'access_ids': access})
+        folders |= level
+        for depth in range(1, cls.depth):
+            next_level = Folder.browse()
+            for parent in level:
+                for i in range(cls.branching):
+                    # La herencia de permisos del padre la hace create()
+                    next_level |= Folder.create({'name': f'Nivel {depth}.{i}', 'parent_id': parent.id})
+            folders |= next_level
+            level = next_level
+        return folders
+
+    @classmethod
+    def _create_documents(cls):
+        """Inserción masiva por SQL: el ORM tardaría horas con 200k documentos"""
+        cls.env.flush_all()
+        cls.env.cr.execute("""
+            INSERT INTO document_control (
+                name, code, version, version_major, version_minor, area_id, category_id, type_id, folder_id, owner_id,
+                document_scope, state, sequence_number,
+                create_uid, write_uid, create_date, write_date
+            )
+            SELECT
+                'Documento ' || g,
+                'BEN-BE-BEN-' || lpad((g / 3)::text, 6, '0'),
+                (1 + g %% 3) || '.0', 1 + g %% 3, 0,
+                %(area)s, %(category)s, %(type)s,
+                (%(folders)s::int[])[1 + g %% %(nfolders)s],
+                %(owner)s,
+                'internal',
+                (ARRAY['draft', 'upload', 'review', 'validate', 'approved', 'obsolete'])[1 + g %% 6],
+                g / 3,
+                %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+            FROM generate_series(1, %(size)s) g
+        """, {
+            'area': cls.area.id,
+            'category': cls.category.id,
+            'type': cls.doc_type.id,
+            'folders': cls.folders.ids,
+            'nfolders': len(cls.folders),
+            'owner': cls.writer.id,
+            'uid': cls.env.uid,
+            'size': cls.size,
+        })
+        cls.env.invalidate_all()
+
+    # =========================================================
+    # MEDICIÓN
+    # =========================================================
+    @contextmanager
+    def _measure(self, name):
+        """Cuenta consultas SQL y tiempo; compara contra la línea base grabada"""
+        key = f'{name}@{self.size}'
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+        self.results[key] = {'queries': queries, 'time': round(elapsed, 4)}
+        _logger.info('Benchmark %s: %s consultas, %.3fs', key, queries, elapsed)
+
+        if self.record:
+            return
+        baseline = self.baselines.get(key)
+        if not baseline:
+            self.skipTest(f"{key}: sin línea base; grabarla con DOCUMENT_BENCHMARK_RECORD=1 y versionar benchmark_baselines.json")
+        self.assertLessEqual(
+            queries, baseline['queries'],
+            f"{key}: {queries} consultas, la línea base es {baseline['queries']}",
+        )
+        self.assertLessEqual(
+            elapsed, baseline['time'] * self.tolerance,
+            f"{key}: {elapsed:.3f}s, la línea base es {baseline['time']:.3f}s",
+        )
+
+    def _make_pdf(self, pages):
+        from reportlab.pdfgen import canvas
+        packet = io.BytesIO()
+        c = canvas.Canvas(packet)
+        for page in range(pages):
+            c.drawString(100, 750, f'Página {page + 1}')
+            c.showPage()
+        c.save()
+        return base64.b64encode(packet.getvalue())
+
+    # =========================================================
+    # CASOS
+    # =========================================================
+    def test_list_search_folder_rules(self):
+        """Lista de documentos como usuario normal (reglas de carpeta aplicadas)"""
+        Document = self.env['document.control'].with_user(self.reader)
+        with self._measure('list_search'):
+            Document.web_search_read(
+                [('state', '!=', 'obsolete')],
+                {'code': {}, 'name': {}, 'version': {}, 'state': {}, 'folder_id': {}},
+                limit=80,
+            )
+            Document.search_count([('state', '!=', 'obsolete')])
+
+    def test_folder_write_acl_cascade(self):
+        """Cambiar permisos de una raíz propaga a todo su subárbol"""
+        root = self.folders.filtered(lambda f: not f.parent_id)[:1]
+        with self._measure('folder_acl_cascade'):
+            root.write({'access_ids': [(0, 0, {'user_id': self.writer.id, 'access_level': 'write'})]})
+
+    def test_action_start_flow(self):
+        """Asignación de código con el registro lleno"""
+        doc = self.env['document.control'].create({
+            'name': 'Nuevo',
+            'area_id': self.area.id,
+            'category_id': self.category.id,
+            'type_id': self.doc_type.id,
+            'folder_id': self.folders[0].id,
+        })
+        with self._measure('action_start_flow'):
+            doc.action_start_flow()
+
+    def test_compute_history_ids(self):
+        """Historial de versiones para una página de lista"""
+        docs = self.env['document.control'].search([], limit=80)
+        with self._measure('compute_history_ids'):
+            docs.mapped('history_ids')
+
+    def test_apply_watermark(self):
+        """Marca de agua sobre un PDF de 50 páginas"""
+        if not PdfReader:
+            self.skipTest('pypdf/reportlab no disponibles')
+        doc = self.env['document.control'].search([('state', '=', 'validate')], limit=1)
+        doc.write({'pdf_file': self._make_pdf(50), 'pdf_filename': 'bench.pdf'})
+        with self._measure('apply_watermark'):
+            doc._apply_watermark('COPIA CONTROLADA', 'APROBADO')
+
+    def test_create_revisions(self):
+        """Revisión menor de una página de documentos publicados con un solo create"""
+        docs = self.env['document.control'].search([('state', '=', 'approved'), ('active_revision_id', '=', False)], limit=80)
+        with self._measure('create_revisions'):
+            docs._create_revisions('minor')
+
+    def test_watermark_parallel_throughput(self):
+        """Marca de agua en serie vs. en paralelo (proceso auxiliar con pool) para 10, 100 y 1000 páginas"""
+        if not PdfReader:
+            self.skipTest('pypdf/reportlab no disponibles')
+        for pages in (10, 100, 1000):
+            data = base64.b64decode(self._make_pdf(pages))
+            # min_bytes=0: los PDF sintéticos pesan menos que el mínimo de producción
+            for mode, threshold in (('serial', 0), ('parallel', 1)):
+                with self.subTest(pages=pages, mode=mode):
+                    start = time.perf_counter()
+                    with self._measure(f'watermark_{mode}_{pages}'):
+                        stamp_pdf(data, 'COPIA CONTROLADA', parallel_threshold=threshold, max_workers=4, min_bytes=0)
+                    elapsed = time.perf_counter() - start
+                    _logger.info('Marca de agua %s, %s páginas: %.1f páginas/s', mode, pages, pages / elapsed)
+
+    def test_certificate_engines(self):
+        """Certificado: motor reportlab en proceso vs. QWeb + wkhtmltopdf"""
+        doc = self.env['document.control'].search([('state', '=', 'approved')], limit=1)
+        doc.write({'approved_by_id': self.writer.id, 'approval_date': fields.Datetime.now(), 'issue_date': fields.Date.today()})
+        ICP = self.env['ir.config_parameter'].sudo()
+        for engine in ('reportlab', 'qweb'):
+            with self.subTest(engine=engine):
+                ICP.set_param('custom_document_control.certificate_engine', engine)
+                try:
+                    with self._measure(f'certificate_{engine}'):
+                        doc._render_certificate_pdf()
+                except (UserError, OSError) as e:
+                    # Sin wkhtmltopdf (o sin reportlab) no hay con qué comparar
+                    self.skipTest(f'Motor {engine} no disponible: {e}')
+
+    def test_dashboard_kpis(self):
+        """KPIs del tablero como usuario normal: solo lee la tabla de agregados"""
+        Stat = self.env['document.dashboard.stat']
+        Stat._refresh(self.env.cr)  # los documentos sintéticos se insertaron por SQL, sin deltas
+        with self._measure('dashboard_kpis'):
+            Stat.with_user(self.reader)._get_kpis()
+
+    def test_folder_tree_level(self):
+        """Árbol de carpetas: raíces y un nivel expandido como usuario normal"""
+        self.env['document.folder.count']._rebuild()  # los documentos sintéticos se insertaron por SQL, sin deltas
+        Folder = self.env['document.folder'].with_user(self.reader)
+        with self._measure('folder_tree_level'):
+            roots = Folder._get_tree_level()
+            if roots:
+                Folder._get_tree_level(roots[0]['id'])
+
+    def test_bulk_folder_move(self):
+        """Mover todas las carpetas de segundo nivel bajo un padre nuevo en una sola operación"""
+        target = self.env['document.folder'].create({'name': 'Reorganización'})
+        folders = self.folders.filtered(lambda f: f.parent_id and not f.parent_id.parent_id)
+        with self._measure('bulk_folder_move'):
+            folders._bulk_move(target)
+
+    def test_pending_tasks(self):
+        """Bandeja de pendientes del revisor: conteos y primera página en una llamada"""
+        self.env.cr.execute("""
+            INSERT INTO doc_rev_rel (document_control_id, res_users_id)
+            SELECT id, %s FROM document_control WHERE state = 'review' ORDER BY id LIMIT 500
+        """, [self.reader.id])
+        Document = self.env['document.control'].with_user(self.reader)
+        with self._measure('pending_tasks'):
+            Document._get_pending_tasks(limit=10)
@@ -1 +1,2 @@
 from . import document_reject_wizard
+from . import document_folder_move_wizard
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from markupsafe import Markup
+
+
+class DocumentFolderMoveWizard(models.TransientModel):
+    _name = 'document.folder.move.wizard'
+    _description = 'Asistente de Movimiento Masivo de Carpetas'
+
+    folder_ids = fields.Many2many('document.folder', string='Carpetas a mover', required=True)
+    target_parent_id = fields.Many2one('document.folder', string='Nuevo padre', help="Vacío: las carpetas pasan a ser raíces.")
+    preview_html = fields.Html('Vista previa', compute='_compute_preview_html', sanitize=False)
+
+    @api.model
+    def default_get(self, fields_list):
+        """Desde la lista de carpetas (Acción > Mover carpetas) tomamos la selección completa"""
+        res = super().default_get(fields_list)
+        ctx = self.env.context
+        if 'folder_ids' in fields_list and ctx.get('active_model') == 'document.folder' and ctx.get('active_ids'):
+            res['folder_ids'] = [(6, 0, ctx['active_ids'])]
+        return res
+
+    @api.depends('folder_ids', 'target_parent_id')
+    def _compute_preview_html(self):
+        for wizard in self:
+            folders, target = wizard.folder_ids._origin, wizard.target_parent_id._origin
+            try:
+                lines = folders._bulk_move(target, dry_run=True) if folders else []
+            except UserError as e:
+                wizard.preview_html = Markup('<div class="alert alert-danger" role="alert">%s</div>') % e.args[0]
+                continue
+            if not lines:
+                wizard.preview_html = Markup('<p class="text-muted">No hay cambios: las carpetas ya están bajo ese padre.</p>')
+                continue
+            rows = Markup().join(Markup(
+                '<tr><td>%s</td><td>%s</td><td class="text-end">%s</td><td class="text-end">%s</td></tr>'
+            ) % (line['old_name'], line['new_name'], line['folder_count'], line['document_count']) for line in lines)
+            note = Markup('<p class="text-warning">Todas las carpetas movidas heredarán los permisos de <b>%s</b>.</p>') % (
+                target.complete_name) if lines[0]['inherits_acl'] else Markup()
+            wizard.preview_html = note + Markup(
+                '<table class="table table-sm"><thead><tr><th>Ruta actual</th><th>Ruta nueva</th>'
+                '<th class="text-end">Carpetas</th><th class="text-end">Documentos</th></tr></thead><tbody>%s</tbody></table>'
+            ) % rows
+
+    def action_confirm_move(self):
+        """Mueve todo en una sola transacción (si algo falla, no se mueve nada)"""
+        self.ensure_one()
+        moved = self.folder_ids._bulk_move(self.target_parent_id)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': f"{len(moved)} carpeta(s) movida(s) con {sum(line['folder_count'] for line in moved)} subcarpeta(s) en total.",
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
+from odoo.exceptions import UserError
 
 class DocumentRejectWizard(models.TransientModel):
     _name = 'document.reject.wizard'
@@ -10,27 +11,43 @@ class DocumentRejectWizard(models.TransientModel):
     
     # Relación con el documento (para saber qué estamos rechazando)
     document_id = fields.Many2one('document.control', string='Documento')
+    # Rechazo masivo: todos los documentos seleccionados en la lista
+    document_ids = fields.Many2many('document.control', string='Documentos')
+
+    @api.model
+    def default_get(self, fields_list):
+        """Si venimos desde la lista (Acción > Rechazar), tomamos la selección completa"""
+        res = super().default_get(fields_list)
+        ctx = self.env.context
+        if 'document_ids' in fields_list and ctx.get('active_model') == 'document.control' and ctx.get('active_ids'):
+            res['document_ids'] = [(6, 0, ctx['active_ids'])]
+        return res
 
     def action_confirm_reject(self):
-        """ Se ejecuta al darle al botón 'Rechazar' del popup """
+        """ Se ejecuta al darle al botón 'Rechazar' del popup (uno o varios documentos) """
         self.ensure_one()
-        doc = self.document_id
-        
-        # 1. Mensaje bonito en el historial (Chatter)
+        docs = self.document_ids | self.document_id
+        if not docs:
+            raise UserError("No hay documentos seleccionados para rechazar.")
+
+        # 0. Solo se puede rechazar lo que está en Revisión o Aprobación
+        invalid = docs.filtered(lambda d: d.state not in ('review', 'validate'))
+        if invalid:
+            raise UserError("Solo se pueden rechazar documentos en Revisión o Aprobación:\n%s" % '\n'.join(invalid.mapped('display_name')))
+
+        # 1. Mensaje bonito en el historial (Chatter) de cada documento
         rejection_msg = f"❌ <b>DOCUMENTO RECHAZADO</b><br/><b>Motivo:</b> {self.reject_reason}"
-        doc.message_post(body=rejection_msg, message_type='comment', subtype_xmlid='mail.mt_comment')
+        for doc in docs:
+            doc.message_post(body=rejection_msg, message_type='comment', subtype_xmlid='mail.mt_comment')
         
-        # 2. Cerrar la tarea pendiente del Aprobador/Revisor actual
-        # (Usamos la función que ya creamos en el modelo principal)
-        doc._close_activity_for_current_user(f"Rechazado: {self.reject_reason}")
+        # 2. Cerrar las tareas pendientes del usuario actual (una sola búsqueda para todos)
+        docs._close_activity_for_current_user(f"Rechazado: {self.reject_reason}")
 
-        # 3. Cambiar el estado hacia atrás (A 'Carga' para que corrijan)
-        doc.state = 'upload'
+        # 3. Cambiar el estado hacia atrás (A 'Carga' para que corrijan) en una sola escritura
+        docs.write({'state': 'upload'})
         
-        # 4. Crear una actividad para el Dueño avisándole que le rechazaron el doc
-        doc.activity_schedule(
-            'mail.mail_activity_data_todo',
-            user_id=doc.owner_id.id,
+        # 4. Crear una actividad para cada Dueño avisándole que le rechazaron el doc (un solo create)
+        docs._schedule_owner_activities(
             summary='🔴 Documento Rechazado',
             note=f'Se ha rechazado tu documento por: {self.reject_reason}. Por favor corrige y vuelve a enviar.',
         )
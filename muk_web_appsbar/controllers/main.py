@@ -0,0 +1,48 @@
+import os
+import mimetypes
+
+from odoo import http
+from odoo.http import request, Stream
+
+
+class CompanyImageController(http.Controller):
+
+    #----------------------------------------------------------
+    # Routes
+    #----------------------------------------------------------
+
+    @http.route(
+        '/muk_web_appsbar/company_image/<int:company_id>/<string:field>/<string:size>/<string:unique>',
+        type='http',
+        auth='public',
+        readonly=True,
+    )
+    def company_image(self, company_id, field, size, unique):
+        company = request.env['res.company'].sudo().browse(company_id).exists()
+        sizes = company._get_company_image_variants().get(field, [])
+        if not company or size not in map(company._get_company_image_size_key, sizes):
+            raise request.not_found()
+        checksum = company._get_company_image_checksums(field).get(company.id)
+        if not checksum:
+            raise request.not_found()
+        if checksum != unique:
+            return request.redirect(
+                f'/muk_web_appsbar/company_image/{company.id}/{field}/{size}/{checksum}',
+                local=True
+            )
+        path = company._get_company_image_variant_path(field, size, unique)
+        if not path:
+            raise request.not_found()
+        stream = Stream(
+            type='path',
+            path=path,
+            mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            download_name=os.path.basename(path),
+            etag=f'{unique}-{size}',
+            last_modified=os.path.getmtime(path),
+            size=os.path.getsize(path),
+            conditional=True,
+            max_age=http.STATIC_CACHE_LONG,
+            immutable=True,
+        )
+        return stream.get_response()
@@ -12,8 +12,11 @@ class IrHttp(models.AbstractModel):
     def session_info(self):
         result = super().session_info()
         if self.env.user._is_internal():
-            for company in self.env.user.company_ids.with_context(bin_size=True):
+            companies = self.env.user.company_ids.with_context(bin_size=True)
+            image_urls = companies.sudo()._get_company_image_urls('appbar_image')
+            for company in companies:
                 result['user_companies']['allowed_companies'][company.id].update({
                     'has_appsbar_image': bool(company.appbar_image),
+                    'appsbar_image_url': image_urls.get(company.id, False),
                 })
         return result
@@ -1,15 +1,145 @@
-from odoo import models, fields
+import os
+import base64
+import logging
+import mimetypes
+import tempfile
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import config, image_process
+from odoo.tools.mimetypes import guess_mimetype
+
+_logger = logging.getLogger(__name__)
 
 
 class ResCompany(models.Model):
-    
+
     _inherit = 'res.company'
-    
+
     #----------------------------------------------------------
     # Fields
     #----------------------------------------------------------
-    
+
     appbar_image = fields.Binary(
         string='Apps Menu Footer Image',
         attachment=True
     )
+
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+
+    @api.model
+    def _get_company_image_variants(self):
+        return {
+            'appbar_image': [(512, 512)],
+        }
+
+    @api.model
+    def _get_company_image_size_key(self, size):
+        return '%sx%s' % size
+
+    @api.model
+    def _get_company_image_cache_dir(self):
+        path = os.path.join(
+            config['data_dir'], 'company_images', self.env.cr.dbname
+        )
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _get_company_image_checksums(self, field):
+        attachments = self.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', self._name),
+            ('res_field', '=', field),
+            ('res_id', 'in', self.ids),
+        ], ['res_id', 'checksum'])
+        return {
+            attachment['res_id']: attachment['checksum']
+            for attachment in attachments
+        }
+
+    def _get_company_image_urls(self, field):
+        sizes = self._get_company_image_variants().get(field)
+        if not sizes:
+            return {}
+        size_key = self._get_company_image_size_key(sizes[0])
+        return {
+            company_id: '/muk_web_appsbar/company_image/%s/%s/%s/%s' % (
+                company_id, field, size_key, checksum
+            )
+            for company_id, checksum in self._get_company_image_checksums(field).items()
+        }
+
+    def _get_company_image_url(self, field):
+        self.ensure_one()
+        return self._get_company_image_urls(field).get(self.id)
+
+    def _get_company_image_variant_prefix(self, field, size_key):
+        self.ensure_one()
+        return '%s_%s_%s_' % (self.id, field, size_key)
+
+    def _find_company_image_variant(self, field, size_key, checksum):
+        prefix = self._get_company_image_variant_prefix(field, size_key)
+        cache_dir = self._get_company_image_cache_dir()
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix + checksum):
+                return os.path.join(cache_dir, name)
+        return None
+
+    def _generate_company_image_variants(self, fields_list=None):
+        variants = self._get_company_image_variants()
+        cache_dir = self._get_company_image_cache_dir()
+        for field in fields_list or variants.keys():
+            checksums = self._get_company_image_checksums(field)
+            for company in self.with_context(bin_size=False):
+                checksum = checksums.get(company.id)
+                data = checksum and base64.b64decode(company[field] or b'')
+                for size in variants.get(field, []):
+                    size_key = self._get_company_image_size_key(size)
+                    prefix = company._get_company_image_variant_prefix(field, size_key)
+                    for name in os.listdir(cache_dir):
+                        if name.startswith(prefix):
+                            os.unlink(os.path.join(cache_dir, name))
+                    if not data:
+                        continue
+                    try:
+                        variant = image_process(data, size=size)
+                    except UserError:
+                        variant = data
+                    extension = mimetypes.guess_extension(
+                        guess_mimetype(variant)
+                    ) or ''
+                    handle, temp_path = tempfile.mkstemp(dir=cache_dir)
+                    with os.fdopen(handle, 'wb') as file:
+                        file.write(variant)
+                    os.replace(temp_path, os.path.join(
+                        cache_dir, f'{prefix}{checksum}{extension}'
+                    ))
+
+    def _get_company_image_variant_path(self, field, size_key, checksum):
+        self.ensure_one()
+        path = self._find_company_image_variant(field, size_key, checksum)
+        if not path:
+            self._generate_company_image_variants([field])
+            path = self._find_company_image_variant(field, size_key, checksum)
+        return path
+
+    #----------------------------------------------------------
+    # ORM
+    #----------------------------------------------------------
+
+    def write(self, vals):
+        res = super().write(vals)
+        image_fields = [
+            field for field in self._get_company_image_variants()
+            if field in vals
+        ]
+        if image_fields:
+            try:
+                self._generate_company_image_variants(image_fields)
+            except OSError:
+                _logger.warning(
+                    'Company image variants could not be cached.',
+                    exc_info=True
+                )
+        return res
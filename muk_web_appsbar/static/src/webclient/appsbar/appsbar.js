@@ -9,7 +9,9 @@ export class AppsBar extends Component {
     static props = {};
 	setup() {
         this.appMenuService = useService('app_menu');
-    	if (user.activeCompany.has_appsbar_image) {
+    	if (user.activeCompany.appsbar_image_url) {
+            this.sidebarImageUrl = user.activeCompany.appsbar_image_url;
+    	} else if (user.activeCompany.has_appsbar_image) {
             this.sidebarImageUrl = url('/web/image', {
                 model: 'res.company',
                 field: 'appbar_image',
@@ -0,0 +1,24 @@
+from odoo import http
+from odoo.http import request
+
+
+class ChatterController(http.Controller):
+
+    #----------------------------------------------------------
+    # Routes
+    #----------------------------------------------------------
+
+    @http.route(
+        '/muk_web_chatter/tracking_summary', 
+        type='jsonrpc', 
+        auth='user',
+        readonly=True,
+    )
+    def tracking_summary(self, thread_model, thread_id):
+        if thread_model not in request.env:
+            raise request.not_found()
+        thread = request.env[thread_model].browse(thread_id).exists()
+        if not thread or not hasattr(thread, '_get_tracking_summary'):
+            raise request.not_found()
+        thread.check_access('read')
+        return thread._get_tracking_summary()
@@ -1,2 +1,4 @@
 from . import ir_http
+from . import mail_message
+from . import mail_thread
 from . import res_users
@@ -0,0 +1,20 @@
+from odoo import models
+from odoo.fields import Domain
+
+
+class MailMessage(models.Model):
+
+    _inherit = 'mail.message'
+
+    #----------------------------------------------------------
+    # Functions
+    #----------------------------------------------------------
+
+    def _message_fetch(self, domain, *args, **kwargs):
+        if self.env.context.get('muk_web_chatter_collapse_tracking'):
+            domain = Domain.AND([domain, [
+                '|', 
+                ('message_type', 'not in', ['notification', 'user_notification']),
+                ('tracking_value_ids', '=', False),
+            ]])
+        return super()._message_fetch(domain, *args, **kwargs)
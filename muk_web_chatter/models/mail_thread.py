@@ -0,0 +1,45 @@
+from odoo import models
+
+
+class MailThread(models.AbstractModel):
+
+    _inherit = 'mail.thread'
+
+    #----------------------------------------------------------
+    # Functions
+    #----------------------------------------------------------
+
+    def _get_tracking_summary(self):
+        self.ensure_one()
+        [(message_count, last_date)] = self.env['mail.message'].sudo()._read_group(
+            [
+                ('model', '=', self._name),
+                ('res_id', '=', self.id),
+                ('message_type', '=', 'notification'),
+                ('tracking_value_ids', '!=', False),
+            ],
+            [],
+            ['__count', 'date:max'],
+        )
+        tracking_groups = self.env['mail.tracking.value'].sudo()._read_group(
+            [
+                ('mail_message_id.model', '=', self._name),
+                ('mail_message_id.res_id', '=', self.id),
+                ('mail_message_id.message_type', '=', 'notification'),
+            ],
+            ['field_id'],
+            ['__count'],
+            order='__count desc',
+        )
+        return {
+            'message_count': message_count,
+            'last_date': last_date,
+            'fields': [
+                {
+                    'name': field.name,
+                    'label': field.field_description,
+                    'count': count,
+                }
+                for field, count in tracking_groups
+            ],
+        }
@@ -1,4 +1,6 @@
+import { useEffect } from "@odoo/owl";
 import { patch } from "@web/core/utils/patch";
+import { rpc } from "@web/core/network/rpc";
 import { browser } from "@web/core/browser/browser";
 
 import { Chatter } from "@mail/chatter/web_portal/chatter";
@@ -13,6 +15,31 @@ patch(Chatter.prototype, {
             showNotificationMessages != null ? 
             JSON.parse(showNotificationMessages) : true
         );
+        this.state.trackingSummary = false;
+        useEffect(
+            () => {
+                this.loadTrackingSummary();
+            },
+            () => [this.props.threadId, this.state.showNotificationMessages]
+        );
+    },
+    async loadTrackingSummary() {
+        if (this.state.showNotificationMessages || !this.props.threadId) {
+            this.state.trackingSummary = false;
+            return;
+        }
+        try {
+            this.state.trackingSummary = await rpc(
+                '/muk_web_chatter/tracking_summary', {
+                    thread_model: this.props.threadModel,
+                    thread_id: this.props.threadId,
+                }, { 
+                    silent: true 
+                }
+            );
+        } catch {
+            this.state.trackingSummary = false;
+        }
     },
     onClickNotificationsToggle() {
         const showNotificationMessages = !this.state.showNotificationMessages;
@@ -20,7 +47,9 @@ patch(Chatter.prototype, {
             'muk_web_chatter.notifications', showNotificationMessages
         );
         this.state.showNotificationMessages = showNotificationMessages;
+        if (this.state.thread && this.props.threadId) {
+            this.state.thread.isLoaded = false;
+            this.state.thread.fetchNewMessages();
+        }
     },
 });
-
-
@@ -0,0 +1,24 @@
+import { patch } from "@web/core/utils/patch";
+import { browser } from "@web/core/browser/browser";
+
+import { Thread } from "@mail/core/common/thread_model";
+
+patch(Thread.prototype, {
+    getFetchParams() {
+        const params = super.getFetchParams(...arguments);
+        const showNotificationMessages = browser.localStorage.getItem(
+            'muk_web_chatter.notifications'
+        );
+        if (
+            this.model !== 'discuss.channel' &&
+            showNotificationMessages != null &&
+            !JSON.parse(showNotificationMessages)
+        ) {
+            params.context = {
+                ...params.context,
+                muk_web_chatter_collapse_tracking: true,
+            };
+        }
+        return params;
+    },
+});
@@ -1 +1,4 @@
+from . import base
 from . import ir_http
+from . import refresh_interval
+from . import refresh_sequence
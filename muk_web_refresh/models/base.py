@@ -0,0 +1,75 @@
+import hashlib
+
+from odoo import models, api
+from odoo.tools import SQL
+
+
+class Base(models.AbstractModel):
+
+    _inherit = 'base'
+
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+
+    def _notify_refresh_change(self):
+        if not self._abstract and self._name in (
+            self.env['muk_web_refresh.sequence']._get_notify_models()
+        ):
+            self.env['muk_web_refresh.sequence']._register_change(
+                self._name
+            )
+
+    #----------------------------------------------------------
+    # Functions
+    #----------------------------------------------------------
+
+    @api.model
+    def get_refresh_fingerprint(self, domain, offset=0, limit=None, order=None):
+        self.check_access('read')
+        has_write_date = 'write_date' in self._fields and self._log_access
+        if limit:
+            query = self._search(
+                domain, offset=offset, limit=limit, order=order
+            )
+            self.env.cr.execute(query.select(
+                SQL.identifier(self._table, 'id'),
+                SQL('COUNT(*) OVER ()'),
+                SQL(
+                    'MAX(%s) OVER ()', 
+                    SQL.identifier(self._table, 'write_date')
+                ) if has_write_date else SQL('NULL'),
+            ))
+            rows = self.env.cr.fetchall()
+            count, write_date = rows[0][1:] if rows else (0, None)
+            ids = [row[0] for row in rows]
+        else:
+            aggregates = ['__count']
+            if has_write_date:
+                aggregates.append('write_date:max')
+            result = self._read_group(domain, [], aggregates)[0]
+            count, write_date = result[0], result[1] if has_write_date else None
+            ids = []
+        fingerprint = f'{count}|{write_date}|{",".join(map(str, ids))}'
+        return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    #----------------------------------------------------------
+    # ORM
+    #----------------------------------------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._notify_refresh_change()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self:
+            self._notify_refresh_change()
+        return res
+
+    def unlink(self):
+        if self:
+            self._notify_refresh_change()
+        return super().unlink()
@@ -11,10 +11,23 @@ class IrHttp(models.AbstractModel):
     
     def session_info(self):
         result = super().session_info()
+        params = self.env['ir.config_parameter'].sudo()
         result['pager_autoload_interval'] = int(
-            self.env['ir.config_parameter'].sudo().get_param(
+            params.get_param(
                 'muk_web_refresh.pager_autoload_interval', 
                 default=30000
             )
         )
+        result['pager_autoload_fallback_interval'] = int(
+            params.get_param(
+                'muk_web_refresh.pager_autoload_fallback_interval', 
+                default=300000
+            )
+        )
+        result['pager_autoload_intervals'] = (
+            self.env['muk_web_refresh.interval']._get_refresh_intervals()
+        )
+        result['pager_autoload_notify_models'] = sorted(
+            self.env['muk_web_refresh.sequence']._get_notify_models()
+        )
         return result
@@ -0,0 +1,70 @@
+from odoo import models, fields, api, tools
+
+
+class RefreshInterval(models.Model):
+
+    _name = 'muk_web_refresh.interval'
+    _description = 'Refresh Interval'
+    _order = 'model_id, action_id'
+
+    #----------------------------------------------------------
+    # Fields
+    #----------------------------------------------------------
+
+    model_id = fields.Many2one(
+        comodel_name='ir.model',
+        string='Model',
+        required=True,
+        ondelete='cascade',
+    )
+
+    action_id = fields.Many2one(
+        comodel_name='ir.actions.act_window',
+        string='Action',
+        ondelete='cascade',
+        domain="[('res_model', '=', model_name)]",
+    )
+
+    model_name = fields.Char(
+        related='model_id.model',
+        string='Model Name',
+    )
+
+    interval = fields.Integer(
+        string='Interval (Seconds)',
+        required=True,
+        default=30,
+    )
+
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+
+    @api.model
+    @tools.ormcache()
+    def _get_refresh_intervals(self):
+        intervals = {}
+        for record in self.sudo().search([]):
+            if record.action_id:
+                key = f'action:{record.action_id.id}'
+            else:
+                key = f'model:{record.model_name}'
+            intervals[key] = record.interval * 1000
+        return intervals
+
+    #----------------------------------------------------------
+    # ORM
+    #----------------------------------------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env.registry.clear_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
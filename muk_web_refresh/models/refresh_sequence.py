@@ -0,0 +1,49 @@
+from odoo import models, api, tools
+
+
+class RefreshSequence(models.AbstractModel):
+
+    _name = 'muk_web_refresh.sequence'
+    _description = 'Refresh Sequence'
+
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+
+    @api.model
+    @tools.ormcache()
+    def _get_notify_models(self):
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'muk_web_refresh.notify_models', default=''
+        )
+        return frozenset(
+            model.strip() for model in param.split(',')
+            if model.strip()
+        )
+
+    @api.model
+    def _get_notify_channel(self, model):
+        return f'muk_web_refresh:{model}'
+
+    @api.model
+    def _register_change(self, model):
+        changes = self.env.cr.precommit.data.setdefault(
+            'muk_web_refresh.changes', set()
+        )
+        if not changes:
+            self.env.cr.precommit.add(self._send_change_notifications)
+        changes.add(model)
+
+    @api.model
+    def _send_change_notifications(self):
+        changes = self.env.cr.precommit.data.pop(
+            'muk_web_refresh.changes', set()
+        )
+        # No shared counter row: concurrent writers of a model would
+        # serialize on it until commit. Views debounce the reloads.
+        for model in sorted(changes):
+            self.env['bus.bus'].sudo()._sendone(
+                self._get_notify_channel(model), 
+                'muk_web_refresh/changed', 
+                {'model': model}
+            )
@@ -2,6 +2,8 @@ import { useState, onWillStart, useEffect } from '@odoo/owl';
 
 import { browser } from '@web/core/browser/browser';
 import { patch } from '@web/core/utils/patch';
+import { debounce } from '@web/core/utils/timing';
+import { useService } from '@web/core/utils/hooks';
 import { session } from '@web/session';
 
 import {ControlPanel} from '@web/search/control_panel/control_panel';
@@ -12,7 +14,10 @@ patch(ControlPanel.prototype, {
         this.autoLoadState = useState({
 			active: false,
 			counter: 0,
+			fingerprint: false,
         });
+		this.autoLoadOrm = useService('orm');
+		this.autoLoadDebounced = debounce(() => this.autoLoad(true), 500);
 		onWillStart(() => {
 			if (
 				this.checkAutoLoadAvailability() && 
@@ -29,6 +34,10 @@ patch(ControlPanel.prototype, {
 				this.autoLoadState.counter = (
 					this.getAutoLoadRefreshInterval()
 				);
+				this.autoLoadState.fingerprint = false;
+				this.getAutoLoadFingerprint().then((fingerprint) => {
+					this.autoLoadState.fingerprint = fingerprint;
+				});
 				const interval = browser.setInterval(
 					() => {
 						this.autoLoadState.counter = (
@@ -37,17 +46,7 @@ patch(ControlPanel.prototype, {
 							this.getAutoLoadRefreshInterval()
 						);
 						if (this.autoLoadState.counter <= 0) {
-							this.autoLoadState.counter = (
-								this.getAutoLoadRefreshInterval()
-							);
-							if (this.pagerProps?.onUpdate) {
-								this.pagerProps.onUpdate({
-									offset: this.pagerProps.offset, 
-									limit: this.pagerProps.limit
-								});
-							} else if (typeof this.env.searchModel?.search) {
-								this.env.searchModel.search();
-							}
+							this.autoLoad();
 						}
 					}, 
 					1000
@@ -56,13 +55,104 @@ patch(ControlPanel.prototype, {
 			},
 			() => [this.autoLoadState.active]
 		);
+		useEffect(
+			() => {
+				const busService = this.env.services.bus_service;
+				if (
+					!busService ||
+					!this.autoLoadState.active ||
+					!this.checkAutoLoadNotifyAvailability()
+				) {
+					return;
+				}
+				const channel = this.getAutoLoadNotifyChannel();
+				const onChange = (payload) => {
+					if (payload.model !== this.env.searchModel.resModel) {
+						return;
+					}
+					this.autoLoadDebounced();
+				};
+				busService.addChannel(channel);
+				busService.subscribe('muk_web_refresh/changed', onChange);
+				return () => {
+					busService.unsubscribe('muk_web_refresh/changed', onChange);
+					busService.deleteChannel(channel);
+				};
+			},
+			() => [this.autoLoadState.active]
+		);
+	},
+	async autoLoad(force = false) {
+		this.autoLoadState.counter = this.getAutoLoadRefreshInterval();
+		const fingerprint = await this.getAutoLoadFingerprint();
+		if (
+			!force && fingerprint && 
+			fingerprint === this.autoLoadState.fingerprint
+		) {
+			return;
+		}
+		this.autoLoadState.fingerprint = fingerprint;
+		if (this.pagerProps?.onUpdate) {
+			this.pagerProps.onUpdate({
+				offset: this.pagerProps.offset, 
+				limit: this.pagerProps.limit
+			});
+		} else if (typeof this.env.searchModel?.search) {
+			this.env.searchModel.search();
+		}
 	},
 	checkAutoLoadAvailability() {
 		return ['kanban', 'list'].includes(this.env.config.viewType);
 	},
+	checkAutoLoadNotifyAvailability() {
+		return Boolean(
+			this.env.searchModel?.resModel &&
+			(session.pager_autoload_notify_models ?? []).includes(
+				this.env.searchModel.resModel
+			)
+		);
+	},
+	async getAutoLoadFingerprint() {
+		const resModel = this.env.searchModel?.resModel;
+		if (!resModel) {
+			return false;
+		}
+		const order = (this.env.searchModel.orderBy ?? []).map(
+			(o) => `${o.name} ${o.asc ? 'ASC' : 'DESC'}`
+		).join(', ');
+		try {
+			return await this.autoLoadOrm.silent.call(
+				resModel, 'get_refresh_fingerprint', [
+					this.env.searchModel.domain,
+				], {
+					offset: this.pagerProps?.offset ?? 0,
+					limit: this.pagerProps?.limit ?? null,
+					order: order || null,
+				}
+			);
+		} catch {
+			return false;
+		}
+	},
     getAutoLoadRefreshInterval() {
+		const intervals = session.pager_autoload_intervals ?? {};
+		const actionInterval = intervals[
+			`action:${this.env.config?.actionId}`
+		];
+		const modelInterval = intervals[
+			`model:${this.env.searchModel?.resModel}`
+		];
+		if (actionInterval || modelInterval) {
+			return (actionInterval || modelInterval) / 1000;
+		}
+		if (this.checkAutoLoadNotifyAvailability()) {
+			return (session.pager_autoload_fallback_interval ?? 300000) / 1000;
+		}
     	return (session.pager_autoload_interval ?? 30000) / 1000;
 	},
+	getAutoLoadNotifyChannel() {
+		return `muk_web_refresh:${this.env.searchModel.resModel}`;
+	},
     getAutoLoadStorageKey() {
 		const keys = [
 			this.env?.config?.actionId ?? '',
@@ -6,8 +6,11 @@ import {
     mountView,
     onRpc,
     contains,
+    patchWithCleanup,
 } from '@web/../tests/web_test_helpers';
 
+import { session } from '@web/session';
+
 class Product extends models.Model {
     name = fields.Char();
     _records = [
@@ -18,6 +21,7 @@ class Product extends models.Model {
 defineModels({ Product });
 
 onRpc('has_group', () => true);
+onRpc('get_refresh_fingerprint', () => 'fingerprint');
 
 test(
     'refresh toggle switches active state', 
@@ -37,3 +41,18 @@ test(
         expect('.o_control_panel i.fa-refresh').not.toHaveClass('fa-spin');
         expect('.o_control_panel i.fa-refresh').toHaveClass('text-muted');
 });
+
+test(
+    'refresh uses fallback interval for notified models', 
+    async () => {
+        patchWithCleanup(session, {
+            pager_autoload_notify_models: ['product'],
+        });
+        await mountView({
+            type: 'list',
+            resModel: 'product',
+            arch: `<list><field name='name'/></list>`,
+        });
+        await contains('.o_control_panel i.fa-refresh').click();
+        expect('.o_control_panel span.small').toHaveText('300s');
+});
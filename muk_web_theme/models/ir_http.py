@@ -12,8 +12,11 @@ class IrHttp(models.AbstractModel):
     def session_info(self):
         result = super().session_info()
         if self.env.user._is_internal():
-            for company in self.env.user.company_ids.with_context(bin_size=True):
+            companies = self.env.user.company_ids.with_context(bin_size=True)
+            image_urls = companies.sudo()._get_company_image_urls('background_image')
+            for company in companies:
                 result['user_companies']['allowed_companies'][company.id].update({
                     'has_background_image': bool(company.background_image),
+                    'background_image_url': image_urls.get(company.id, False),
                 })
         return result
@@ -1,4 +1,4 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 
 class ResCompany(models.Model):
@@ -18,3 +18,15 @@ class ResCompany(models.Model):
         string='Apps Menu Background Image',
         attachment=True
     )
+
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+
+    @api.model
+    def _get_company_image_variants(self):
+        return {
+            **super()._get_company_image_variants(),
+            'favicon': [(64, 64)],
+            'background_image': [(1920, 1920)],
+        }
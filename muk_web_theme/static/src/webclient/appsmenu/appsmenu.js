@@ -10,7 +10,9 @@ export class AppsMenu extends Dropdown {
     	super.setup();
     	this.commandPaletteOpen = false;
         this.commandService = useService("command");
-    	if (user.activeCompany.has_background_image) {
+    	if (user.activeCompany.background_image_url) {
+            this.imageUrl = user.activeCompany.background_image_url;
+    	} else if (user.activeCompany.has_background_image) {
             this.imageUrl = url('/web/image', {
                 model: 'res.company',
                 field: 'background_image',